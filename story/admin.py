@@ -1,6 +1,7 @@
 from django.contrib import admin
 from story.models import Story, Content, Comment
 from django.db.models import Count
+from django.conf import settings
 
 
 class HateCountFilter(admin.SimpleListFilter):
@@ -8,16 +9,24 @@ class HateCountFilter(admin.SimpleListFilter):
     parameter_name = "hate_count"
 
     def lookups(self, request, model_admin):
-        return (("5_or_more", "5개 이상"),)
+        threshold = settings.STORY_HIDE_HATE_THRESHOLD
+        return (("hidden", f"{threshold}개 이상 (숨김)"),)
 
     def queryset(self, request, queryset):
-        if self.value() == "5_or_more":
-            return queryset.filter(hate_count__gte=5)
+        if self.value() == "hidden":
+            return queryset.filter(is_visible=False)
 
 
 @admin.register(Story)
 class StoryAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "author", "hate_count")
+    list_display = (
+        "id",
+        "title",
+        "author",
+        "hate_count",
+        "is_visible",
+        "is_published",
+    )
     list_per_page = 20
     list_filter = (HateCountFilter,)
 
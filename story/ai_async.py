@@ -0,0 +1,170 @@
+import asyncio
+import weakref
+import deepl
+import httpx
+from openai import AsyncOpenAI
+from django.conf import settings
+from rest_framework.response import Response
+
+from .ai_func import (
+    CHATGPT_MODEL,
+    dalle_error_response,
+    deepl_error_response,
+    gpt_error_response,
+    setup_image_prompt,
+)
+from .backoff import guarded, provider_guards
+from .moderation import toxicity_checker
+from .translation import cached_translator
+
+
+DEEPL_API_URL = "https://api.deepl.com/v2/translate"
+DEEPL_FREE_API_URL = "https://api-free.deepl.com/v2/translate"
+PERSPECTIVE_ANALYZE_URL = (
+    "https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze"
+)
+
+
+class AsyncProviders:
+    """
+    비동기 뷰에서 사용하는 HTTP/OpenAI 클라이언트를 이벤트 루프마다 한 번만 생성해 재사용합니다.
+
+    httpx.AsyncClient의 연결은 생성된 이벤트 루프에서만 사용할 수 있으므로 루프별로 보관하며,
+    루프가 사라지면 함께 정리됩니다.
+    """
+
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _get(self, name, factory):
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        if name not in clients:
+            clients[name] = factory()
+        return clients[name]
+
+    def http(self):
+        # DeepL, Perspective API 요청에 함께 사용합니다.
+        return self._get(
+            "http",
+            lambda: httpx.AsyncClient(
+                timeout=settings.AI_PROVIDER_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.ASYNC_PROVIDER_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.ASYNC_PROVIDER_MAX_CONNECTIONS,
+                ),
+            ),
+        )
+
+    def openai(self):
+        # 429/5xx 응답은 재시도하지 않고 바로 ProviderGuard에 알립니다. (run_gpt와 같습니다.)
+        return self._get(
+            "openai",
+            lambda: AsyncOpenAI(
+                api_key=settings.GPT_API_KEY,
+                timeout=settings.AI_PROVIDER_TIMEOUT,
+                max_retries=0,
+            ),
+        )
+
+
+async_providers = AsyncProviders()
+
+
+def deepl_api_url():
+    # 무료 API 키는 ":fx"로 끝나며 별도의 주소를 사용합니다.
+    if settings.DEEPL_AUTH_KEY.endswith(":fx"):
+        return DEEPL_FREE_API_URL
+    return DEEPL_API_URL
+
+
+async def request_deepl_translation(texts, target_lang):
+    """DeepL API에 문장 목록 번역을 요청하고 번역 결과 문자열 목록을 반환합니다."""
+    response = await async_providers.http().post(
+        deepl_api_url(),
+        headers={"Authorization": f"DeepL-Auth-Key {settings.DEEPL_AUTH_KEY}"},
+        data={"text": texts, "target_lang": target_lang},
+    )
+    # deepl 라이브러리와 같은 예외를 발생시켜 오류 응답을 동기 버전과 맞춥니다.
+    if response.status_code == 456:
+        raise deepl.exceptions.QuotaExceededException(
+            response.text, http_status_code=response.status_code
+        )
+    if response.status_code == 429:
+        raise deepl.exceptions.TooManyRequestsException(
+            response.text, http_status_code=response.status_code
+        )
+    if response.status_code >= 400:
+        raise deepl.exceptions.DeepLException(
+            response.text, http_status_code=response.status_code
+        )
+    return [translation["text"] for translation in response.json()["translations"]]
+
+
+async def atranslate_texts(texts, deepl_target_lang="EN-US"):
+    """여러 문장을 번역 캐시를 거쳐 번역합니다. 실패 시 Response를 반환합니다."""
+    try:
+        return await cached_translator.atranslate_many(
+            request_deepl_translation, texts, deepl_target_lang
+        )
+    except Exception as e:
+        return deepl_error_response(e)
+
+
+async def atranslate_text(user_input_message, deepl_target_lang="EN-US"):
+    """translate_text의 비동기 버전입니다. 실패 시 Response를 반환합니다."""
+    result = await atranslate_texts([str(user_input_message)], deepl_target_lang)
+    if isinstance(result, Response):
+        return result
+    return result[0]
+
+
+@guarded("perspective")
+async def request_toxicity(check_toxicity_str):
+    """Perspective API에 폭력성 점수를 요청합니다."""
+    response = await async_providers.http().post(
+        PERSPECTIVE_ANALYZE_URL,
+        params={"key": settings.PRES_API_KEY},
+        json={
+            "comment": {"text": check_toxicity_str},
+            "requestedAttributes": {"TOXICITY": {}},
+        },
+    )
+    response.raise_for_status()
+    return response.json()["attributeScores"]["TOXICITY"]["summaryScore"]["value"]
+
+
+async def acheck_toxicity(check_toxicity_str, threshold):
+    """캐시와 금지어 검사를 거쳐 폭력성 점수를 반환합니다."""
+    return await toxicity_checker.ascore(
+        request_toxicity, check_toxicity_str, threshold
+    )
+
+
+async def arun_gpt(input_gpt_messages):
+    """run_gpt의 비동기 버전입니다. 실패 시 Response를 반환합니다."""
+    try:
+        completion = await provider_guards.get("gpt").acall(
+            async_providers.openai().chat.completions.create,
+            model=CHATGPT_MODEL,
+            messages=input_gpt_messages,
+            temperature=1.3,
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        return gpt_error_response(e)
+
+
+async def agenerate_images_from_text(script, d_model, quality):
+    """generate_images_from_text의 비동기 버전입니다. 실패 시 Response를 반환합니다."""
+    try:
+        response = await provider_guards.get("dalle").acall(
+            async_providers.openai().images.generate,
+            model=d_model,
+            prompt=setup_image_prompt(script),
+            size="1024x1024",
+            quality=quality,
+            n=1,
+        )
+        return response.data[0].url
+    except Exception as e:
+        return dalle_error_response(e)
@@ -1,10 +1,20 @@
 from django.conf import settings
+import os
+import threading
+import time
+import httplib2
+import requests
 import openai
 from openai import OpenAI
 import deepl
 import logging
 from story.time_decorator import timing_decorator
-from .backoff import retry_with_exponential_backoff
+from .backoff import (
+    ProviderUnavailable,
+    guarded,
+    provider_guards,
+)
+from .translation import cached_translator
 from googleapiclient import discovery
 from rest_framework import status
 from rest_framework.response import Response
@@ -13,66 +23,199 @@ from rest_framework.response import Response
 logging.config.dictConfig(settings.LOGGING)
 
 # 로거 가져오기
+info_logger = logging.getLogger("info_logger")
 error_logger = logging.getLogger("error_logger")
 
 
+PERSPECTIVE_DISCOVERY_URL = (
+    "https://commentanalyzer.googleapis.com/$discovery/rest?version=v1alpha1"
+)
+
+# 동화 생성에 사용하는 ChatGPT 모델
+CHATGPT_MODEL = "gpt-3.5-turbo"
+
+
+class ProviderRegistry:
+    """
+    외부 AI 서비스(DeepL, OpenAI, Perspective) 클라이언트를 워커 프로세스마다 한 번만 생성해 재사용하는 저장소입니다.
+
+    - 클라이언트를 재사용하므로 keep-alive HTTP 연결도 요청 사이에서 재사용됩니다.
+    - fork 이후(gunicorn, celery prefork) 자식 프로세스에서는 부모의 연결을 공유하지 않도록 새로 생성합니다.
+    - thread_local=True로 등록된 클라이언트(httplib2 기반 Perspective)는 스레드마다 따로 생성합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories = {}
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._clients = {}
+        self._local = threading.local()
+        self._stats = {}
+
+    def register(self, name, factory, thread_local=False):
+        self._factories[name] = (factory, thread_local)
+
+    def _count(self, name, key):
+        counter = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+        counter[key] = counter.get(key, 0) + 1
+
+    def get(self, name):
+        factory, thread_local = self._factories[name]
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            clients = self._clients
+            if thread_local:
+                clients = getattr(self._local, "clients", None)
+                if clients is None:
+                    clients = self._local.clients = {}
+            if name in clients:
+                self._count(name, "hits")
+                return clients[name]
+            self._count(name, "misses")
+        # 클라이언트 생성은 네트워크를 탈 수 있으므로 잠금 밖에서 실행합니다.
+        client = factory()
+        with self._lock:
+            return clients.setdefault(name, client)
+
+    def record(self, name, key):
+        with self._lock:
+            self._count(name, key)
+
+    def stats(self):
+        """
+        제공자별 hit/miss 횟수와 클라이언트 재사용률(hit 비율)을 반환합니다.
+        (클라이언트 객체를 재사용한 비율이며, HTTP 연결의 실제 재사용 여부는 알 수 없습니다.)
+        """
+        with self._lock:
+            snapshot = {}
+            for name, counter in self._stats.items():
+                counter = dict(counter)
+                total = counter["hits"] + counter["misses"]
+                if total:
+                    counter["client_reuse_ratio"] = round(counter["hits"] / total, 4)
+                snapshot[name] = counter
+            return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+provider_registry = ProviderRegistry()
+
+
+def _build_deepl_translator():
+    # Deepl API 키 설정 및 객체 생성 (내부 requests.Session으로 연결을 재사용합니다.)
+    return deepl.Translator(settings.DEEPL_AUTH_KEY)
+
+
+def _build_openai_client():
+    # OpenAI(ChatGPT & DALL-E) API에 연결하기 위한 키 설정 및 클라이언트 객체 생성
+    # 429/5xx 응답을 클라이언트 안에서 기다렸다가 재시도하지 않고 바로 ProviderGuard에 알립니다.
+    return OpenAI(
+        api_key=settings.GPT_API_KEY,
+        timeout=settings.AI_PROVIDER_TIMEOUT,
+        max_retries=0,
+    )
+
+
+def load_perspective_discovery_document():
+    """
+    Perspective API discovery 문서를 디스크 캐시에서 읽어옵니다.
+    캐시가 없거나 만료된 경우에만 네트워크로 받아와 저장합니다.
+    """
+    cache_path = settings.PERSPECTIVE_DISCOVERY_CACHE_PATH
+    try:
+        age = time.time() - os.path.getmtime(cache_path)
+        if age < settings.PERSPECTIVE_DISCOVERY_CACHE_TTL:
+            with open(cache_path, encoding="utf-8") as cache_file:
+                document = cache_file.read()
+            provider_registry.record("perspective_discovery", "hits")
+            return document
+    except OSError:
+        pass
+
+    provider_registry.record("perspective_discovery", "misses")
+    response = requests.get(
+        PERSPECTIVE_DISCOVERY_URL,
+        params={"key": settings.PRES_API_KEY},
+        timeout=settings.AI_PROVIDER_TIMEOUT,
+    )
+    response.raise_for_status()
+    document = response.text
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            cache_file.write(document)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        error_logger.error(f"Perspective) discovery cache write failed: {str(e)}")
+    return document
+
+
+def _build_perspective_client():
+    # Perspective API 키 설정 및 객체 생성
+    return discovery.build_from_document(
+        load_perspective_discovery_document(),
+        developerKey=settings.PRES_API_KEY,
+        http=httplib2.Http(timeout=settings.AI_PROVIDER_TIMEOUT),
+    )
+
+
+provider_registry.register("deepl", _build_deepl_translator)
+provider_registry.register("openai", _build_openai_client)
+provider_registry.register("perspective", _build_perspective_client, thread_local=True)
+
+
 def load_deepl_model():
-    # Deepl API 키 설정 및 객체 생성
-    deepl_auth_key = settings.DEEPL_AUTH_KEY
-    deepl_translator = deepl.Translator(deepl_auth_key)
+    deepl_translator = provider_registry.get("deepl")
     return deepl_translator
 
 
 def load_open_ai_model():
-    # OpenAI(ChatGPT & DALL-E) API에 연결하기 위한 키 설정 및 클라이언트 객체 생성
-    openai_client = OpenAI(api_key=settings.GPT_API_KEY)
+    openai_client = provider_registry.get("openai")
 
     # ChatGPT 모델 설정
-    chatgpt_model = "gpt-3.5-turbo"
+    chatgpt_model = CHATGPT_MODEL
     return openai_client, chatgpt_model
 
 
 def load_pers_model():
-    # Perspective API 키 설정 및 객체 생성
-    pers_client = discovery.build(
-        "commentanalyzer",
-        "v1alpha1",
-        developerKey=settings.PRES_API_KEY,
-        discoveryServiceUrl="https://commentanalyzer.googleapis.com/$discovery/rest?version=v1alpha1",
-        static_discovery=False,
-    )
+    pers_client = provider_registry.get("perspective")
     return pers_client
 
 
-@timing_decorator
-def translate_text(deepl_translator, user_input_message, deepl_target_lang="EN-US"):
-    # Deepl을 사용하여 User에게 받은 질문 번역하기
-    try:
-        trans_result = deepl_translator.translate_text(
-            user_input_message, target_lang=deepl_target_lang
-        )
-        return trans_result
-    except deepl.exceptions.QuotaExceededException as e:
+def deepl_error_response(e):
+    # DeepL 요청 중 발생한 예외를 사용자에게 전달할 Response로 바꿉니다.
+    if isinstance(e, ProviderUnavailable):
+        # 장애 중인 서비스는 호출하지 않고 바로 실패시킵니다.
+        error_logger.error(f"DeePl) Provider unavailable: {str(e)}")
+        return Response(e.data, status=e.status_code)
+    elif isinstance(e, deepl.exceptions.QuotaExceededException):
         error_logger.error(f"DeePl) Quota exceeded: {str(e)}")
         return Response(
             {"status": "456", "error": "번역 기능이 작동하지 않습니다. 고객센터에 문의해주세요."},
             status=status.HTTP_456.QUOTA_EXCEEDED,
         )
-    except deepl.exceptions.TooManyRequestsException as e:
+    elif isinstance(e, deepl.exceptions.TooManyRequestsException):
         error_logger.error(f"DeePl) Too Many Requests: {str(e)}")
         return Response(
             {"status": "429", "error": "연속된 요청으로 번역에 실패했습니다. 다시 요청해주세요."},
             status=status.HTTP_429_TOO_MANY_REQUESTS,
         )
-
-    except deepl.exceptions.DeepLException as e:
+    elif isinstance(e, deepl.exceptions.DeepLException):
         error_logger.error(f"DeePl) Exception: {str(e)}")
         return Response(
             {"status": "500", "error": "번역에 실패했습니다. 다시 시도해주세요."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-
-    except Exception as e:
+    else:
         error_logger.error(f"DeePl)  Unexpected Error: {str(e)}")
         return Response(
             {
@@ -82,21 +225,37 @@ def translate_text(deepl_translator, user_input_message, deepl_target_lang="EN-U
             status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+
+@timing_decorator
+def translate_text(deepl_translator, user_input_message, deepl_target_lang="EN-US"):
+    # Deepl을 사용하여 User에게 받은 질문 번역하기
+    try:
+        # 같은 문장은 번역 캐시에서 가져옵니다.
+        trans_result = cached_translator.translate(
+            deepl_translator, user_input_message, deepl_target_lang
+        )
+        return trans_result
+    except Exception as e:
+        return deepl_error_response(e)
+
+
 def check_toxicity(pers_client, check_toxicity_str):
     # Perspective API 사용하여 User가 입력한 질문에서 폭력성 검출하기
     analyze_request = {
         "comment": {"text": check_toxicity_str},
         "requestedAttributes": {"TOXICITY": {}},
     }
-    pers_response = pers_client.comments().analyze(body=analyze_request).execute()
+    pers_response = provider_guards.get("perspective").call(
+        pers_client.comments().analyze(body=analyze_request).execute
+    )
     pers_score = pers_response["attributeScores"]["TOXICITY"]["summaryScore"]["value"]
-    print("폭력성 검열 전 수치 : ", pers_score)
+    info_logger.info(f"폭력성 검열 전 수치 : {pers_score}")
     return pers_score
 
 
 def setup_gpt_messages(input_query):
     # GPT 메세지 설정
-    input_query = input_query.text
+    input_query = str(input_query)
     input_gpt_messages = []
     input_gpt_messages.append(
         {
@@ -110,49 +269,37 @@ def setup_gpt_messages(input_query):
     return input_gpt_messages
 
 
-@timing_decorator
-def run_gpt(openai_client, chatgpt_model, input_gpt_messages):
-    # GPT 실행
-    try:
-
-        @retry_with_exponential_backoff
-        def completions_with_backoff(**kwargs):
-            return openai_client.chat.completions.create(**kwargs)
-
-        completion = completions_with_backoff(
-            model=chatgpt_model,
-            messages=input_gpt_messages,
-            temperature=1.3,
-        )
-        gpt_response = completion.choices[0].message.content
-        print(f"ChatGPT : {gpt_response}")
-        return gpt_response
-
-    except openai.AuthenticationError as e:
+def gpt_error_response(e):
+    # GPT 요청 중 발생한 예외를 사용자에게 전달할 Response로 바꿉니다.
+    if isinstance(e, ProviderUnavailable):
+        # 장애 중인 서비스는 호출하지 않고 바로 실패시킵니다.
+        error_logger.error(f"ChatGPT) Provider unavailable: {str(e)}")
+        return Response(e.data, status=e.status_code)
+    elif isinstance(e, openai.AuthenticationError):
         error_logger.error(f"ChatGPT) API key or token Error: {str(e)}")
         return Response(
             {"status": "500", "error": "서비스에 문제가 생겨 동화 생성 실패했습니다. 고객센터에 문의해주세요."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-    except openai.RateLimitError as e:
+    elif isinstance(e, openai.RateLimitError):
         error_logger.error(f"ChatGPT) Too Many Requests: {str(e)}")
         return Response(
             {"status": "429", "error": "많은 동시 요청으로 인해 동화 생성에 실패했습니다. 잠시 후 다시 요청해주세요."},
             status=status.HTTP_429_TOO_MANY_REQUESTS,
         )
-    except openai.UnprocessableEntityError as e:
+    elif isinstance(e, openai.UnprocessableEntityError):
         error_logger.error(f"ChatGPT)  Unable to process the request: {str(e)}")
         return Response(
             {"status": "500", "error": "동화 생성 실패했습니다. 다시 요청해주세요."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-    except openai.BadRequestError as e:
+    elif isinstance(e, openai.BadRequestError):
         error_logger.error(f"ChatGPT) Bad Request Error: {str(e)}")
         return Response(
             {"status": "400", "error": "정책상의 이유로 이미지 생성이 불가능합니다. 내용을 수정해주세요."},
             status.HTTP_400_BAD_REQUEST,
         )
-    except Exception as e:
+    else:
         error_logger.error(f"ChatGPT)  Unexpected Error: {str(e)}")
         return Response(
             {
@@ -162,53 +309,99 @@ def run_gpt(openai_client, chatgpt_model, input_gpt_messages):
             status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+
 @timing_decorator
-@retry_with_exponential_backoff
-def generate_images_from_text(script, d_model, quality):
-    client = OpenAI(api_key=settings.GPT_API_KEY)
+def run_gpt(openai_client, chatgpt_model, input_gpt_messages):
+    # GPT 실행
+    try:
+
+        @guarded("gpt")
+        def create_completion(**kwargs):
+            return openai_client.chat.completions.create(**kwargs)
 
+        completion = create_completion(
+            model=chatgpt_model,
+            messages=input_gpt_messages,
+            temperature=1.3,
+        )
+        gpt_response = completion.choices[0].message.content
+        print(f"ChatGPT : {gpt_response}")
+        return gpt_response
+
+    except Exception as e:
+        return gpt_error_response(e)
+
+
+def open_gpt_stream(openai_client, chatgpt_model, input_gpt_messages):
+    """
+    GPT 답변을 스트리밍으로 요청하고, 도착하는 글자 조각을 차례로 내보내는 iterator를 반환합니다.
+    요청 자체가 실패하면 run_gpt와 같은 형태의 Response를 반환합니다.
+    """
     try:
-        response = client.images.generate(
-            model=d_model,
-            prompt=f"Illustrate '{script}' in an adorable, lovely, and detailed fairy tale style that children will adore. Ensure that the generated image does not contain any text or characters and creates a clear, lively, and detailed fairy tale.",
-            size="1024x1024",
-            quality=quality,
-            n=1,
+
+        @guarded("gpt")
+        def create_completion(**kwargs):
+            return openai_client.chat.completions.create(**kwargs)
+
+        stream = create_completion(
+            model=chatgpt_model,
+            messages=input_gpt_messages,
+            temperature=1.3,
+            stream=True,
         )
+    except Exception as e:
+        return gpt_error_response(e)
 
-        image_url = response.data[0].url
-        return image_url
+    def iter_deltas():
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # 중간에 중단하면 남은 답변을 받지 않도록 연결을 닫습니다.
+            response = getattr(stream, "response", None)
+            if response is not None:
+                response.close()
 
+    return iter_deltas()
 
-    except openai.AuthenticationError as e:
+
+def setup_image_prompt(script):
+    # DALL-E 프롬프트 설정
+    return f"Illustrate '{script}' in an adorable, lovely, and detailed fairy tale style that children will adore. Ensure that the generated image does not contain any text or characters and creates a clear, lively, and detailed fairy tale."
+
+
+def dalle_error_response(e):
+    # DALL-E 요청 중 발생한 예외를 사용자에게 전달할 Response로 바꿉니다.
+    if isinstance(e, ProviderUnavailable):
+        # 장애 중인 서비스는 호출하지 않고 바로 실패시킵니다.
+        error_logger.error(f"DALL-E) Provider unavailable: {str(e)}")
+        return Response(e.data, status=e.status_code)
+    elif isinstance(e, openai.AuthenticationError):
         error_logger.error(f"DALL-E) API key or token Error: {str(e)}")
         return Response(
             {"status": "500", "error": "서비스에 문제가 생겨 동화 생성 실패했습니다. 고객센터에 문의해주세요."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-
-    except openai.RateLimitError as e:
+    elif isinstance(e, openai.RateLimitError):
         error_logger.error(f"DALL-E) Too Many Requests: {str(e)}")
         return Response(
             {"status": "429", "error": "많은 동시 요청으로 인해 이미지 생성에 실패했습니다. 잠시 후 다시 요청해주세요."},
             status=status.HTTP_429_TOO_MANY_REQUESTS,
         )
-
-    except openai.UnprocessableEntityError as e:
+    elif isinstance(e, openai.UnprocessableEntityError):
         error_logger.error(f"DALL-E)  Unable to process the request : {str(e)}")
         return Response(
             {"status": "500", "error": "동화 생성 실패했습니다. 다시 요청해주세요."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-
-    except openai.BadRequestError as e:
+    elif isinstance(e, openai.BadRequestError):
         error_logger.error(f"DALL-E) Bad Request Error: {str(e)}")
         return Response(
             {"status": "400", "error": "정책상의 이유로 이미지 생성이 불가능합니다. 내용을 수정해주세요."},
             status.HTTP_400_BAD_REQUEST,
         )
-
-    except Exception as e:
+    else:
         error_logger.error(f"DALL-E)  Unexpected Error : {str(e)}")
         return Response(
             {
@@ -217,3 +410,24 @@ def generate_images_from_text(script, d_model, quality):
             },
             status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@timing_decorator
+def generate_images_from_text(script, d_model, quality):
+    client = provider_registry.get("openai")
+
+    try:
+        response = provider_guards.get("dalle").call(
+            client.images.generate,
+            model=d_model,
+            prompt=setup_image_prompt(script),
+            size="1024x1024",
+            quality=quality,
+            n=1,
+        )
+
+        image_url = response.data[0].url
+        return image_url
+
+    except Exception as e:
+        return dalle_error_response(e)
@@ -0,0 +1,62 @@
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+
+def json_response(data, status):
+    """DRF Response와 같은 형태(한글 그대로)의 JSON 응답을 만듭니다."""
+    return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+async def authenticate_jwt(request):
+    """Authorization 헤더의 JWT로 사용자를 찾습니다. 인증에 실패하면 None을 반환합니다."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+class AsyncAPIView(View):
+    """
+    ASGI 이벤트 루프 안에서 요청을 처리하는 비동기 뷰의 기본 클래스입니다.
+
+    DRF APIView는 동기 뷰라 ASGI에서도 스레드 하나를 차지하므로, 외부 AI 서비스를 오래 기다리는
+    뷰는 이 클래스를 상속해 async def로 작성합니다.
+    - request.data : JSON 요청 본문
+    - permission_required=True이면 JWT 인증 후 request.user를 설정하고, 실패 시 401을 반환합니다.
+    """
+
+    permission_required = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # APIView와 마찬가지로 JWT 인증을 사용하므로 CSRF 검사를 하지 않습니다.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.data = json.loads(request.body or b"{}")
+        except ValueError:
+            return json_response({"status": "400", "error": "잘못된 요청입니다."}, 400)
+
+        if self.permission_required:
+            request.user = await authenticate_jwt(request)
+            if request.user is None:
+                return json_response(
+                    {"status": "401", "error": "로그인 후 이용해주세요."}, 401
+                )
+        return await super().dispatch(request, *args, **kwargs)
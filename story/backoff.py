@@ -1,44 +1,279 @@
-import random
+import asyncio
+import functools
+import os
+import threading
 import time
 import openai
+from django.conf import settings
 
 
-def retry_with_exponential_backoff(
-    func,
-    initial_delay: float = 1,
-    exponential_base: float = 2,
-    jitter: bool = True,
-    max_retries: int = 3,
-):
-    """Retry a function with exponential backoff."""
+# 서비스 장애로 보는 4xx 응답 (요청 시간 초과, 요청 수 초과, DeepL 사용량 초과)
+PROVIDER_FAILURE_STATUSES = {408, 429, 456}
 
-    def wrapper(*args, **kwargs):
-        # Initialize variables
-        num_retries = 0
-        delay = initial_delay
 
-        # Loop until a successful response or max_retries is hit or an exception is raised
-        while True:
-            try:
-                return func(*args, **kwargs)
+class ProviderUnavailable(Exception):
+    """서킷 브레이커가 열려 있거나 동시 요청 수 제한에 걸려 외부 AI 서비스를 호출하지 않은 경우입니다."""
 
-            # Retry on specified errors
+    def __init__(self, provider, reason):
+        super().__init__(f"{provider} : {reason}")
+        self.provider = provider
+        self.data = {
+            "status": "503",
+            "error": "요청이 많아 잠시 서비스를 이용할 수 없습니다. 잠시 후 다시 요청해주세요.",
+        }
+        self.status_code = 503
 
-            except openai.RateLimitError as e:
-                print(e)
-                # Increment retries
-                num_retries += 1
 
-                # Check if max retries has been reached
-                if num_retries > max_retries:
-                    raise Exception(
-                        f"Maximum number of retries ({max_retries}) exceeded."
-                    )
+def _status_code(error):
+    # openai(status_code), deepl(http_status_code), googleapiclient(resp.status), httpx(response.status_code)
+    for status_code in (
+        getattr(error, "status_code", None),
+        getattr(error, "http_status_code", None),
+        getattr(getattr(error, "resp", None), "status", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(status_code, int):
+            return status_code
+    return None
 
-                # Increment the delay
-                delay *= exponential_base * (1 + jitter * random.random())
 
-                # Sleep for the delay
-                time.sleep(delay)
+def is_overload(error):
+    """요청 수 초과(429)로 인한 실패인지 확인합니다."""
+    return isinstance(error, openai.RateLimitError) or _status_code(error) == 429
 
-    return wrapper
+
+def is_provider_failure(error):
+    """
+    서킷 브레이커의 실패로 셀 예외인지 확인합니다.
+    정책 위반 등 요청 내용 때문인 4xx 응답은 서비스가 정상적으로 응답한 것으로 봅니다.
+    """
+    status_code = _status_code(error)
+    if status_code is not None and 400 <= status_code < 500:
+        return status_code in PROVIDER_FAILURE_STATUSES
+    return True
+
+
+class CircuitBreaker:
+    """
+    연속으로 failure_threshold번 실패하면 열려서(open) 호출을 바로 거절하고,
+    reset_timeout초가 지나면 반쯤 열린(half_open) 상태에서 한 번만 시험 호출을 보냅니다.
+    시험 호출이 성공하면 닫히고(closed), 실패하면 다시 열립니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    def cancel(self):
+        # 결과 없이 끝난 호출(요청 취소 등)은 시험 호출 기회만 돌려줍니다.
+        with self._lock:
+            self._probing = False
+
+
+class AdaptiveLimiter:
+    """
+    외부 서비스에 동시에 보내는 요청 수를 AIMD 방식으로 조절합니다.
+
+    - 제한(limit)만큼 요청이 진행 중이면 새 요청은 기다리지 않고 거절합니다.
+    - 요청이 latency_target초 안에 성공하면 제한을 조금씩(1/limit) 늘리고,
+      429 응답을 받으면 절반으로, 느리게 응답하면 0.9배로 줄입니다.
+    """
+
+    def __init__(self, initial, min_limit, max_limit, latency_target):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency, overloaded):
+        with self._lock:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * 0.5)
+            elif latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def cancel(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class ProviderGuard:
+    """외부 AI 서비스 하나에 대한 서킷 브레이커와 동시 요청 수 제한을 함께 적용합니다."""
+
+    def __init__(self, name, breaker, limiter, clock=time.monotonic):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+        self.clock = clock
+
+    def _enter(self):
+        if not self.limiter.try_acquire():
+            raise ProviderUnavailable(self.name, "concurrency limit reached")
+        if not self.breaker.allow():
+            self.limiter.cancel()
+            raise ProviderUnavailable(self.name, "circuit open")
+        return self.clock()
+
+    def _exit(self, started, error=None):
+        if error is not None and not isinstance(error, Exception):
+            # asyncio.CancelledError 등 서비스 응답과 관계없이 중단된 경우
+            self.limiter.cancel()
+            self.breaker.cancel()
+            return
+        self.limiter.release(
+            self.clock() - started, error is not None and is_overload(error)
+        )
+        if error is not None and is_provider_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def call(self, func, *args, **kwargs):
+        started = self._enter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._exit(started, e)
+            raise
+        self._exit(started)
+        return result
+
+    async def acall(self, func, *args, **kwargs):
+        started = self._enter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._exit(started, e)
+            raise
+        self._exit(started)
+        return result
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "rejected": self.limiter.rejected,
+        }
+
+
+class ProviderGuards:
+    """
+    외부 AI 서비스별 ProviderGuard를 프로세스마다 하나씩 만들어 보관합니다.
+    설정은 AI_PROVIDER_BREAKER_* 및 AI_PROVIDER_CONCURRENCY에서 읽습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._guards = {}
+
+    def get(self, name):
+        with self._lock:
+            # fork된 자식 프로세스는 부모의 상태를 이어받지 않습니다.
+            if self._pid != os.getpid():
+                self._reset()
+            guard = self._guards.get(name)
+            if guard is None:
+                concurrency = settings.AI_PROVIDER_CONCURRENCY[name]
+                guard = self._guards[name] = ProviderGuard(
+                    name,
+                    CircuitBreaker(
+                        settings.AI_PROVIDER_BREAKER_FAILURES,
+                        settings.AI_PROVIDER_BREAKER_RESET_TIMEOUT,
+                    ),
+                    AdaptiveLimiter(
+                        concurrency["initial"],
+                        concurrency["min"],
+                        concurrency["max"],
+                        concurrency["latency_target"],
+                    ),
+                )
+            return guard
+
+    def stats(self):
+        with self._lock:
+            guards = dict(self._guards)
+        return {name: guard.stats() for name, guard in guards.items()}
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+provider_guards = ProviderGuards()
+
+
+def guarded(provider):
+    """함수(또는 코루틴 함수) 호출에 provider의 서킷 브레이커와 동시 요청 수 제한을 적용합니다."""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await provider_guards.get(provider).acall(func, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return provider_guards.get(provider).call(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
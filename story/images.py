@@ -0,0 +1,218 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import requests
+from PIL import Image
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# 로깅 설정
+logging.config.dictConfig(settings.LOGGING)
+
+# 로거 가져오기
+info_logger = logging.getLogger("info_logger")
+error_logger = logging.getLogger("error_logger")
+
+# 이미지를 임시 파일에 나누어 쓰는 단위(byte)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class ImageDownloadError(Exception):
+    """이미지 크기 제한이나 다운로드 시간 제한을 넘었을 때 발생하는 예외입니다."""
+
+
+def download_image(image_url):
+    """
+    이미지를 chunk 단위로 임시 파일에 저장해 Django File 객체로 반환합니다.
+
+    - 응답 전체를 메모리에 올리지 않습니다.
+    - STORY_IMAGE_MAX_SIZE(byte)를 넘거나 STORY_IMAGE_DOWNLOAD_TIMEOUT(초)이 지나면 중단합니다.
+    - 다운로드에 실패하면 None을 반환합니다.
+    """
+    start_time = time.perf_counter()
+    deadline = start_time + settings.STORY_IMAGE_DOWNLOAD_TIMEOUT
+    image_file = None
+    try:
+        with requests.get(
+            image_url, stream=True, timeout=settings.STORY_IMAGE_DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                raise ImageDownloadError(f"status code {response.status_code}")
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > settings.STORY_IMAGE_MAX_SIZE:
+                raise ImageDownloadError(f"too large ({content_length} bytes)")
+
+            image_file = tempfile.TemporaryFile()
+            # 저장 시 중복 이미지를 찾기 위해 내려받으면서 해시를 계산합니다.
+            digest = hashlib.sha256()
+            size = 0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.STORY_IMAGE_MAX_SIZE:
+                    raise ImageDownloadError(f"too large (> {size} bytes)")
+                if time.perf_counter() > deadline:
+                    raise ImageDownloadError("timeout")
+                image_file.write(chunk)
+                digest.update(chunk)
+            if size == 0:
+                raise ImageDownloadError("empty body")
+
+        image_file.seek(0)
+        info_logger.info(
+            f"{time.perf_counter() - start_time:.2f} seconds, 이미지 다운로드 성공 ({size} bytes)"
+        )
+        downloaded_file = File(image_file, name="story_image.jpg")
+        downloaded_file.sha256 = digest.hexdigest()
+        return downloaded_file
+    except Exception as e:
+        if image_file is not None:
+            image_file.close()
+        error_logger.error(
+            f"{time.perf_counter() - start_time:.2f} seconds, 이미지 다운로드 실패 : {str(e)}"
+        )
+        return None
+
+
+def download_images(image_url_list):
+    """
+    이미지들을 동시에 다운로드합니다.
+    결과는 image_url_list와 같은 순서이며, 실패한 이미지는 None입니다.
+    """
+    if not image_url_list:
+        return []
+    max_workers = min(len(image_url_list), settings.STORY_IMAGE_DOWNLOAD_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(download_image, image_url_list))
+
+
+def build_content_data(paragraph_list, image_url_list):
+    """
+    문단 목록과 이미지 url 목록으로 ContentCreateSerializer에 전달할 데이터를 만듭니다.
+    이미지는 동시에 내려받으며, 내려받지 못한 이미지는 제외하고 문단만 저장합니다.
+    """
+    # 이미지는 동시에 내려받아 임시 파일에 저장합니다. (실패한 이미지는 None)
+    image_file_list = download_images(image_url_list)
+
+    content_data = []
+
+    for i in range(len(paragraph_list)):
+        image_file = image_file_list[i] if i < len(image_file_list) else None
+        if image_file is None:
+            content_dic = {"paragraph": paragraph_list[i]}
+            content_data.append(content_dic)
+        else:
+            content_dic = {
+                "paragraph": paragraph_list[i],
+                "image": image_file,
+            }
+            content_data.append(content_dic)
+    return content_data
+
+
+def _encode_image(image, image_format, quality):
+    buffer = BytesIO()
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(buffer, format=image_format, quality=quality)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_image_variants(image_field):
+    """
+    원본 이미지 옆(같은 폴더)에 원본 크기 WebP와 크기별 썸네일(JPEG, WebP)을 저장합니다.
+
+    저장된 파일 경로를 아래와 같은 dict로 반환합니다.
+    {"webp": "...webp", "thumbnails": {"256": {"jpeg": "..._256.jpg", "webp": "..._256.webp"}}}
+    """
+    stem, _ = os.path.splitext(image_field.name)
+    quality = settings.STORY_IMAGE_VARIANT_QUALITY
+
+    with image_field.open("rb") as original_file:
+        original = Image.open(original_file)
+        original.load()
+    if original.mode not in ("RGB", "RGBA"):
+        original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+    variants = {
+        "webp": default_storage.save(
+            f"{stem}.webp", _encode_image(original, "WEBP", quality)
+        ),
+        "thumbnails": {},
+    }
+    for size in settings.STORY_IMAGE_THUMBNAIL_SIZES:
+        thumbnail = original.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+        variants["thumbnails"][str(size)] = {
+            "jpeg": default_storage.save(
+                f"{stem}_{size}.jpg", _encode_image(thumbnail, "JPEG", quality)
+            ),
+            "webp": default_storage.save(
+                f"{stem}_{size}.webp", _encode_image(thumbnail, "WEBP", quality)
+            ),
+        }
+    return variants
+
+
+def generate_story_image_variants(story):
+    """
+    스토리의 모든 문단 이미지에 대해 썸네일과 WebP 이미지를 만들고 대표 이미지를 갱신합니다.
+    같은 이미지(StoredImage)의 변환본이 이미 있으면 다시 만들지 않고 재사용합니다.
+    """
+    from story.models import StoredImage
+
+    for content in story.contents.exclude(image="").filter(image_variants={}):
+        stored_image = StoredImage.objects.filter(image=content.image.name).first()
+        if stored_image is not None and stored_image.variants:
+            content.image_variants = stored_image.variants
+        else:
+            try:
+                content.image_variants = generate_image_variants(content.image)
+            except Exception as e:
+                error_logger.error(f"content {content.id} 이미지 변환 실패 : {str(e)}")
+                continue
+            if stored_image is not None:
+                stored_image.variants = content.image_variants
+                stored_image.save(update_fields=["variants"])
+        content.save(update_fields=["image_variants"])
+    story.refresh_cover()
+
+
+def variant_names(variants):
+    """변환본 경로 dict에서 모든 파일 경로를 꺼냅니다."""
+    if not variants:
+        return []
+    names = [variants["webp"]]
+    for formats in variants["thumbnails"].values():
+        names.extend(formats.values())
+    return names
+
+
+def delete_image_files(image_name, variants):
+    """원본 이미지와 변환본 파일들을 삭제합니다."""
+    for name in [image_name, *variant_names(variants)]:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            error_logger.error(f"{name} 삭제 실패 : {str(e)}")
+
+
+def variant_urls(variants):
+    """generate_image_variants()가 반환한 경로들을 url로 바꿉니다."""
+    if not variants:
+        return None
+    return {
+        "webp": default_storage.url(variants["webp"]),
+        "thumbnails": {
+            size: {
+                image_format: default_storage.url(name)
+                for image_format, name in formats.items()
+            }
+            for size, formats in variants["thumbnails"].items()
+        },
+    }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from story.models import Story
+
+
+class Command(BaseCommand):
+    help = "기존 스토리의 대표 이미지와 문단 요약(cover_image, cover_excerpt)을 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="대표 이미지가 이미 저장된 스토리도 다시 계산합니다.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        stories = Story.objects.order_by("id")
+        if not options["all"]:
+            stories = stories.filter(cover_image="")
+
+        updated = 0
+        for story in stories.only("id").iterator(chunk_size=options["batch_size"]):
+            story.refresh_cover()
+            updated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{updated}개의 스토리 대표 이미지를 갱신했습니다."))
@@ -0,0 +1,170 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest.mock import patch
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+class InFlightCounter:
+    """동시에 진행 중인 (가짜) 외부 AI 서비스 호출 수와 최댓값을 셉니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.current -= 1
+
+
+class Command(BaseCommand):
+    help = (
+        "외부 AI 서비스(DeepL, Perspective, GPT)를 지연 시간만 있는 가짜 응답으로 바꾸고, "
+        "동기 뷰(WSGI 스레드 워커)와 비동기 뷰(ASGI 이벤트 루프 하나)의 동시 처리량을 비교합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.2,
+            help="외부 서비스 호출 1회의 지연 시간(초)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="WSGI 워커의 스레드 수 (gunicorn --threads)",
+        )
+
+    def handle(self, *args, **options):
+        latency = options["latency"]
+        with ExitStack() as stack:
+            stack.enter_context(
+                override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+            )
+            wsgi_counter = self.stub_sync_providers(stack, latency)
+            asgi_counter = self.stub_async_providers(stack, latency)
+
+            wsgi = self.run_wsgi(options["requests"], options["threads"])
+            asgi = asyncio.run(self.run_asgi(options["requests"]))
+
+        self.stdout.write(
+            f"requests {options['requests']}, provider latency {latency * 1000:.0f} ms"
+        )
+        self.report(f"WSGI ({options['threads']} threads)", wsgi, wsgi_counter)
+        self.report("ASGI (1 event loop)", asgi, asgi_counter)
+
+    def stub_sync_providers(self, stack, latency):
+        counter = InFlightCounter()
+
+        def call(result):
+            def stub(*args, **kwargs):
+                with counter:
+                    time.sleep(latency)
+                return result
+
+            return stub
+
+        for name in ["load_deepl_model", "load_pers_model"]:
+            stack.enter_context(patch(f"story.pipeline.{name}", return_value=None))
+        stack.enter_context(
+            patch("story.pipeline.load_open_ai_model", return_value=(None, "gpt"))
+        )
+        stack.enter_context(
+            patch("story.pipeline.translate_text", side_effect=call("translated"))
+        )
+        stack.enter_context(
+            patch("story.pipeline.check_toxicity", side_effect=call(0.0))
+        )
+        stack.enter_context(
+            patch("story.pipeline.run_gpt", side_effect=call("Once upon a time"))
+        )
+        return counter
+
+    def stub_async_providers(self, stack, latency):
+        counter = InFlightCounter()
+
+        def call(result):
+            async def stub(*args, **kwargs):
+                with counter:
+                    await asyncio.sleep(latency)
+                return result
+
+            return stub
+
+        stack.enter_context(
+            patch("story.pipeline.atranslate_text", side_effect=call("translated"))
+        )
+        stack.enter_context(
+            patch("story.pipeline.acheck_toxicity", side_effect=call(0.0))
+        )
+        stack.enter_context(
+            patch("story.pipeline.arun_gpt", side_effect=call("Once upon a time"))
+        )
+        return counter
+
+    def run_wsgi(self, count, threads):
+        url = reverse("request_fairytail_view")
+
+        def request(i):
+            started = time.perf_counter()
+            # 주제를 모두 다르게 해서 같은 주제 요청 합치기(single-flight)가 적용되지 않게 합니다.
+            response = Client().post(
+                url,
+                content_type="application/json",
+                data={"subject": f"benchmark {i}", "target_language": "KO"},
+            )
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(request, range(count)))
+        return results, time.perf_counter() - started
+
+    async def run_asgi(self, count):
+        url = reverse("async_request_fairytail_view")
+        client = AsyncClient()
+
+        async def request(i):
+            started = time.perf_counter()
+            response = await client.post(
+                url,
+                content_type="application/json",
+                data={"subject": f"benchmark {i}", "target_language": "KO"},
+            )
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(i) for i in range(count)))
+        return results, time.perf_counter() - started
+
+    def report(self, label, measured, counter):
+        results, elapsed = measured
+        latencies = sorted(latency for _, latency in results)
+        failed = sum(1 for status_code, _ in results if status_code != 201)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(label)
+        self.stdout.write(f"  elapsed            : {elapsed:.2f} s")
+        self.stdout.write(f"  throughput         : {len(results) / elapsed:.1f} req/s")
+        self.stdout.write(f"  peak in-flight     : {counter.peak} provider calls")
+        self.stdout.write(
+            f"  latency p50 / p99  : {statistics.median(latencies) * 1000:.0f} ms"
+            f" / {p99 * 1000:.0f} ms"
+        )
+        if failed:
+            self.stdout.write(f"  failed             : {failed}")
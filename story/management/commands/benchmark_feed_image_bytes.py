@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from story.images import generate_story_image_variants
+from story.models import Story
+
+
+class Command(BaseCommand):
+    help = "피드 한 페이지에서 대표 이미지로 전송되는 용량을 원본과 썸네일/WebP로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=1)
+        parser.add_argument(
+            "--generate-missing",
+            action="store_true",
+            help="변환본이 없는 스토리는 썸네일과 WebP 이미지를 먼저 만듭니다.",
+        )
+
+    def handle(self, *args, **options):
+        per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        offset = (options["page"] - 1) * per_page
+        stories = (
+            Story.objects.visible()
+            .exclude(cover_image="")
+            .order_by("-created_at")[offset : offset + per_page]
+        )
+
+        totals = {"original": 0, "webp": 0}
+        for size in settings.STORY_IMAGE_THUMBNAIL_SIZES:
+            totals[f"{size}_jpeg"] = 0
+            totals[f"{size}_webp"] = 0
+
+        measured = 0
+        for story in stories:
+            if not story.cover_variants and options["generate_missing"]:
+                generate_story_image_variants(story)
+            if not story.cover_variants:
+                continue
+            measured += 1
+            totals["original"] += default_storage.size(story.cover_image.name)
+            totals["webp"] += default_storage.size(story.cover_variants["webp"])
+            for size, formats in story.cover_variants["thumbnails"].items():
+                for image_format, name in formats.items():
+                    totals[f"{size}_{image_format}"] += default_storage.size(name)
+
+        self.stdout.write(f"page {options['page']} : {measured}개 스토리의 대표 이미지")
+        for name, total in totals.items():
+            ratio = total / totals["original"] * 100 if totals["original"] else 0
+            self.stdout.write(f"  {name:<10} {total / 1024:>10.1f} KiB ({ratio:.1f}%)")
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.timezone import now
+from story.models import Story
+from story.pagination import LATEST_ORDERING, encode_cursor, paginate_by_cursor
+from user.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "페이지 번호 방식과 커서 방식의 깊은 페이지 조회 시간을 비교합니다. (시드 데이터는 롤백됩니다.)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stories", type=int, default=20000)
+        parser.add_argument("--page", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["stories"])
+                self.compare(options["page"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, count):
+        author = User.objects.create_user(
+            email="benchmark@email.com",
+            nickname="benchmark",
+            country="미국",
+            password="benchmark1!",
+        )
+        stories = Story.objects.bulk_create(
+            [Story(author=author, title=f"benchmark {i}") for i in range(count)],
+            batch_size=1000,
+        )
+        # 작성 시각을 서로 다르게 저장합니다.
+        base_time = now()
+        for i, story in enumerate(stories):
+            story.created_at = base_time - timedelta(seconds=i)
+        Story.objects.bulk_update(stories, ["created_at"], batch_size=1000)
+
+    def measure(self, func, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1000
+
+    def compare(self, page, repeat):
+        per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        stories = Story.objects.visible().order_by("-created_at")
+
+        def offset_page():
+            paginator = Paginator(stories, per_page)
+            list(paginator.page(page))
+            return paginator.count
+
+        # 이전 페이지의 마지막 스토리로 커서를 미리 만들어 둡니다.
+        last = stories.order_by(*LATEST_ORDERING)[(page - 1) * per_page - 1]
+        cursor = encode_cursor([last.created_at, last.id])
+
+        def cursor_page():
+            return paginate_by_cursor(stories, LATEST_ORDERING, cursor, per_page)
+
+        offset_ms = self.measure(offset_page, repeat)
+        cursor_ms = self.measure(cursor_page, repeat)
+        self.stdout.write(f"page {page} (page_size {per_page})")
+        self.stdout.write(f"  page number : {offset_ms:.2f} ms")
+        self.stdout.write(f"  cursor      : {cursor_ms:.2f} ms")
@@ -0,0 +1,163 @@
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.timezone import now
+from story.models import RANKING_GLOBAL_SCOPE, Story, StoryRanking
+from story.pagination import LATEST_ORDERING, LIKE_ORDERING, keyset_filter
+from user.models import User, UserStoryTimeStamp
+
+# 실행 계획에서 테이블 전체를 읽는 단계를 찾는 정규식 (DB 종류별)
+SEQUENTIAL_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # "SCAN story USING INDEX ..."는 인덱스 순서로 읽는 것이므로 제외합니다.
+    "sqlite": re.compile(r"\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)"),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "시드 데이터를 넣은 뒤 피드/마이페이지의 주요 쿼리 실행 계획(EXPLAIN)을 확인하고, "
+        "story 테이블을 순차 탐색(sequential scan)하는 쿼리가 있으면 실패합니다. "
+        "(시드 데이터는 롤백됩니다.)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stories", type=int, default=20000)
+        parser.add_argument("--authors", type=int, default=50)
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"{connection.vendor} DB는 지원하지 않습니다.")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                viewer = self.seed(options["stories"], options["authors"])
+                for name, queryset in self.hot_queries(viewer):
+                    plan = queryset.explain()
+                    scanned = {
+                        table
+                        for table in pattern.findall(plan)
+                        if table == Story._meta.db_table
+                    }
+                    self.stdout.write(f"[{'FAIL' if scanned else 'OK'}] {name}")
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+                    if scanned:
+                        failures.append(name)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"순차 탐색하는 쿼리 : {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("모든 쿼리가 인덱스를 사용합니다."))
+
+    def seed(self, count, author_count):
+        countries = ["대한민국", "미국", "프랑스", "스페인", "일본", "중국"]
+        authors = User.objects.bulk_create(
+            [
+                User(
+                    email=f"plan{i}@email.com",
+                    nickname=f"plan{i}",
+                    country=countries[i % len(countries)],
+                    password="!",
+                )
+                for i in range(author_count)
+            ]
+        )
+        base_time = now()
+        # 일부는 출판 중이거나 싫어요가 많아 목록에서 제외되는 스토리입니다.
+        stories = Story.objects.bulk_create(
+            [
+                Story(
+                    author=authors[i % author_count],
+                    title=f"plan {i}",
+                    like_count=i % 97,
+                    hate_count=5 if i % 50 == 0 else i % 3,
+                    is_visible=i % 50 != 0,
+                    is_published=i % 100 != 1,
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+        for i, story in enumerate(stories):
+            story.created_at = base_time - timedelta(seconds=i)
+        Story.objects.bulk_update(stories, ["created_at"], batch_size=1000)
+
+        viewer = authors[0]
+        viewer.bookmark_stories.add(*stories[:20])
+        UserStoryTimeStamp.objects.bulk_create(
+            [
+                UserStoryTimeStamp(user=viewer, story=story, timestamp=base_time)
+                for story in stories[:20]
+            ]
+        )
+
+        with connection.cursor() as cursor:
+            # 통계를 갱신해 실제 데이터 분포로 실행 계획을 세우게 합니다.
+            cursor.execute("ANALYZE")
+        return viewer
+
+    def cursor_page(self, stories, ordering):
+        # 10번째 페이지를 조회하는 커서 방식 쿼리입니다. (paginate_by_cursor와 같은 형태)
+        per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        stories = stories.order_by(*ordering)
+        last = stories[per_page * 9 - 1]
+        values = [getattr(last, field.lstrip("-")) for field in ordering]
+        return stories.filter(keyset_filter(ordering, values))[: per_page + 1]
+
+    def hot_queries(self, viewer):
+        """story/views.py와 user/serializers.py의 주요 조회 쿼리입니다."""
+        per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        feed = Story.objects.visible().for_feed()
+        StoryRanking.objects.rebuild_all()
+        return [
+            (
+                "최신순 피드",
+                feed.order_by("-created_at")[per_page * 9 : per_page * 10],
+            ),
+            ("최신순 피드 (커서)", self.cursor_page(feed, LATEST_ORDERING)),
+            ("좋아요순 피드 (커서)", self.cursor_page(feed, LIKE_ORDERING)),
+            (
+                "좋아요 순위 재계산 (전체)",
+                StoryRanking.objects.candidates(RANKING_GLOBAL_SCOPE).order_by(
+                    "-like_count", "-created_at", "-id"
+                )[: settings.STORY_RANKING_SIZE],
+            ),
+            (
+                "좋아요순 피드 (순위)",
+                StoryRanking.objects.top_stories(RANKING_GLOBAL_SCOPE, 8),
+            ),
+            (
+                "국가별 피드 (순위)",
+                StoryRanking.objects.top_stories(viewer.country, 8),
+            ),
+            (
+                "마이페이지 내 스토리",
+                viewer.story_set.visible()
+                .order_by("-created_at")
+                .for_feed(),
+            ),
+            (
+                "마이페이지 북마크",
+                viewer.bookmark_stories.visible()
+                .order_by("-created_at")
+                .for_feed(),
+            ),
+            (
+                "마이페이지 최근 본 스토리",
+                Story.objects.visible()
+                .filter(timestamps__user=viewer)
+                .order_by("-timestamps__timestamp")
+                .for_feed(),
+            ),
+        ]
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from story.models import Story, StoryRanking
+from story.response_cache import FEED_SCOPE, response_cache, story_scope
+
+
+class Command(BaseCommand):
+    help = (
+        "현재 STORY_HIDE_HATE_THRESHOLD 기준으로 모든 스토리의 공개 여부(is_visible)를 다시 계산합니다. "
+        "(기준을 바꾼 뒤 배포할 때 실행합니다.)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        threshold = settings.STORY_HIDE_HATE_THRESHOLD
+        changes = [
+            (Story.objects.filter(is_visible=True, hate_count__gte=threshold), False),
+            (Story.objects.filter(is_visible=False, hate_count__lt=threshold), True),
+        ]
+
+        changed_ids = []
+        for stories, is_visible in changes:
+            story_ids = list(stories.order_by("id").values_list("id", flat=True))
+            for start in range(0, len(story_ids), options["batch_size"]):
+                batch = story_ids[start : start + options["batch_size"]]
+                Story.objects.filter(id__in=batch).update(is_visible=is_visible)
+            changed_ids += story_ids
+
+        if changed_ids:
+            # 공개 여부가 바뀐 스토리가 담긴 순위와 캐시 응답을 갱신합니다.
+            StoryRanking.objects.rebuild_all()
+            response_cache.invalidate(
+                FEED_SCOPE, *[story_scope(story_id) for story_id in changed_ids]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(changed_ids)}개의 스토리 공개 여부를 갱신했습니다."
+            )
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('story', '0007_alter_content_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='cover_excerpt',
+            field=models.CharField(blank=True, max_length=255, verbose_name='대표 문단 요약'),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='cover_image',
+            field=models.ImageField(blank=True, max_length=255, upload_to='', verbose_name='대표 이미지'),
+        ),
+    ]
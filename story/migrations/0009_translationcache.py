@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0008_story_cover"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranslationCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source_hash",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="원문 해시"
+                    ),
+                ),
+                (
+                    "target_lang",
+                    models.CharField(max_length=10, verbose_name="대상 언어"),
+                ),
+                ("translated_text", models.TextField(verbose_name="번역문")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="생성시각"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "translation_cache",
+            },
+        ),
+    ]
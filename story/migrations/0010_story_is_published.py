@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0009_translationcache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="story",
+            name="is_published",
+            field=models.BooleanField(default=True, verbose_name="출판 여부"),
+        ),
+    ]
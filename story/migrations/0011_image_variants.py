@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0010_story_is_published"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="content",
+            name="image_variants",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="문단 이미지 변환본"
+            ),
+        ),
+        migrations.AddField(
+            model_name="story",
+            name="cover_variants",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="대표 이미지 변환본"
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0011_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="이미지 해시"
+                    ),
+                ),
+                (
+                    "image",
+                    models.ImageField(
+                        db_index=True,
+                        max_length=255,
+                        upload_to="",
+                        verbose_name="이미지",
+                    ),
+                ),
+                (
+                    "variants",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="이미지 변환본"
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(default=0, verbose_name="참조 개수"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성시각"),
+                ),
+            ],
+            options={
+                "db_table": "stored_image",
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0012_storedimage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoryRanking",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("scope", models.CharField(max_length=50, verbose_name="순위 범위")),
+                (
+                    "like_count",
+                    models.PositiveIntegerField(default=0, verbose_name="좋아요 개수"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="생성시각")),
+                (
+                    "story",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rankings",
+                        to="story.story",
+                        verbose_name="스토리",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "story_ranking",
+                "indexes": [
+                    models.Index(
+                        fields=["scope", "-like_count", "-created_at"],
+                        name="story_ranking_order_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="storyranking",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "story"), name="story_ranking_scope_story_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0013_storyranking"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("hate_count__lte", 4), ("is_published", True)),
+                fields=["-created_at", "-id"],
+                name="story_visible_latest_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("hate_count__lte", 4), ("is_published", True)),
+                fields=["-like_count", "-created_at", "-id"],
+                name="story_visible_like_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("hate_count__lte", 4), ("is_published", True)),
+                fields=["author", "-created_at"],
+                name="story_visible_author_idx",
+            ),
+        ),
+    ]
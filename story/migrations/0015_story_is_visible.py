@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hide_hated_stories(apps, schema_editor):
+    # 싫어요가 기준 개수 이상인 기존 스토리를 숨김 상태로 바꿉니다.
+    Story = apps.get_model("story", "Story")
+    Story.objects.filter(
+        hate_count__gte=settings.STORY_HIDE_HATE_THRESHOLD
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0014_story_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="story",
+            name="story_visible_latest_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="story",
+            name="story_visible_like_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="story",
+            name="story_visible_author_idx",
+        ),
+        migrations.AddField(
+            model_name="story",
+            name="is_visible",
+            field=models.BooleanField(
+                db_index=True, default=True, verbose_name="공개 여부"
+            ),
+        ),
+        migrations.RunPython(hide_hated_stories, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("is_published", True), ("is_visible", True)),
+                fields=["-created_at", "-id"],
+                name="story_visible_latest_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("is_published", True), ("is_visible", True)),
+                fields=["-like_count", "-created_at", "-id"],
+                name="story_visible_like_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="story",
+            index=models.Index(
+                condition=models.Q(("is_published", True), ("is_visible", True)),
+                fields=["author", "-created_at"],
+                name="story_visible_author_idx",
+            ),
+        ),
+    ]
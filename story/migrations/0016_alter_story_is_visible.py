@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("story", "0015_story_is_visible"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="story",
+            name="is_visible",
+            field=models.BooleanField(default=True, verbose_name="공개 여부"),
+        ),
+    ]
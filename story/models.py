@@ -1,5 +1,105 @@
-from django.db import models
+import hashlib
+import mimetypes
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Prefetch, Q, Value, When
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+# 대표 문단 요약의 최대 길이
+COVER_EXCERPT_LENGTH = 255
+
+# 목록(피드)에 보이는 스토리 조건 (출판 완료, 싫어요가 많아 숨겨지지 않은 스토리)
+# 부분 인덱스의 조건으로도 사용하므로, 조회는 visible()로 해야 인덱스를 사용합니다.
+VISIBLE_STORY = Q(is_published=True, is_visible=True)
+
+
+class StoryQuerySet(models.QuerySet):
+    def published(self):
+        """출판이 완료된 스토리만 조회합니다. (비동기 출판 중인 스토리 제외)"""
+        return self.filter(is_published=True)
+
+    def visible(self):
+        """목록(피드)에 보이는 스토리만 조회합니다. (출판 완료, 숨겨지지 않은 스토리)"""
+        return self.filter(VISIBLE_STORY)
+
+    def for_feed(self):
+        """
+        목록(피드) 직렬화에 필요한 관계를 한 번에 불러옵니다.
+
+        - 작성자는 JOIN으로 함께 가져옵니다.
+        - 좋아요 한 사용자는 id만 가져옵니다.
+        - 대표 이미지와 문단 요약은 Story에 저장되어 있으므로 Content는 조회하지 않습니다.
+        페이지 크기와 관계없이 쿼리 수가 일정합니다.
+        """
+        return self.select_related("author").prefetch_related(
+            Prefetch("like", queryset=get_user_model().objects.only("id")),
+        )
+
+    def toggle_reaction(self, story_id, user_id, relation, counter):
+        """
+        좋아요/싫어요(relation)를 토글하고 개수(counter) 컬럼만 원자적으로 갱신합니다.
+
+        - 중간 테이블의 (story, user) unique 인덱스로 존재 여부를 확인합니다.
+        - 개수는 F() 조건부 UPDATE로 갱신하므로 동시 요청에도 유실되지 않습니다.
+        - 싫어요 개수가 STORY_HIDE_HATE_THRESHOLD를 넘나들면 같은 UPDATE에서 공개 여부도 바꿉니다.
+        - (추가 여부, 갱신된 개수)를 반환합니다.
+        """
+        through = getattr(self.model, relation).through
+        with transaction.atomic():
+            deleted, _ = through.objects.filter(
+                story_id=story_id, user_id=user_id
+            ).delete()
+            if deleted:
+                added = False
+                self.filter(pk=story_id, **{f"{counter}__gt": 0}).update(
+                    **self._counter_changes(counter, -1)
+                )
+            else:
+                added = True
+                try:
+                    with transaction.atomic():
+                        through.objects.create(story_id=story_id, user_id=user_id)
+                except IntegrityError:
+                    # 같은 사용자의 동시 요청이 먼저 추가한 경우 개수는 이미 반영되어 있습니다.
+                    pass
+                else:
+                    self.filter(pk=story_id).update(**self._counter_changes(counter, 1))
+            count = self.filter(pk=story_id).values_list(counter, flat=True).get()
+        return added, count
+
+    def remove_reactions_of(self, user_id):
+        """
+        탈퇴하는 사용자가 남긴 좋아요/싫어요를 스토리의 개수에서 뺍니다.
+
+        - toggle_reaction과 같은 F() 조건부 UPDATE로 갱신하므로 동시 요청의 변경을 덮어쓰지 않습니다.
+        - (좋아요 한 스토리 id 목록, 싫어요 한 스토리 id 목록)을 반환합니다.
+        """
+        reactions = []
+        with transaction.atomic():
+            for relation, counter in [("like", "like_count"), ("hate", "hate_count")]:
+                story_ids = list(
+                    self.filter(**{relation: user_id}).values_list("id", flat=True)
+                )
+                self.filter(id__in=story_ids, **{f"{counter}__gt": 0}).update(
+                    **self._counter_changes(counter, -1)
+                )
+                reactions.append(story_ids)
+        return tuple(reactions)
+
+    def _counter_changes(self, counter, delta):
+        changes = {counter: F(counter) + delta}
+        if counter == "hate_count":
+            # UPDATE 문의 우변은 변경 전 값으로 계산되므로 delta만큼 기준을 옮겨 비교합니다.
+            changes["is_visible"] = Case(
+                When(
+                    hate_count__lt=settings.STORY_HIDE_HATE_THRESHOLD - delta,
+                    then=Value(True),
+                ),
+                default=Value(False),
+            )
+        return changes
 
 
 class Story(models.Model):
@@ -14,6 +114,15 @@ class Story(models.Model):
     - bookmark : 스토리를 북마크 한 사용자와의 관계입니다.
     - created_at : 스토리가 작성된 일자 및 시간입니다.
         - 스토리가 작성된 시간을 자동으로 저장하도록 설정합니다.
+    - cover_image : 목록에 보여줄 대표 이미지 경로입니다.
+        - 이미지가 있는 첫 번째 문단의 이미지를 저장합니다. (refresh_cover)
+    - cover_excerpt : 목록에 보여줄 대표 문단 요약입니다.
+    - cover_variants : 대표 이미지의 썸네일 및 WebP 이미지 경로입니다.
+    - is_published : 출판 완료 여부입니다.
+        - 비동기 출판 중인 스토리는 False이며, 목록과 상세 페이지에서 보이지 않습니다.
+    - is_visible : 공개 여부입니다.
+        - 싫어요가 STORY_HIDE_HATE_THRESHOLD개 이상이면 False가 되며, 목록에서 보이지 않고
+          상세 페이지는 관리자만 열람할 수 있습니다.
     """
 
     author = models.ForeignKey(
@@ -41,13 +150,55 @@ class Story(models.Model):
         blank=True,
     )
     created_at = models.DateTimeField("생성시각", auto_now_add=True)
+    cover_image = models.ImageField("대표 이미지", max_length=255, blank=True)
+    cover_excerpt = models.CharField("대표 문단 요약", max_length=255, blank=True)
+    cover_variants = models.JSONField("대표 이미지 변환본", default=dict, blank=True)
+    is_published = models.BooleanField("출판 여부", default=True)
+    is_visible = models.BooleanField("공개 여부", default=True)
+
+    objects = StoryQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    def refresh_cover(self):
+        """이미지가 있는 첫 번째 문단으로 대표 이미지와 문단 요약을 갱신합니다."""
+        cover = self.contents.exclude(image="").order_by("id").first()
+        if cover is None:
+            self.cover_image = ""
+            self.cover_excerpt = ""
+            self.cover_variants = {}
+        else:
+            self.cover_image = cover.image.name
+            self.cover_excerpt = cover.paragraph[:COVER_EXCERPT_LENGTH]
+            self.cover_variants = cover.image_variants
+        self.save(update_fields=["cover_image", "cover_excerpt", "cover_variants"])
+
     class Meta:
         db_table = "story"
         verbose_name_plural = "stories"
+        # 피드 조회 형태에 맞춘 인덱스입니다. (python manage.py check_query_plans로 확인)
+        # 보이는 스토리만 담는 부분 인덱스이며, 부분 인덱스를 지원하지 않는 DB에서는 생성되지 않습니다.
+        indexes = [
+            # 최신순 피드 (페이지 번호/커서 방식)
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=VISIBLE_STORY,
+                name="story_visible_latest_idx",
+            ),
+            # 좋아요순 피드(커서 방식) 및 좋아요 순위 재계산
+            models.Index(
+                fields=["-like_count", "-created_at", "-id"],
+                condition=VISIBLE_STORY,
+                name="story_visible_like_idx",
+            ),
+            # 마이페이지의 내 스토리 목록
+            models.Index(
+                fields=["author", "-created_at"],
+                condition=VISIBLE_STORY,
+                name="story_visible_author_idx",
+            ),
+        ]
 
 
 def story_image_upload_path(instance, filename):
@@ -62,6 +213,7 @@ class Content(models.Model):
     - story : 게시글입니다.
     - paragraph : 게시글 내용의 문단입니다.
     - image : 해당 문단의 이미지입니다.
+    - image_variants : 해당 문단 이미지의 썸네일 및 WebP 이미지 경로입니다.
 
     """
 
@@ -69,7 +221,10 @@ class Content(models.Model):
         Story, verbose_name="스토리", on_delete=models.CASCADE, related_name="contents"
     )
     paragraph = models.TextField("문단")
-    image = models.ImageField("문단 이미지", upload_to=story_image_upload_path, blank=True)
+    image = models.ImageField(
+        "문단 이미지", upload_to=story_image_upload_path, blank=True
+    )
+    image_variants = models.JSONField("문단 이미지 변환본", default=dict, blank=True)
 
     class Meta:
         db_table = "content"
@@ -96,3 +251,277 @@ class Comment(models.Model):
 
     class Meta:
         db_table = "comment"
+
+
+class TranslationCache(models.Model):
+    """
+    DeepL 번역 결과를 저장하는 캐시입니다.
+
+    - source_hash : 대상 언어와 원문을 합친 문자열의 sha256 해시입니다.
+    - target_lang : 번역 대상 언어 코드입니다.
+    - translated_text : 번역된 문장입니다.
+    - created_at : 번역 결과가 저장된 시각입니다.
+        - TRANSLATION_CACHE_TTL이 지난 번역은 사용하지 않으며, 주기적으로 삭제합니다.
+    """
+
+    source_hash = models.CharField("원문 해시", max_length=64, unique=True)
+    target_lang = models.CharField("대상 언어", max_length=10)
+    translated_text = models.TextField("번역문")
+    created_at = models.DateTimeField("생성시각", auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "translation_cache"
+
+
+def stored_image_path(sha256, content_type):
+    """해시로 결정되는 이미지 저장 경로입니다. (story/images/ab/abcdef....png)"""
+    extension = mimetypes.guess_extension(content_type or "") or ".jpg"
+    return f"story/images/{sha256[:2]}/{sha256}{extension}"
+
+
+class StoredImageManager(models.Manager):
+    """이미지 파일을 내용 해시 기준으로 한 번만 저장하고 참조 개수를 관리하는 클래스입니다."""
+
+    def store(self, image_file):
+        """
+        이미지를 저장하고 StoredImage를 반환합니다.
+        같은 내용의 이미지가 이미 저장되어 있으면 파일을 쓰지 않고 참조 개수만 늘립니다.
+        """
+        sha256 = getattr(image_file, "sha256", None)
+        if sha256 is None:
+            digest = hashlib.sha256()
+            for chunk in image_file.chunks():
+                digest.update(chunk)
+            sha256 = digest.hexdigest()
+
+        if self.filter(sha256=sha256).update(ref_count=F("ref_count") + 1):
+            return self.get(sha256=sha256)
+
+        image_file.seek(0)
+        name = default_storage.save(
+            stored_image_path(sha256, getattr(image_file, "content_type", None)),
+            image_file,
+        )
+        try:
+            with transaction.atomic():
+                return self.create(sha256=sha256, image=name, ref_count=1)
+        except IntegrityError:
+            # 같은 이미지가 동시에 저장된 경우 먼저 저장된 파일을 사용합니다.
+            default_storage.delete(name)
+            self.filter(sha256=sha256).update(ref_count=F("ref_count") + 1)
+            return self.get(sha256=sha256)
+
+    def release(self, image_name):
+        """
+        이미지 참조를 하나 줄입니다.
+        더 이상 참조하는 문단이 없으면 삭제하고 (이미지 경로, 변환본)을 반환합니다.
+        """
+        with transaction.atomic():
+            self.filter(image=image_name, ref_count__gt=0).update(
+                ref_count=F("ref_count") - 1
+            )
+            orphan = self.filter(image=image_name, ref_count=0).first()
+            if orphan is None:
+                return None
+            # 그사이 같은 이미지를 저장해(store) 참조 개수가 다시 늘었으면 삭제하지 않습니다.
+            deleted, _ = self.filter(pk=orphan.pk, ref_count=0).delete()
+            if not deleted:
+                return None
+        return orphan.image.name, orphan.variants
+
+
+class StoredImage(models.Model):
+    """
+    내용 해시로 저장된 문단 이미지입니다.
+
+    - sha256 : 이미지 파일 내용의 sha256 해시입니다.
+    - image : 해시로 결정된 이미지 저장 경로입니다.
+    - variants : 썸네일 및 WebP 이미지 경로입니다.
+    - ref_count : 이 이미지를 사용하는 문단(Content)의 개수입니다.
+        - 0이 되면 이미지와 변환본 파일을 함께 삭제합니다.
+    """
+
+    sha256 = models.CharField("이미지 해시", max_length=64, unique=True)
+    image = models.ImageField("이미지", max_length=255, db_index=True)
+    variants = models.JSONField("이미지 변환본", default=dict, blank=True)
+    ref_count = models.PositiveIntegerField("참조 개수", default=0)
+    created_at = models.DateTimeField("생성시각", auto_now_add=True)
+
+    objects = StoredImageManager()
+
+    class Meta:
+        db_table = "stored_image"
+
+
+# 전체 스토리 순위의 scope 이름 (국가별 순위는 국가 이름을 scope로 사용합니다.)
+RANKING_GLOBAL_SCOPE = "global"
+
+
+class StoryRankingManager(models.Manager):
+    """좋아요 순 상위 스토리 목록을 scope(전체/국가)별로 미리 계산해 두는 클래스입니다."""
+
+    ordering = ("-like_count", "-created_at", "-story_id")
+
+    def scopes(self):
+        """전체 순위와 사용자 출신 국가(COUNTRY_CHOICES)별 순위의 scope 목록입니다."""
+        countries = get_user_model()._meta.get_field("country").choices
+        return [RANKING_GLOBAL_SCOPE] + [value for value, _ in countries if value]
+
+    def candidates(self, scope):
+        """scope 순위에 들어갈 수 있는 스토리입니다. (목록에 보이는 스토리)"""
+        stories = Story.objects.visible()
+        if scope != RANKING_GLOBAL_SCOPE:
+            stories = stories.filter(author__country=scope)
+        return stories
+
+    def rebuild(self, scope):
+        """scope 순위를 처음부터 다시 계산합니다."""
+        top = self.candidates(scope).order_by("-like_count", "-created_at", "-id")
+        rankings = [
+            self.model(
+                scope=scope,
+                story_id=story_id,
+                like_count=like_count,
+                created_at=created_at,
+            )
+            for story_id, like_count, created_at in top.values_list(
+                "id", "like_count", "created_at"
+            )[: settings.STORY_RANKING_SIZE]
+        ]
+        with transaction.atomic():
+            self.filter(scope=scope).delete()
+            self.bulk_create(rankings)
+        # 비어 있는 scope도 계산을 마친 것으로 기록해, 조회할 때마다 다시 계산하지 않게 합니다.
+        transaction.on_commit(lambda: cache.set(self._built_key(scope), True, None))
+        return len(rankings)
+
+    def _built_key(self, scope):
+        return f"story_ranking:built:{scope}"
+
+    def is_built(self, scope):
+        """scope 순위를 한 번이라도 계산했는지 확인합니다."""
+        if cache.get(self._built_key(scope)):
+            return True
+        if self.filter(scope=scope).exists():
+            cache.set(self._built_key(scope), True, None)
+            return True
+        return False
+
+    def rebuild_all(self):
+        return {scope: self.rebuild(scope) for scope in self.scopes()}
+
+    def refresh_story(self, story_id):
+        """
+        좋아요/싫어요 개수나 출판 상태가 바뀐 스토리의 순위만 갱신합니다.
+
+        - 순위에 들어갈 수 있으면 개수를 반영(upsert)하고 상위 STORY_RANKING_SIZE개만 남깁니다.
+        - 순위에서 빠져야 하거나 순위 맨 끝으로 내려가면, 순위 밖의 스토리가 대신 들어올 수
+          있으므로 해당 scope를 다시 계산합니다.
+        """
+        story = (
+            Story.objects.filter(pk=story_id)
+            .values("is_published", "is_visible", "like_count", "created_at")
+            .annotate(country=F("author__country"))
+            .first()
+        )
+        eligible = story is not None and story["is_published"] and story["is_visible"]
+        scopes = [RANKING_GLOBAL_SCOPE]
+        if eligible and story["country"]:
+            scopes.append(story["country"])
+
+        with transaction.atomic():
+            stale_scopes = set(
+                self.filter(story_id=story_id)
+                .exclude(scope__in=scopes if eligible else [])
+                .values_list("scope", flat=True)
+            )
+            self.filter(story_id=story_id, scope__in=stale_scopes).delete()
+            if eligible:
+                self.bulk_create(
+                    [
+                        self.model(
+                            scope=scope,
+                            story_id=story_id,
+                            like_count=story["like_count"],
+                            created_at=story["created_at"],
+                        )
+                        for scope in scopes
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["scope", "story"],
+                    update_fields=["like_count", "created_at"],
+                )
+                for scope in scopes:
+                    if self._trim(scope, story_id):
+                        stale_scopes.add(scope)
+
+        for scope in stale_scopes:
+            self.rebuild(scope)
+
+    def _trim(self, scope, story_id):
+        # 상위 STORY_RANKING_SIZE개를 넘는 순위를 삭제하고,
+        # story_id가 꽉 찬 순위의 맨 끝(또는 밖)에 있으면 True를 반환합니다.
+        size = settings.STORY_RANKING_SIZE
+        ranked = list(
+            self.filter(scope=scope)
+            .order_by(*self.ordering)
+            .values_list("story_id", flat=True)[: size + 1]
+        )
+        if len(ranked) < size:
+            return False
+        if len(ranked) > size:
+            self.filter(
+                scope=scope,
+                pk__in=self.filter(scope=scope)
+                .order_by(*self.ordering)
+                .values_list("pk", flat=True)[size:],
+            ).delete()
+        return story_id in ranked[size - 1 :]
+
+    def top_stories(self, scope, limit):
+        """scope 순위의 상위 limit개 스토리를 목록(피드) 조회용으로 반환합니다."""
+        if scope not in self.scopes():
+            return Story.objects.none()
+        if not self.is_built(scope):
+            # 아직 계산되지 않은 scope는 처음 조회할 때 계산합니다.
+            self.rebuild(scope)
+        return (
+            Story.objects.visible()
+            .filter(rankings__scope=scope)
+            .order_by("-like_count", "-created_at", "-id")
+            .for_feed()[:limit]
+        )
+
+
+class StoryRanking(models.Model):
+    """
+    좋아요 순 상위 스토리 순위입니다.
+
+    - scope : 순위 범위입니다. 전체는 "global", 국가별 순위는 국가 이름입니다.
+    - story : 순위에 포함된 스토리입니다.
+    - like_count, created_at : 순위를 정하는 스토리의 좋아요 개수와 작성 시각입니다.
+        - 좋아요/싫어요가 바뀔 때 갱신하며(refresh_story), 주기적으로 전체를 다시 계산합니다.
+    """
+
+    scope = models.CharField("순위 범위", max_length=50)
+    story = models.ForeignKey(
+        Story, verbose_name="스토리", on_delete=models.CASCADE, related_name="rankings"
+    )
+    like_count = models.PositiveIntegerField("좋아요 개수", default=0)
+    created_at = models.DateTimeField("생성시각")
+
+    objects = StoryRankingManager()
+
+    class Meta:
+        db_table = "story_ranking"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "story"], name="story_ranking_scope_story_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["scope", "-like_count", "-created_at"],
+                name="story_ranking_order_idx",
+            ),
+        ]
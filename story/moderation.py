@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+
+from .ai_func import check_toxicity as request_toxicity
+
+# 로깅 설정
+logging.config.dictConfig(settings.LOGGING)
+
+# 로거 가져오기
+info_logger = logging.getLogger("info_logger")
+
+# 금지어가 포함된 문장의 점수 (Perspective API 최고 점수와 같습니다.)
+BLOCKED_SCORE = 1.0
+
+
+def moderation_key(text):
+    """검사할 문장으로 캐시 키(sha256)를 만듭니다."""
+    return "moderation:" + hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_blocklist(path):
+    """
+    금지어 파일을 읽어 하나의 정규식으로 컴파일합니다.
+    빈 줄과 #으로 시작하는 줄은 무시하며, 금지어가 없으면 None을 반환합니다.
+    """
+    try:
+        with open(path, encoding="utf-8") as blocklist_file:
+            words = {
+                line.strip().casefold()
+                for line in blocklist_file
+                if line.strip() and not line.lstrip().startswith("#")
+            }
+    except FileNotFoundError:
+        return None
+    if not words:
+        return None
+    # 긴 문구를 먼저 시도하도록 정렬합니다.
+    alternation = "|".join(
+        re.escape(word) for word in sorted(words, key=len, reverse=True)
+    )
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+class ToxicityChecker:
+    """
+    Perspective API 폭력성 검사 결과를 재사용하는 검사기입니다.
+
+    - 금지어가 포함된 문장은 API 호출 없이 바로 최고 점수로 처리합니다.
+    - 이미 검사한 짧은 문장 중 기준 점수 이하였던 문장은 프로세스 메모리에서 바로 반환합니다.
+    - 그 외 문장은 공유 캐시 -> Perspective API 순서로 조회하며, 결과는 ttl 동안 캐시합니다.
+    """
+
+    def __init__(self, blocklist_path, ttl, short_text_length, short_text_cache_size):
+        self.blocklist_path = blocklist_path
+        self.ttl = ttl
+        self.short_text_length = short_text_length
+        self.short_text_cache_size = short_text_cache_size
+        self._lock = threading.Lock()
+        self._blocklist = None
+        self._blocklist_loaded = False
+        self._clean_short_texts = OrderedDict()
+        self._stats = {
+            "blocklist_hits": 0,
+            "short_text_hits": 0,
+            "cache_hits": 0,
+            "perspective_calls": 0,
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    @property
+    def blocklist(self):
+        # 금지어 목록은 처음 사용할 때 한 번만 읽어 컴파일합니다.
+        if not self._blocklist_loaded:
+            with self._lock:
+                if not self._blocklist_loaded:
+                    self._blocklist = load_blocklist(self.blocklist_path)
+                    self._blocklist_loaded = True
+        return self._blocklist
+
+    def _remember_clean(self, text, pers_score):
+        with self._lock:
+            self._clean_short_texts[text] = pers_score
+            self._clean_short_texts.move_to_end(text)
+            while len(self._clean_short_texts) > self.short_text_cache_size:
+                self._clean_short_texts.popitem(last=False)
+
+    def _known_clean_score(self, text):
+        with self._lock:
+            pers_score = self._clean_short_texts.get(text)
+            if pers_score is not None:
+                self._clean_short_texts.move_to_end(text)
+            return pers_score
+
+    def _local_score(self, text):
+        # 네트워크/캐시 조회 없이 판단할 수 있으면 점수를, 아니면 None을 반환합니다.
+        if len(text) <= self.short_text_length:
+            pers_score = self._known_clean_score(text)
+            if pers_score is not None:
+                self._count("short_text_hits")
+                return pers_score
+
+        blocklist = self.blocklist
+        if blocklist is not None and blocklist.search(text.casefold()):
+            self._count("blocklist_hits")
+            info_logger.info(
+                "금지어가 포함되어 Perspective API 호출 없이 거절했습니다."
+            )
+            return BLOCKED_SCORE
+        return None
+
+    def _remember(self, text, pers_score, threshold):
+        if len(text) <= self.short_text_length and pers_score <= threshold:
+            self._remember_clean(text, pers_score)
+
+    def score(self, pers_client, text, threshold):
+        """text의 폭력성 점수를 반환합니다. threshold 이하인 짧은 문장은 프로세스에 기억합니다."""
+        text = str(text)
+        pers_score = self._local_score(text)
+        if pers_score is not None:
+            return pers_score
+
+        key = moderation_key(text)
+        pers_score = cache.get(key)
+        if pers_score is not None:
+            self._count("cache_hits")
+        else:
+            self._count("perspective_calls")
+            pers_score = request_toxicity(pers_client, text)
+            cache.set(key, pers_score, self.ttl)
+
+        self._remember(text, pers_score, threshold)
+        return pers_score
+
+    async def ascore(self, request_score, text, threshold):
+        """
+        score의 비동기 버전입니다.
+        request_score(text)는 Perspective API 점수를 반환하는 코루틴 함수입니다.
+        """
+        text = str(text)
+        pers_score = self._local_score(text)
+        if pers_score is not None:
+            return pers_score
+
+        key = moderation_key(text)
+        pers_score = await cache.aget(key)
+        if pers_score is not None:
+            self._count("cache_hits")
+        else:
+            self._count("perspective_calls")
+            pers_score = await request_score(text)
+            await cache.aset(key, pers_score, self.ttl)
+
+        self._remember(text, pers_score, threshold)
+        return pers_score
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        avoided = (
+            stats["blocklist_hits"] + stats["short_text_hits"] + stats["cache_hits"]
+        )
+        total = avoided + stats["perspective_calls"]
+        stats["avoided_calls"] = avoided
+        stats["avoided_ratio"] = avoided / total if total else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._clean_short_texts.clear()
+            self._blocklist = None
+            self._blocklist_loaded = False
+            self._stats = {key: 0 for key in self._stats}
+
+
+toxicity_checker = ToxicityChecker(
+    settings.MODERATION_BLOCKLIST_PATH,
+    settings.MODERATION_CACHE_TTL,
+    settings.MODERATION_SHORT_TEXT_LENGTH,
+    settings.MODERATION_SHORT_TEXT_CACHE_SIZE,
+)
+
+
+def check_toxicity(pers_client, check_toxicity_str, threshold):
+    """캐시와 금지어 검사를 거쳐 폭력성 점수를 반환합니다."""
+    return toxicity_checker.score(pers_client, check_toxicity_str, threshold)
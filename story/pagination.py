@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import datetime
+from django.db.models import Q
+
+# 최신순 피드 정렬 기준 (커서 페이지네이션의 키로 사용합니다.)
+LATEST_ORDERING = ("-created_at", "-id")
+# 좋아요순 피드 정렬 기준
+LIKE_ORDERING = ("-like_count", "-created_at", "-id")
+
+
+class InvalidCursor(ValueError):
+    """잘못된 커서 토큰이 전달되었을 때 발생하는 예외입니다."""
+
+
+def encode_cursor(values):
+    """정렬 키 값 목록을 불투명한(opaque) 커서 토큰으로 변환합니다."""
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _parse_int(value):
+    # bool은 int의 하위 타입이므로 따로 거릅니다.
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(value)
+    return value
+
+
+def _parse_datetime(value):
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return datetime.fromisoformat(value)
+
+
+# 정렬 키 필드별 커서 값 변환 함수
+CURSOR_FIELD_PARSERS = {
+    "created_at": _parse_datetime,
+    "like_count": _parse_int,
+    "id": _parse_int,
+}
+
+
+def decode_cursor(token, ordering):
+    """
+    커서 토큰을 정렬 키 값 목록으로 되돌립니다.
+    각 값은 ordering의 필드 타입으로 변환하며, 변환할 수 없으면 InvalidCursor가 발생합니다.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(token) from e
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor(token)
+    try:
+        return [
+            CURSOR_FIELD_PARSERS[field.lstrip("-")](value)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(token) from e
+
+
+def keyset_filter(ordering, values):
+    """
+    내림차순 정렬 키 (f1, f2, ...)에서 (v1, v2, ...) 다음 행들을 찾는 조건을 만듭니다.
+    (f1 < v1) OR (f1 = v1 AND f2 < v2) OR ...
+    """
+    fields = [field.lstrip("-") for field in ordering]
+    condition = Q()
+    for i, field in enumerate(fields):
+        clause = Q(**{f"{field}__lt": values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev_field: prev_value})
+        condition |= clause
+    return condition
+
+
+def paginate_by_cursor(queryset, ordering, cursor, per_page):
+    """
+    OFFSET과 COUNT(*) 없이 정렬 키를 기준으로 다음 페이지를 조회합니다.
+
+    - cursor : 이전 페이지 응답의 next_cursor 입니다. 없으면 첫 페이지를 조회합니다.
+    - (현재 페이지 객체 목록, 다음 페이지 커서 또는 None)을 반환합니다.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(
+            keyset_filter(ordering, decode_cursor(cursor, ordering))
+        )
+
+    # 다음 페이지 존재 여부를 알기 위해 한 개를 더 조회합니다.
+    items = list(queryset[: per_page + 1])
+    if len(items) <= per_page:
+        return items, None
+
+    items = items[:per_page]
+    last = items[-1]
+    next_cursor = encode_cursor(
+        [getattr(last, field.lstrip("-")) for field in ordering]
+    )
+    return items, next_cursor
@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.conf import settings
+from django.db import connections
+from rest_framework import status
+from rest_framework.response import Response
+
+from .ai_func import (
+    translate_text,
+    generate_images_from_text,
+    load_deepl_model,
+    load_open_ai_model,
+    load_pers_model,
+    open_gpt_stream,
+    run_gpt,
+    setup_gpt_messages,
+)
+from .ai_async import (
+    acheck_toxicity,
+    agenerate_images_from_text,
+    arun_gpt,
+    atranslate_text,
+)
+from .backoff import ProviderUnavailable
+from .moderation import check_toxicity
+
+# 로깅 설정
+logging.config.dictConfig(settings.LOGGING)
+
+# 로거 가져오기
+info_logger = logging.getLogger("info_logger")
+
+# 폭력성 검출 기준 점수
+TOXICITY_THRESHOLD = 0.3
+
+# 동화 생성 단계 (작업 진행 상황 조회 시 사용합니다.)
+STAGE_TRANSLATING = "translating"
+STAGE_MODERATING = "moderating"
+STAGE_GENERATING = "generating"
+STAGE_TRANSLATING_BACK = "translating_back"
+
+# 스트리밍 응답에서 문장의 끝으로 보는 위치 (문장 부호 + 공백, 또는 줄바꿈)
+SENTENCE_BOUNDARY = re.compile(r"[.!?][\"'”’)\]]*\s+|\n+")
+
+# 티켓 종류별 DALL-E 모델 및 이미지 품질
+IMAGE_TICKET_OPTIONS = {
+    "golden_ticket": ("dall-e-3", "hd"),
+    "silver_ticket": ("dall-e-3", "standard"),
+    "pink_ticket": ("dall-e-2", "standard"),
+}
+
+
+class FairytailPipelineError(Exception):
+    """동화 생성 도중 사용자에게 그대로 전달할 오류가 발생했을 때 사용하는 예외입니다."""
+
+    def __init__(self, data, status_code):
+        super().__init__(data.get("error", ""))
+        self.data = data
+        self.status_code = status_code
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(dict(response.data), response.status_code)
+
+
+def _raise_for_response(result):
+    # ai_func의 함수들은 실패 시 Response 객체를 반환합니다.
+    if isinstance(result, Response):
+        raise FairytailPipelineError.from_response(result)
+    return result
+
+
+def _translate_subject(subject, deepl_translator, pers_client, report):
+    """주제를 영어로 번역하고 폭력성을 검사한 뒤, 번역 결과를 반환합니다."""
+    # Deepl을 사용하여 User에게 받은 질문 영어로 번역하기
+    report(STAGE_TRANSLATING)
+    trans_result = _raise_for_response(translate_text(deepl_translator, subject))
+
+    # 번역된 값 형변환 'deepl.api_data.TextResult' -> 'str'
+    trans_str_result = str(trans_result)
+
+    # Perspective API 사용하여 User가 입력한 질문에서 폭력성 검출하기
+    report(STAGE_MODERATING)
+    _check_subject_score(_toxicity_score(pers_client, trans_str_result))
+    return trans_result
+
+
+def _toxicity_score(pers_client, text):
+    # 장애로 Perspective API를 호출하지 못하면 사용자에게 그대로 전달합니다.
+    try:
+        return check_toxicity(pers_client, text, TOXICITY_THRESHOLD)
+    except ProviderUnavailable as e:
+        raise FairytailPipelineError(e.data, e.status_code) from e
+
+
+async def _atoxicity_score(text):
+    try:
+        return await acheck_toxicity(text, TOXICITY_THRESHOLD)
+    except ProviderUnavailable as e:
+        raise FairytailPipelineError(e.data, e.status_code) from e
+
+
+def _check_subject_score(pers_user_score):
+    # 폭력성 수치를 넘으면 다시 입력하게 하기
+    if pers_user_score > TOXICITY_THRESHOLD:
+        info_logger.info(
+            f"입력한 문장에서 폭력성이 검출되었습니다. 점수 : {pers_user_score}"
+        )
+        raise FairytailPipelineError(
+            {
+                "status": "400",
+                "error": "주제에서 폭력성이 검출되어 동화 생성이 불가능합니다. 주제를 수정해주세요.",
+            },
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+def _check_gpt_response(pers_client, gpt_response):
+    """Perspective API 사용하여 GPT가 답변한 내용에서 폭력성 검출하기"""
+    _check_gpt_score(_toxicity_score(pers_client, gpt_response))
+
+
+def _check_gpt_score(pers_gpt_score):
+    if pers_gpt_score > TOXICITY_THRESHOLD:
+        info_logger.info(
+            f"GPT의 답변에서 폭력성이 검출되었습니다. 점수 : {pers_gpt_score}"
+        )
+        raise FairytailPipelineError(
+            {
+                "status": "400",
+                "error": "생성된 동화 내용에 폭력성이 검출되어 동화 생성이 불가능합니다. 주제를 수정해주세요.",
+            },
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class Stage:
+    """
+    run_stages로 실행할 파이프라인 단계입니다.
+
+    - func : requires에 적힌 단계들의 결과를 같은 이름의 키워드 인자로 받는 함수
+    - progress : 단계를 시작할 때 on_stage로 알릴 진행 단계 이름 (STAGE_*)
+    """
+
+    def __init__(self, name, func, requires=(), progress=None):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.progress = progress
+
+
+def _run_in_worker(func, kwargs):
+    try:
+        return func(**kwargs)
+    finally:
+        # 작업 스레드에서 연 DB 연결(번역/검사 캐시 조회)은 스레드와 함께 정리합니다.
+        connections.close_all()
+
+
+def run_stages(stages, on_stage=None):
+    """
+    의존 관계(requires)에 따라 단계들을 실행하고 {단계 이름: 결과}를 반환합니다.
+
+    필요한 단계가 모두 끝난 단계들은 동시에 실행하며, 실행할 단계가 하나뿐이면 호출한 스레드에서
+    바로 실행합니다. 한 단계라도 실패하면 진행 중인 다른 단계의 결과는 기다리지 않고 버린 뒤
+    그 예외를 그대로 발생시킵니다.
+    """
+    pending = {stage.name: stage for stage in stages}
+    results = {}
+    running = {}
+    executor = None
+
+    def start(stage):
+        del pending[stage.name]
+        if stage.progress is not None and on_stage is not None:
+            on_stage(stage.progress)
+        return {name: results[name] for name in stage.requires}
+
+    try:
+        while pending or running:
+            ready = [
+                stage
+                for stage in pending.values()
+                if all(name in results for name in stage.requires)
+            ]
+            if len(ready) == 1 and not running:
+                stage = ready[0]
+                results[stage.name] = stage.func(**start(stage))
+                continue
+
+            for stage in ready:
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=settings.PIPELINE_STAGE_WORKERS
+                    )
+                running[executor.submit(_run_in_worker, stage.func, start(stage))] = (
+                    stage.name
+                )
+            if not running:
+                raise ValueError(f"실행할 수 없는 단계가 있습니다 : {list(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def run_fairytail_pipeline(subject, target_language, on_stage=None):
+    """
+    DeepL -> Perspective -> GPT -> (Perspective, DeepL) 순서로 동화를 생성합니다.
+
+    GPT 답변의 폭력성 검사와 사용자 언어로의 번역은 서로 필요로 하지 않으므로 동시에 실행하고,
+    검사에 실패하면 번역 결과는 버립니다.
+    - on_stage : 단계가 바뀔 때마다 단계 이름을 인자로 호출되는 함수입니다.
+    - 생성된(번역된) 동화 문자열을 반환하며, 실패 시 FairytailPipelineError를 발생시킵니다.
+    """
+    # 모델 로드하기
+    deepl_translator = load_deepl_model()
+    openAI_client, chatGPT_model = load_open_ai_model()
+    pers_client = load_pers_model()
+
+    stages = [
+        # Deepl을 사용하여 User에게 받은 질문 영어로 번역하기
+        Stage(
+            "trans_result",
+            lambda: str(_raise_for_response(translate_text(deepl_translator, subject))),
+            progress=STAGE_TRANSLATING,
+        ),
+        # Perspective API 사용하여 User가 입력한 질문에서 폭력성 검출하기
+        Stage(
+            "subject_checked",
+            lambda trans_result: _check_subject_score(
+                _toxicity_score(pers_client, trans_result)
+            ),
+            requires=["trans_result"],
+            progress=STAGE_MODERATING,
+        ),
+        # GPT 메세지 설정 및 실행
+        Stage(
+            "gpt_response",
+            lambda trans_result, subject_checked: _raise_for_response(
+                run_gpt(openAI_client, chatGPT_model, setup_gpt_messages(trans_result))
+            ),
+            requires=["trans_result", "subject_checked"],
+            progress=STAGE_GENERATING,
+        ),
+        # Perspective API 사용하여 GPT가 답변한 내용에서 폭력성 검출하기
+        Stage(
+            "gpt_response_checked",
+            lambda gpt_response: _check_gpt_response(pers_client, gpt_response),
+            requires=["gpt_response"],
+            progress=STAGE_MODERATING,
+        ),
+    ]
+
+    # 사용자가 선택한 언어가 영어가 아니면 GPT 답변 내용 번역
+    if target_language != "EN-US":
+        stages.append(
+            Stage(
+                "gpt_trans_result",
+                lambda gpt_response: str(
+                    _raise_for_response(
+                        translate_text(deepl_translator, gpt_response, target_language)
+                    )
+                ),
+                requires=["gpt_response"],
+                progress=STAGE_TRANSLATING_BACK,
+            )
+        )
+
+    results = run_stages(stages, on_stage)
+    return results.get("gpt_trans_result", results["gpt_response"])
+
+
+def split_sentences(text):
+    """
+    text를 완성된 문장 부분과 아직 끝나지 않은 나머지로 나눕니다.
+    문장 부호(. ! ?) 뒤에 공백이 오거나 줄바꿈이 있는 곳을 문장의 끝으로 봅니다.
+    """
+    boundary = None
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        pass
+    if boundary is None:
+        return "", text
+    return text[: boundary.end()], text[boundary.end() :]
+
+
+def stream_fairytail_pipeline(subject, target_language, on_stage=None):
+    """
+    run_fairytail_pipeline의 스트리밍 버전입니다.
+
+    주제 번역/검사와 GPT 요청까지는 바로 실행하므로, 이 단계의 실패는 함수 호출 시
+    FairytailPipelineError로 발생합니다. 이후 GPT 답변을 문장 단위로 모아 폭력성을 검사하고
+    (필요하면 번역한 뒤) 차례로 내보내는 iterator를 반환합니다.
+    검사에 실패한 문장이 나오면 iterator가 FairytailPipelineError를 발생시키고 생성을 중단합니다.
+    """
+
+    def report(stage):
+        if on_stage is not None:
+            on_stage(stage)
+
+    # 모델 로드하기
+    deepl_translator = load_deepl_model()
+    openAI_client, chatGPT_model = load_open_ai_model()
+    pers_client = load_pers_model()
+
+    trans_result = _translate_subject(subject, deepl_translator, pers_client, report)
+
+    report(STAGE_GENERATING)
+    deltas = _raise_for_response(
+        open_gpt_stream(openAI_client, chatGPT_model, setup_gpt_messages(trans_result))
+    )
+
+    def emit(segment):
+        sentence = segment.strip()
+        if not sentence:
+            return segment
+        _check_gpt_response(pers_client, sentence)
+        if target_language != "EN-US":
+            sentence = str(
+                _raise_for_response(
+                    translate_text(deepl_translator, sentence, target_language)
+                )
+            )
+        # 문장 사이의 공백/줄바꿈은 그대로 유지합니다.
+        return sentence + segment[len(segment.rstrip()) :]
+
+    def iter_sentences():
+        pending = ""
+        try:
+            for delta in deltas:
+                pending += delta
+                completed, pending = split_sentences(pending)
+                if completed:
+                    yield emit(completed)
+            if pending:
+                yield emit(pending)
+        finally:
+            # 중간에 중단되면 GPT 스트림도 닫습니다.
+            close = getattr(deltas, "close", None)
+            if close is not None:
+                close()
+
+    return iter_sentences()
+
+
+def run_image_pipeline(script, ticket_type, on_stage=None):
+    """
+    동화 문단을 영어로 번역한 뒤 티켓 종류에 맞는 DALL-E 모델로 이미지를 생성합니다.
+    생성된 이미지 url을 반환하며, 실패 시 FairytailPipelineError를 발생시킵니다.
+    """
+
+    def report(stage):
+        if on_stage is not None:
+            on_stage(stage)
+
+    d_model, quality = IMAGE_TICKET_OPTIONS[ticket_type]
+
+    # Deepl을 사용하여 텍스트 번역
+    report(STAGE_TRANSLATING)
+    trans_script = _raise_for_response(translate_text(load_deepl_model(), script))
+
+    report(STAGE_GENERATING)
+    image_url = generate_images_from_text(trans_script, d_model, quality)
+    return _raise_for_response(image_url)
+
+
+async def arun_fairytail_pipeline(subject, target_language):
+    """run_fairytail_pipeline의 비동기 버전입니다. (ASGI 비동기 뷰에서 사용합니다.)"""
+    trans_str_result = str(_raise_for_response(await atranslate_text(subject)))
+    _check_subject_score(await _atoxicity_score(trans_str_result))
+
+    gpt_response = _raise_for_response(
+        await arun_gpt(setup_gpt_messages(trans_str_result))
+    )
+
+    # 사용자가 선택한 언어가 영어일 경우 번역 없이 반환
+    if target_language == "EN-US":
+        _check_gpt_score(await _atoxicity_score(gpt_response))
+        return gpt_response
+
+    # 폭력성 검사와 번역을 동시에 실행하고, 검사에 실패하면 번역은 취소합니다.
+    translation = asyncio.ensure_future(atranslate_text(gpt_response, target_language))
+    try:
+        _check_gpt_score(await _atoxicity_score(gpt_response))
+    except BaseException:
+        translation.cancel()
+        raise
+    return str(_raise_for_response(await translation))
+
+
+async def arun_image_pipeline(script, ticket_type):
+    """run_image_pipeline의 비동기 버전입니다. (ASGI 비동기 뷰에서 사용합니다.)"""
+    d_model, quality = IMAGE_TICKET_OPTIONS[ticket_type]
+    trans_script = _raise_for_response(await atranslate_text(script))
+    return _raise_for_response(
+        await agenerate_images_from_text(trans_script, d_model, quality)
+    )
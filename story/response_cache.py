@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+# 목록(최신순/좋아요순/국가별) 응답 전체의 버전 scope
+FEED_SCOPE = "feed"
+
+
+def story_scope(story_id):
+    """스토리 상세 응답의 버전 scope입니다."""
+    return f"story:{story_id}"
+
+
+def comments_scope(story_id):
+    """스토리 댓글 목록 응답의 버전 scope입니다."""
+    return f"comments:{story_id}"
+
+
+# 이벤트마다 무효화할 응답 scope
+# - 목록에는 좋아요 한 사용자가 포함되고, 싫어요가 많으면 목록에서 빠집니다.
+# - 상세에는 좋아요/싫어요 개수와 북마크 한 사용자가 포함됩니다.
+STORY_EVENT_SCOPES = {
+    "like": lambda story_id: [FEED_SCOPE, story_scope(story_id)],
+    "hate": lambda story_id: [FEED_SCOPE, story_scope(story_id)],
+    "bookmark": lambda story_id: [story_scope(story_id)],
+    "comment": lambda story_id: [comments_scope(story_id)],
+    "publish": lambda story_id: [FEED_SCOPE, story_scope(story_id)],
+    "delete": lambda story_id: [
+        FEED_SCOPE,
+        story_scope(story_id),
+        comments_scope(story_id),
+    ],
+}
+
+
+class ResponseCache:
+    """
+    공개 스토리 API의 응답 본문을 공유 캐시에 저장하는 클래스입니다.
+
+    - 캐시 키에는 응답이 의존하는 scope들의 버전이 포함됩니다.
+    - 좋아요/싫어요/북마크/댓글/출판/삭제 시 관련 scope의 버전만 올리면(invalidate),
+      이전 버전의 키는 더 이상 조회되지 않고 ttl이 지나면 사라집니다.
+    - 200 응답만 저장하며, 조회 결과는 응답별 hit/miss 통계로 기록합니다.
+    - 버전 키는 TieredCache의 프로세스 로컬 캐시(local)를 거치지 않고 shared에서만 읽고 씁니다.
+      (local에 남은 이전 버전으로 다른 프로세스가 무효화한 응답을 내보내지 않도록 합니다.)
+    - 버전은 shared의 add/incr로 갱신하므로, 프로세스 사이에서 원자적인 Redis가 필요합니다.
+      파일 캐시(CACHE_ALLOW_FILE_BASED)에서는 동시에 무효화하면 일부가 유실될 수 있습니다.
+    """
+
+    def __init__(self, ttl, prefix="response", backend=cache):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.cache = backend
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._invalidations = 0
+
+    @property
+    def version_cache(self):
+        return getattr(self.cache, "shared", self.cache)
+
+    def _version_key(self, scope):
+        return f"{self.prefix}:version:{scope}"
+
+    def versions(self, scopes):
+        keys = [self._version_key(scope) for scope in scopes]
+        version_cache = self.version_cache
+        versions = version_cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # 버전 키는 만료되지 않으며, 처음 사용할 때 현재 시각으로 시작합니다.
+                # (캐시가 비워진 뒤에도 이전 응답과 같은 버전이 되지 않습니다.)
+                version_cache.add(key, time.time_ns(), None)
+                versions[key] = version_cache.get(key)
+        return [versions[key] for key in keys]
+
+    def key(self, name, scopes, params):
+        """응답 이름, scope 버전, 요청 파라미터(page, cursor, 국가 등)로 캐시 키를 만듭니다."""
+        raw = json.dumps(
+            [self.versions(scopes), params], sort_keys=True, ensure_ascii=False
+        )
+        return f"{self.prefix}:{name}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def _count(self, name, hit):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def respond(self, name, scopes, params, build_response):
+        """
+        캐시된 응답 본문이 있으면 바로 Response로 반환하고,
+        없으면 build_response()로 응답을 만든 뒤 200 응답이면 저장합니다.
+        """
+        key = self.key(name, scopes, params)
+        data = self.cache.get(key)
+        if data is not None:
+            self._count(name, hit=True)
+            response = Response(data, status=status.HTTP_200_OK)
+            response["X-Cache"] = "HIT"
+            return response
+
+        self._count(name, hit=False)
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            self.cache.set(key, response.data, self.ttl)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def invalidate(self, *scopes):
+        version_cache = self.version_cache
+        for scope in scopes:
+            key = self._version_key(scope)
+            try:
+                version_cache.incr(key)
+            except ValueError:
+                version_cache.set(key, time.time_ns(), None)
+        with self._lock:
+            self._invalidations += len(scopes)
+
+    def story_changed(self, story_id, event):
+        """
+        스토리 이벤트(like, hate, bookmark, comment, publish, delete)에 영향을 받는 응답을 무효화합니다.
+        트랜잭션 안이면 커밋된 뒤에 한 번 더 무효화해, 커밋 전의 데이터로 다시 캐시된 응답을 버립니다.
+        """
+        scopes = STORY_EVENT_SCOPES[event](story_id)
+        self.invalidate(*scopes)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.invalidate(*scopes))
+
+    def stats(self):
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self._stats.items()}
+            invalidations = self._invalidations
+        for counts in stats.values():
+            total = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = counts["hits"] / total if total else 0.0
+        hits = sum(counts["hits"] for counts in stats.values())
+        total = hits + sum(counts["misses"] for counts in stats.values())
+        return {
+            "responses": stats,
+            "hit_ratio": hits / total if total else 0.0,
+            "invalidations": invalidations,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._stats = {}
+            self._invalidations = 0
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_TTL)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from story.models import Story, Content, Comment
+from story.models import Story, Content, Comment, StoredImage
 from user.models import User
+from story.images import variant_urls
 
 
 class StoryCreateSerializer(serializers.ModelSerializer):
@@ -16,15 +17,32 @@ class ContentCreateSerializer(serializers.ModelSerializer):
         model = Content
         fields = ["paragraph", "image"]
 
+    def create(self, validated_data):
+        # 이미지는 내용 해시로 한 번만 저장하고, 문단은 저장된 경로를 참조합니다.
+        image = validated_data.pop("image", None)
+        if image:
+            validated_data["image"] = StoredImage.objects.store(image).image.name
+        return super().create(validated_data)
+
 
 class ContentSerializer(serializers.ModelSerializer):
     content_id = serializers.CharField(source="id")
     story_image = serializers.ImageField(source="image")
+    story_image_variants = serializers.SerializerMethodField()
     story_id = serializers.CharField(source="story.id")
 
+    def get_story_image_variants(self, obj):
+        return variant_urls(obj.image_variants)
+
     class Meta:
         model = Content
-        fields = ["story_id", "content_id", "paragraph", "story_image"]
+        fields = [
+            "story_id",
+            "content_id",
+            "paragraph",
+            "story_image",
+            "story_image_variants",
+        ]
 
 
 class UserIdSerializer(serializers.ModelSerializer):
@@ -77,14 +95,13 @@ class StoryListSerializer(serializers.ModelSerializer):
         return user_data
 
     def get_content(self, obj):
-        contents_qs = obj.contents.all()
-
-        for content_obj in contents_qs:
-            if content_obj.image:
-                return {
-                    "story_paragraph": content_obj.paragraph,
-                    "story_image": content_obj.image.url,
-                }
+        # 대표 이미지와 문단 요약은 스토리 작성 시 Story에 함께 저장됩니다.
+        if obj.cover_image:
+            return {
+                "story_paragraph": obj.cover_excerpt,
+                "story_image": obj.cover_image.url,
+                "story_image_variants": variant_urls(obj.cover_variants),
+            }
 
     class Meta:
         model = Story
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from story.images import delete_image_files
+from story.models import Content, StoredImage, Story, StoryRanking
+from story.response_cache import response_cache
+
+
+@receiver(post_delete, sender=Content)
+def release_content_image(sender, instance, **kwargs):
+    """문단이 삭제되면 이미지 참조를 줄이고, 참조가 없는 이미지 파일을 삭제합니다."""
+    if not instance.image:
+        return
+
+    if StoredImage.objects.filter(image=instance.image.name).exists():
+        orphan = StoredImage.objects.release(instance.image.name)
+    else:
+        # 해시 저장 방식 이전에 문단마다 따로 저장된 이미지입니다.
+        orphan = (instance.image.name, instance.image_variants)
+
+    if orphan is not None:
+        transaction.on_commit(lambda: delete_image_files(*orphan))
+
+
+@receiver(pre_delete, sender=Story)
+def rebuild_rankings_of_deleted_story(sender, instance, **kwargs):
+    """순위에 있던 스토리가 삭제되면 빈자리를 채우도록 해당 순위를 다시 계산합니다."""
+    scopes = list(
+        StoryRanking.objects.filter(story=instance).values_list("scope", flat=True)
+    )
+    if scopes:
+        transaction.on_commit(
+            lambda: [StoryRanking.objects.rebuild(scope) for scope in scopes]
+        )
+
+
+@receiver(post_delete, sender=Story)
+def invalidate_deleted_story_responses(sender, instance, **kwargs):
+    """작성자 탈퇴로 함께 삭제되는 경우를 포함해, 삭제된 스토리가 담긴 캐시 응답을 무효화합니다."""
+    response_cache.story_changed(instance.id, "delete")
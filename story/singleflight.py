@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import re
+import threading
+import unicodedata
+import uuid
+import weakref
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s\W_]+|[\s\W_]+$")
+
+
+def normalize_subject(subject):
+    """
+    동화 주제를 비교하기 쉬운 형태로 정리합니다.
+
+    유니코드 정규화(NFKC), 대소문자 통일, 연속 공백 축약, 앞뒤 문장부호 제거를 적용하므로
+    "토끼와 거북이!"와 " 토끼와  거북이 "는 같은 주제로 취급합니다.
+    """
+    subject = unicodedata.normalize("NFKC", str(subject)).casefold()
+    subject = _WHITESPACE.sub(" ", subject)
+    return _EDGE_PUNCTUATION.sub("", subject)
+
+
+def fairytail_key(subject, target_language):
+    """정리한 주제와 대상 언어로 동화 생성 요청의 합치기 키를 만듭니다."""
+    normalized = f"{str(target_language).strip().upper()}\0{normalize_subject(subject)}"
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 실행으로 합칩니다.
+
+    먼저 들어온 호출(leader)만 함수를 실행하고, 실행 중에 같은 키로 들어온 호출은
+    그 결과(또는 예외)를 함께 받습니다. 실행이 끝나면 키를 비우므로 결과를 캐시하지는 않습니다.
+
+    같은 프로세스 안의 스레드끼리만 합쳐집니다. 워커 프로세스가 여러 개면 프로세스마다
+    한 번씩 실행될 수 있으므로, 프로세스 사이에서도 합치려면 coalesce_job을 사용합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key, func, *args, **kwargs):
+        """func(*args, **kwargs)의 결과를 반환합니다. 진행 중인 같은 키의 실행이 있으면 기다립니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+                leader = True
+
+        if leader:
+            try:
+                call.result = func(*args, **kwargs)
+            except BaseException as e:
+                # KeyboardInterrupt 등으로 중단되어도 기다리던 호출이 결과 없이 끝나지 않도록 합니다.
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+    def clear(self):
+        with self._lock:
+            self._stats = {key: 0 for key in self._stats}
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight의 asyncio 버전입니다. 같은 이벤트 루프 안에서 같은 키의 코루틴 실행을 합칩니다.
+    기다리던 요청 하나가 취소되어도(연결 종료) 나머지 요청을 위해 실행은 계속됩니다.
+    """
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key, func, *args, **kwargs):
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["executions"] += 1
+            task = calls[key] = asyncio.ensure_future(func(*args, **kwargs))
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self):
+        in_flight = sum(len(calls) for calls in self._calls.values())
+        return {**self._stats, "in_flight": in_flight}
+
+
+def coalesce_job(key, submit):
+    """
+    같은 키로 진행 중인 Celery 작업이 있으면 그 작업 id를, 없으면 새로 등록한 작업 id를 반환합니다.
+
+    프로세스가 여러 개여도 공유 캐시의 add로 한 요청만 작업을 등록합니다.
+    submit(task_id)는 주어진 task_id로 작업을 등록해야 합니다. 반환값은 (job_id, 새로 등록했는지)입니다.
+
+    공유 캐시의 add가 프로세스 사이에서 원자적인 Redis(CACHE_REDIS_URL)에서만 하나로 합쳐집니다.
+    파일 캐시(CACHE_ALLOW_FILE_BASED)의 add는 원자적이지 않아 동시에 들어온 요청이
+    각자 작업을 등록할 수 있으므로, 프로세스가 하나인 개발 환경에서만 사용합니다.
+    """
+    # 다른 프로세스의 등록을 바로 볼 수 있도록 프로세스 로컬 캐시를 거치지 않습니다.
+    shared = getattr(cache, "shared", cache)
+    cache_key = f"singleflight:{key}"
+    timeout = settings.FAIRYTAIL_COALESCE_TIMEOUT
+    job_id = str(uuid.uuid4())
+    if not shared.add(cache_key, job_id, timeout):
+        running_job_id = shared.get(cache_key)
+        if running_job_id is None:
+            # 확인하는 사이에 만료되었으면 한 번 더 등록을 시도합니다.
+            if not shared.add(cache_key, job_id, timeout):
+                return shared.get(cache_key), False
+        elif not AsyncResult(running_job_id).ready():
+            return running_job_id, False
+        else:
+            # 이전 작업이 끝났으면 새 작업으로 교체합니다.
+            # 끝난 작업마다 하나뿐인 교체 키를 add로 차지한 요청만 교체하므로,
+            # 동시에 들어온 요청들이 각자 작업을 등록하지 않습니다.
+            replace_key = f"{cache_key}:after:{running_job_id}"
+            if not shared.add(replace_key, job_id, timeout):
+                return shared.get(replace_key, running_job_id), False
+            shared.set(cache_key, job_id, timeout)
+    try:
+        submit(job_id)
+    except Exception:
+        # 등록하지 못한 작업 id를 남겨 두면 같은 주제의 요청이 계속 기다리게 됩니다.
+        shared.delete(cache_key)
+        raise
+    return job_id, True
+
+
+fairytail_flight = SingleFlight()
+async_fairytail_flight = AsyncSingleFlight()
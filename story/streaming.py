@@ -0,0 +1,53 @@
+import json
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+def sse_event(event, data):
+    """server-sent events 형식의 이벤트 하나를 문자열로 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accept: text/event-stream 요청을 처리하기 위한 renderer입니다.
+    스트림을 시작하기 전에 반환한 오류 응답은 error 이벤트 하나로 내보냅니다.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return sse_event("error", data).encode(self.charset)
+
+
+async def _iterate_in_thread(iterator):
+    # 동기 iterator를 한 조각씩 스레드에서 꺼내, ASGI 서버가 기다리지 않고 바로 전송하게 합니다.
+    iterator = iter(iterator)
+    finished = object()
+    while True:
+        chunk = await sync_to_async(next)(iterator, finished)
+        if chunk is finished:
+            break
+        yield chunk
+
+
+def event_stream_response(request, events):
+    """
+    events(이벤트 문자열 iterator)를 text/event-stream으로 스트리밍하는 응답을 만듭니다.
+
+    ASGI(yummy_yagi/asgi.py)로 실행 중이면 async iterator로 감싸서 보냅니다.
+    Django는 ASGI에서 동기 iterator를 받으면 전부 모은 뒤에 전송하기 때문입니다.
+    """
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        events = _iterate_in_thread(events)
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx 등 프록시가 응답을 모아서 보내지 않도록 합니다.
+    response["X-Accel-Buffering"] = "no"
+    return response
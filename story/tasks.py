@@ -0,0 +1,143 @@
+import logging
+from celery import shared_task
+from django.conf import settings
+from rest_framework import status
+
+from story.images import build_content_data, generate_story_image_variants
+from story.models import Story, StoryRanking
+from story.pipeline import (
+    FairytailPipelineError,
+    run_fairytail_pipeline,
+    run_image_pipeline,
+)
+from story.response_cache import response_cache
+from story.serializers import ContentCreateSerializer
+from story.translation import purge_expired_translations
+from user.models import Ticket
+
+# 로깅 설정
+logging.config.dictConfig(settings.LOGGING)
+
+# 로거 가져오기
+info_logger = logging.getLogger("info_logger")
+error_logger = logging.getLogger("error_logger")
+
+
+@shared_task(bind=True)
+def generate_fairytail(self, subject, target_language):
+    """
+    동화 생성 작업입니다.
+    진행 단계는 PROGRESS 상태의 meta["stage"]로 기록되며,
+    결과는 API 응답 본문과 상태 코드(http_status)를 담은 dict로 저장됩니다.
+    """
+
+    def report_stage(stage):
+        self.update_state(state="PROGRESS", meta={"stage": stage})
+
+    try:
+        script = run_fairytail_pipeline(
+            subject, target_language, on_stage=report_stage
+        )
+    except FairytailPipelineError as e:
+        return {"http_status": e.status_code, "data": e.data}
+
+    return {
+        "http_status": status.HTTP_201_CREATED,
+        "data": {
+            "status": "201",
+            "success": "동화를 성공적으로 생성했습니다.",
+            "script": script,
+        },
+    }
+
+
+@shared_task(bind=True)
+def generate_story_image(self, user_id, script, ticket_type):
+    """
+    DALL-E 이미지 생성 작업입니다.
+    티켓은 작업 등록 시점에 이미 예약(차감)되어 있으며, 실패하면 환불합니다.
+    """
+
+    def report_stage(stage):
+        self.update_state(state="PROGRESS", meta={"stage": stage})
+
+    try:
+        image_url = run_image_pipeline(script, ticket_type, on_stage=report_stage)
+    except FairytailPipelineError as e:
+        Ticket.objects.refund(user_id, ticket_type)
+        return {"http_status": e.status_code, "data": e.data}
+    except Exception:
+        Ticket.objects.refund(user_id, ticket_type)
+        raise
+
+    info_logger.info(f"user {user_id} : {ticket_type} 사용 확정")
+    return {
+        "http_status": status.HTTP_201_CREATED,
+        "data": {"status": "201", "image_url": image_url},
+    }
+
+
+@shared_task
+def purge_translation_cache():
+    """유효 시간이 지난 번역 캐시를 삭제합니다. (celery beat로 매일 실행)"""
+    deleted = purge_expired_translations()
+    info_logger.info(f"번역 캐시 {deleted}개 삭제")
+    return deleted
+
+
+@shared_task
+def rebuild_story_rankings():
+    """
+    좋아요 순 전체/국가별 순위를 다시 계산합니다. (celery beat로 주기적으로 실행)
+    사용자 국가 변경처럼 refresh_story로 반영되지 않는 변경을 바로잡습니다.
+    """
+    counts = StoryRanking.objects.rebuild_all()
+    info_logger.info(f"스토리 순위 재계산 : {counts}")
+    return counts
+
+
+@shared_task
+def publish_story(story_id, paragraph_list, image_url_list):
+    """
+    출판 대기 중인 스토리의 이미지를 내려받고 문단을 저장한 뒤 출판 상태로 바꿉니다.
+    문단 저장에 실패하면 출판 대기 중인 스토리를 삭제합니다.
+    """
+    story = Story.objects.get(id=story_id)
+    try:
+        content_data = build_content_data(paragraph_list, image_url_list)
+        content_serializer = ContentCreateSerializer(
+            data=content_data, partial=True, many=True
+        )
+        if not content_serializer.is_valid():
+            error_logger.error(f"content_serializer : {content_serializer.errors}")
+            story.delete()
+            return {
+                "http_status": status.HTTP_400_BAD_REQUEST,
+                "data": {"status": "400", "error": "동화 페이지 작성에 실패했습니다."},
+            }
+
+        content_serializer.save(story=story)
+        generate_story_image_variants(story)
+        story.is_published = True
+        story.save(update_fields=["is_published"])
+        StoryRanking.objects.refresh_story(story.id)
+        response_cache.story_changed(story.id, "publish")
+    except Exception:
+        story.delete()
+        raise
+
+    info_logger.info(f"story {story_id} : 동화책 출판 성공")
+    return {
+        "http_status": status.HTTP_201_CREATED,
+        "data": {"status": "201", "success": "동화가 작성되었습니다.", "story_id": story_id},
+    }
+
+
+@shared_task
+def create_image_variants(story_id):
+    """스토리 문단 이미지들의 썸네일과 WebP 이미지를 만듭니다."""
+    story = Story.objects.filter(id=story_id).first()
+    if story is not None:
+        generate_story_image_variants(story)
+        # 변환본이 없는 상태로 캐시된 목록/상세 응답을 버립니다.
+        response_cache.story_changed(story.id, "publish")
@@ -1,10 +1,71 @@
-from django.test import TestCase
-from user.models import User
-from .models import Story, Content, Comment
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import threading
+import time
+import deepl
+import httpx
+import openai
+import requests
+from io import BytesIO, StringIO
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import F, QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from user.models import User, Ticket
+from django.utils.timezone import now
+from .models import (
+    RANKING_GLOBAL_SCOPE,
+    Story,
+    StoryRanking,
+    Content,
+    Comment,
+    StoredImage,
+    TranslationCache,
+)
 from django.conf import settings
 from django.urls import reverse
 from user.serializers import LoginSerializer
+from rest_framework.response import Response
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .ai_async import request_deepl_translation
+from .ai_func import (
+    ProviderRegistry,
+    _build_openai_client,
+    load_perspective_discovery_document,
+    open_gpt_stream,
+    run_gpt,
+    translate_text,
+)
+from .backoff import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    is_overload,
+    is_provider_failure,
+    provider_guards,
+)
+from .images import download_images
+from .moderation import ToxicityChecker, toxicity_checker
+from .pagination import encode_cursor
+from .pipeline import (
+    FairytailPipelineError,
+    Stage,
+    run_fairytail_pipeline,
+    run_stages,
+    split_sentences,
+)
+from .response_cache import FEED_SCOPE, ResponseCache, response_cache
+from .singleflight import SingleFlight, coalesce_job, fairytail_key
+from .tasks import create_image_variants, publish_story, rebuild_story_rankings
+from .translation import CachedTranslator, cached_translator, split_batches
+from yummy_yagi.cache import TieredCache
 
 
 class StoryTests(TestCase):
@@ -30,6 +91,7 @@ class StoryTests(TestCase):
         cls.content = Content.objects.create(
             story=cls.story, paragraph="1", image="story/test1.jpg"
         )
+        cls.story.refresh_cover()
 
     def post_story_view_test(self):
         response = self.client.post(
@@ -65,6 +127,7 @@ class StoryTests(TestCase):
             {
                 "story_paragraph": self.content.paragraph,
                 "story_image": self.content.image.url,
+                "story_image_variants": None,
             },
         )
         self.assertEqual(
@@ -228,6 +291,38 @@ class LikeHateBookMarkTests(TestCase):
         self.assertEqual(response.data["hate_count"], 0)
         self.assertEqual(response.status_code, 200)
 
+    @override_settings(STORY_HIDE_HATE_THRESHOLD=1)
+    def test_hate_threshold_toggles_visibility(self):
+        hate_url = reverse("hate_view", kwargs={"story_id": self.story.id})
+        detail_url = reverse("detail_page_view", kwargs={"story_id": self.story.id})
+
+        self.client.post(hate_url, HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        self.assertFalse(Story.objects.get(id=self.story.id).is_visible)
+        self.assertEqual(self.client.get(detail_url).status_code, 403)
+        response = self.client.get(reverse("story_view"))
+        self.assertEqual(response.data["story_list"], [])
+
+        self.client.post(hate_url, HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        self.assertTrue(Story.objects.get(id=self.story.id).is_visible)
+        self.assertEqual(self.client.get(detail_url).status_code, 200)
+
+    def test_refresh_visibility_applies_new_threshold(self):
+        cache.clear()
+        Story.objects.filter(id=self.story.id).update(hate_count=3)
+        detail_url = reverse("detail_page_view", kwargs={"story_id": self.story.id})
+        self.assertEqual(self.client.get(detail_url).status_code, 200)
+
+        # 기준을 낮추면 이미 싫어요가 많은 스토리도 숨깁니다.
+        with self.settings(STORY_HIDE_HATE_THRESHOLD=3):
+            call_command("refresh_story_visibility", stdout=StringIO())
+        self.assertFalse(Story.objects.get(id=self.story.id).is_visible)
+        self.assertEqual(self.client.get(detail_url).status_code, 403)
+        self.assertEqual(self.client.get(reverse("story_view")).data["story_list"], [])
+
+        call_command("refresh_story_visibility", stdout=StringIO())
+        self.assertTrue(Story.objects.get(id=self.story.id).is_visible)
+        self.assertEqual(self.client.get(detail_url).status_code, 200)
+
     def bookmark_story_test(self):
         response = self.client.post(
             reverse("bookmark_view", kwargs={"story_id": self.story.id}),
@@ -244,3 +339,1351 @@ class LikeHateBookMarkTests(TestCase):
         story = Story.objects.get(title="test")
         self.assertEqual(bool(self.user in story.bookmark.all()), False)
         self.assertEqual(response.status_code, 200)
+
+
+class ProviderRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = ProviderRegistry()
+        self.build_count = 0
+
+        def factory():
+            self.build_count += 1
+            return object()
+
+        self.registry.register("dummy", factory)
+
+    def test_client_is_built_once(self):
+        first = self.registry.get("dummy")
+        second = self.registry.get("dummy")
+        self.assertIs(first, second)
+        self.assertEqual(self.build_count, 1)
+        stats = self.registry.stats()["dummy"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["client_reuse_ratio"], 0.5)
+
+    def test_openai_client_uses_provider_timeout(self):
+        with self.settings(AI_PROVIDER_TIMEOUT=7):
+            client = _build_openai_client()
+        self.assertEqual(client.timeout, 7)
+        self.assertEqual(client.max_retries, 0)
+
+    def test_discovery_document_is_cached_on_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "discovery.json")
+            with self.settings(PERSPECTIVE_DISCOVERY_CACHE_PATH=cache_path), patch(
+                "story.ai_func.requests.get"
+            ) as mock_get:
+                mock_get.return_value.text = '{"name": "commentanalyzer"}'
+                first = load_perspective_discovery_document()
+                second = load_perspective_discovery_document()
+            self.assertEqual(first, second)
+            self.assertEqual(mock_get.call_count, 1)
+
+
+class FairytailJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patchers = [
+            patch("story.pipeline.load_deepl_model", return_value=None),
+            patch("story.pipeline.load_open_ai_model", return_value=(None, "gpt")),
+            patch("story.pipeline.load_pers_model", return_value=None),
+            patch(
+                "story.pipeline.translate_text",
+                side_effect=lambda translator, text, lang="EN-US": f"{lang}:{text}",
+            ),
+            patch("story.pipeline.check_toxicity", return_value=0.1),
+            patch("story.pipeline.run_gpt", return_value="Once upon a time"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fairytail_job(self):
+        response = self.client.post(
+            reverse("fairytail_job_view"),
+            content_type="application/json",
+            data={"subject": "토끼", "target_language": "KO"},
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data["job_id"]
+
+        response = self.client.get(
+            reverse("fairytail_job_status_view", kwargs={"job_id": job_id})
+        )
+        self.assertEqual(response.data["state"], "success")
+
+        response = self.client.get(
+            reverse("fairytail_job_result_view", kwargs={"job_id": job_id})
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["script"], "KO:Once upon a time")
+
+    def test_toxic_subject_job(self):
+        with patch("story.pipeline.check_toxicity", return_value=0.9):
+            response = self.client.post(
+                reverse("fairytail_job_view"),
+                content_type="application/json",
+                data={"subject": "토끼", "target_language": "KO"},
+            )
+        response = self.client.get(
+            reverse(
+                "fairytail_job_result_view", kwargs={"job_id": response.data["job_id"]}
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class PipelineStageTests(TestCase):
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other(source):
+            barrier.wait()
+            return source + 1
+
+        results = run_stages(
+            [
+                Stage("source", lambda: 1),
+                Stage("left", wait_for_other, requires=["source"]),
+                Stage("right", wait_for_other, requires=["source"]),
+                Stage("total", lambda left, right: left + right, ["left", "right"]),
+            ]
+        )
+        self.assertEqual(results["total"], 4)
+
+    def test_failed_stage_discards_running_stages(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def reject():
+            raise FairytailPipelineError({"status": "400"}, 400)
+
+        started = time.monotonic()
+        with self.assertRaises(FairytailPipelineError):
+            run_stages(
+                [
+                    Stage("translated", lambda: release.wait(5)),
+                    Stage("checked", reject),
+                ]
+            )
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_output_moderation_and_translation_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def translate(translator, text, lang="EN-US"):
+            if lang != "EN-US":
+                barrier.wait()
+            return f"{lang}:{text}"
+
+        def check(client, text, threshold):
+            if text == "Once upon a time":
+                barrier.wait()
+            return 0.1
+
+        with patch("story.pipeline.load_deepl_model"), patch(
+            "story.pipeline.load_open_ai_model", return_value=(None, "gpt")
+        ), patch("story.pipeline.load_pers_model"), patch(
+            "story.pipeline.translate_text", side_effect=translate
+        ), patch(
+            "story.pipeline.check_toxicity", side_effect=check
+        ), patch(
+            "story.pipeline.run_gpt", return_value="Once upon a time"
+        ):
+            script = run_fairytail_pipeline("토끼", "KO")
+        self.assertEqual(script, "KO:Once upon a time")
+
+
+class FairytailStreamTests(TestCase):
+    chunks = ["Once upon ", "a time. The rab", "bit smiled.\nThe end."]
+
+    def setUp(self):
+        patchers = [
+            patch("story.pipeline.load_deepl_model", return_value=None),
+            patch("story.pipeline.load_open_ai_model", return_value=(None, "gpt")),
+            patch("story.pipeline.load_pers_model", return_value=None),
+            patch(
+                "story.pipeline.translate_text",
+                side_effect=lambda translator, text, lang="EN-US": f"{lang}:{text}",
+            ),
+            patch(
+                "story.pipeline.check_toxicity",
+                side_effect=lambda client, text, threshold: 0.9
+                if "smiled" in text
+                else 0.1,
+            ),
+            patch(
+                "story.pipeline.open_gpt_stream",
+                side_effect=lambda *args: iter(self.chunks),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def read_events(self, response):
+        body = b"".join(response.streaming_content).decode()
+        return [
+            (block.split("\n")[0][len("event: ") :], block.split("data: ", 1)[1])
+            for block in body.strip().split("\n\n")
+        ]
+
+    def test_split_sentences(self):
+        self.assertEqual(split_sentences("Hi. Bye"), ("Hi. ", "Bye"))
+        self.assertEqual(split_sentences('He said "Hi!" Then'), ('He said "Hi!" ', "Then"))
+        self.assertEqual(split_sentences("3.5 apples"), ("", "3.5 apples"))
+
+    def test_stream_sentences(self):
+        with patch("story.pipeline.check_toxicity", return_value=0.1):
+            response = self.client.post(
+                reverse("fairytail_stream_view"),
+                content_type="application/json",
+                data={"subject": "토끼", "target_language": "KO"},
+            )
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            events = self.read_events(response)
+
+        self.assertEqual(
+            [event for event, _ in events], ["sentence", "sentence", "sentence", "done"]
+        )
+        self.assertIn("KO:Once upon a time.", events[0][1])
+        self.assertIn("KO:The end.", events[3][1])
+
+    def test_toxic_sentence_stops_stream(self):
+        response = self.client.post(
+            reverse("fairytail_stream_view"),
+            content_type="application/json",
+            data={"subject": "토끼", "target_language": "EN-US"},
+        )
+        events = self.read_events(response)
+        self.assertEqual([event for event, _ in events], ["sentence", "error"])
+
+    def test_toxic_subject_is_rejected_before_streaming(self):
+        with patch("story.pipeline.check_toxicity", return_value=0.9):
+            response = self.client.get(
+                reverse("fairytail_stream_view"),
+                {"subject": "토끼", "target_language": "KO"},
+                HTTP_ACCEPT="text/event-stream",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.content.startswith(b"event: error"))
+
+    async def test_stream_under_asgi(self):
+        with patch("story.pipeline.check_toxicity", return_value=0.1):
+            response = await self.async_client.post(
+                reverse("fairytail_stream_view"),
+                content_type="application/json",
+                data={"subject": "토끼", "target_language": "EN-US"},
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 4)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ProviderGuardTests(TestCase):
+    def setUp(self):
+        provider_guards.clear()
+        self.addCleanup(provider_guards.clear)
+
+    def test_circuit_opens_and_probes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        # 대기 시간이 지나면 시험 호출 하나만 허용합니다.
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_limiter_is_aimd(self):
+        limiter = AdaptiveLimiter(4, 1, 8, latency_target=1)
+        self.assertTrue(all(limiter.try_acquire() for _ in range(4)))
+        self.assertFalse(limiter.try_acquire())
+
+        limiter.release(latency=0.1, overloaded=True)
+        self.assertEqual(limiter.limit, 2)
+        limiter.release(latency=5, overloaded=False)
+        self.assertAlmostEqual(limiter.limit, 1.8)
+        limiter.release(latency=0.1, overloaded=False)
+        self.assertAlmostEqual(limiter.limit, 1.8 + 1 / 1.8)
+        self.assertEqual(limiter.rejected, 1)
+
+    def test_client_errors_do_not_open_circuit(self):
+        response = MagicMock(status_code=400)
+        self.assertFalse(
+            is_provider_failure(
+                openai.BadRequestError("bad", response=response, body=None)
+            )
+        )
+        response = MagicMock(status_code=429)
+        error = openai.RateLimitError("slow down", response=response, body=None)
+        self.assertTrue(is_provider_failure(error))
+        self.assertTrue(is_overload(error))
+
+    @override_settings(AI_PROVIDER_BREAKER_FAILURES=2)
+    def test_translation_fails_fast_during_outage(self):
+        translator = MagicMock()
+        translator.translate_text.side_effect = deepl.exceptions.DeepLException(
+            "down", http_status_code=503
+        )
+        for _ in range(2):
+            response = translate_text(translator, "토끼 장애 테스트")
+            self.assertEqual(response.status_code, 500)
+
+        response = translate_text(translator, "토끼 장애 테스트")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(translator.translate_text.call_count, 2)
+        self.assertEqual(provider_guards.stats()["deepl"]["state"], "open")
+
+    @override_settings(AI_PROVIDER_BREAKER_FAILURES=2)
+    def test_gpt_rate_limit_fails_without_sleeping(self):
+        client = MagicMock()
+        client.chat.completions.create.side_effect = openai.RateLimitError(
+            "slow down", response=MagicMock(status_code=429), body=None
+        )
+        with patch("time.sleep") as mock_sleep:
+            for _ in range(2):
+                response = run_gpt(client, "gpt-3.5-turbo", [])
+                self.assertEqual(response.status_code, 429)
+            # 서킷 브레이커가 열린 뒤에는 기다리거나 호출하지 않고 바로 거절합니다.
+            response = run_gpt(client, "gpt-3.5-turbo", [])
+            self.assertEqual(response.status_code, 503)
+            response = open_gpt_stream(client, "gpt-3.5-turbo", [])
+            self.assertEqual(response.status_code, 503)
+        mock_sleep.assert_not_called()
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_normalized_subjects_share_key(self):
+        self.assertEqual(
+            fairytail_key(" 토끼와  거북이!", "ko"), fairytail_key("토끼와 거북이", "KO")
+        )
+        self.assertNotEqual(
+            fairytail_key("토끼와 거북이", "KO"), fairytail_key("토끼와 거북이", "EN-US")
+        )
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def pipeline(subject):
+            calls.append(subject)
+            started.set()
+            release.wait(5)
+            return f"story:{subject}"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(flight.do, "key", pipeline, "토끼")
+            started.wait(5)
+            followers = [
+                executor.submit(flight.do, "key", pipeline, "토끼") for _ in range(3)
+            ]
+            while flight.stats()["coalesced"] < 3:
+                time.sleep(0.01)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(calls, ["토끼"])
+        self.assertEqual(results, ["story:토끼"] * 4)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_errors_are_shared_and_not_cached(self):
+        flight = SingleFlight()
+        with self.assertRaises(FairytailPipelineError):
+            flight.do("key", self.fail_pipeline)
+        self.assertEqual(flight.do("key", lambda: "ok"), "ok")
+
+    @staticmethod
+    def fail_pipeline():
+        raise FairytailPipelineError({"status": "400"}, 400)
+
+    def test_leader_base_exception_is_raised_in_followers(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def interrupted():
+            started.set()
+            release.wait(5)
+            raise KeyboardInterrupt
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "key", interrupted)
+            started.wait(5)
+            follower = executor.submit(flight.do, "key", interrupted)
+            while flight.stats()["coalesced"] < 1:
+                time.sleep(0.01)
+            release.set()
+            for future in [leader, follower]:
+                with self.assertRaises(KeyboardInterrupt):
+                    future.result(5)
+        self.assertEqual(flight.stats()["executions"], 1)
+
+    def test_running_job_is_reused(self):
+        submitted = []
+        with patch("story.singleflight.AsyncResult") as mock_result:
+            mock_result.return_value.ready.return_value = False
+            first, created = coalesce_job("key", submitted.append)
+            self.assertTrue(created)
+            second, created = coalesce_job("key", submitted.append)
+            self.assertFalse(created)
+            self.assertEqual(first, second)
+
+            # 작업이 끝난 뒤의 요청은 새 작업을 등록합니다.
+            mock_result.return_value.ready.return_value = True
+            third, created = coalesce_job("key", submitted.append)
+        self.assertTrue(created)
+        self.assertEqual(submitted, [first, third])
+
+    def test_finished_job_is_replaced_once(self):
+        cache.set("singleflight:key", "finished-job")
+        barrier = threading.Barrier(4)
+        submitted = []
+
+        def ready():
+            # 네 요청이 모두 이전 작업이 끝난 것을 확인한 뒤에 교체를 시도합니다.
+            barrier.wait(5)
+            return True
+
+        with patch("story.singleflight.AsyncResult") as mock_result:
+            mock_result.return_value.ready.side_effect = ready
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: coalesce_job("key", submitted.append), range(4)
+                    )
+                )
+
+        self.assertEqual(len(submitted), 1)
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual({job_id for job_id, _ in results}, set(submitted))
+
+
+class ToxicityCheckerTests(TestCase):
+    def setUp(self):
+        blocklist_file = tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False, encoding="utf-8"
+        )
+        blocklist_file.write("# 테스트 금지어\nmurder\nkill yourself\n")
+        blocklist_file.close()
+        self.addCleanup(os.remove, blocklist_file.name)
+        self.checker = ToxicityChecker(blocklist_file.name, 60, 20, 10)
+        patcher = patch("story.moderation.request_toxicity", return_value=0.1)
+        self.mock_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_blocklist_rejects_without_perspective(self):
+        self.assertEqual(self.checker.score(None, "A MURDER in the woods", 0.3), 1.0)
+        self.assertEqual(self.checker.score(None, "Please kill  yourself", 0.3), 0.1)
+        # 단어 단위로만 일치시킵니다.
+        self.assertEqual(self.checker.score(None, "The murderous crow", 0.3), 0.1)
+        self.assertEqual(self.mock_request.call_count, 2)
+
+    def test_scores_are_cached(self):
+        long_text = "A rabbit and a turtle raced through the forest."
+        for _ in range(3):
+            self.assertEqual(self.checker.score(None, "A happy rabbit", 0.3), 0.1)
+            self.assertEqual(self.checker.score(None, long_text, 0.3), 0.1)
+
+        self.assertEqual(self.mock_request.call_count, 2)
+        stats = self.checker.stats()
+        self.assertEqual(stats["short_text_hits"], 2)
+        self.assertEqual(stats["cache_hits"], 2)
+        self.assertEqual(stats["avoided_calls"], 4)
+
+    def test_toxic_short_text_is_not_remembered_as_clean(self):
+        self.mock_request.return_value = 0.9
+        self.assertEqual(self.checker.score(None, "A sad rabbit", 0.3), 0.9)
+        self.assertEqual(self.checker.score(None, "A sad rabbit", 0.3), 0.9)
+        self.assertEqual(self.checker.stats()["short_text_hits"], 0)
+        self.assertEqual(self.mock_request.call_count, 1)
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        member = {
+            "email": "asyncuser@email.com",
+            "nickname": "asyncuser",
+            "country": "미국",
+            "password": "1234567!",
+        }
+        cls.user = User.objects.create_user(**member)
+        cls.user.is_active = True
+        cls.user.save()
+        Ticket.objects.create(ticket_owner=cls.user, golden_ticket=1)
+        response = LoginSerializer(data=member)
+        response.is_valid(raise_exception=True)
+        cls.access_token = response.validated_data["access"]
+
+    def setUp(self):
+        cached_translator.clear()
+        toxicity_checker.clear()
+
+        async def translate(texts, target_lang):
+            return [f"{target_lang}:{text}" for text in texts]
+
+        async def create_completion(**kwargs):
+            await asyncio.sleep(0.05)
+            return MagicMock(
+                choices=[MagicMock(message=MagicMock(content="Once upon a time"))]
+            )
+
+        self.openai = MagicMock()
+        self.openai.chat.completions.create = AsyncMock(side_effect=create_completion)
+        self.openai.images.generate = AsyncMock(
+            return_value=MagicMock(data=[MagicMock(url="https://image.url")])
+        )
+        patchers = [
+            patch("story.ai_async.request_deepl_translation", side_effect=translate),
+            patch("story.ai_async.request_toxicity", AsyncMock(return_value=0.1)),
+            patch("story.ai_async.async_providers.openai", return_value=self.openai),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_fairytail(self):
+        response = await self.async_client.post(
+            reverse("async_request_fairytail_view"),
+            content_type="application/json",
+            data={"subject": "토끼", "target_language": "KO"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["script"], "KO:Once upon a time")
+
+    async def test_concurrent_fairytail_requests_are_coalesced(self):
+        responses = await asyncio.gather(
+            *(
+                self.async_client.post(
+                    reverse("async_request_fairytail_view"),
+                    content_type="application/json",
+                    data={"subject": subject, "target_language": "EN-US"},
+                )
+                for subject in ["토끼", "토끼!", " 토끼"]
+            )
+        )
+        self.assertEqual([response.status_code for response in responses], [201] * 3)
+        self.assertEqual(self.openai.chat.completions.create.await_count, 1)
+
+    async def test_image_requires_login_and_ticket(self):
+        url = reverse("async_request_image_view")
+        data = {"script": "토끼", "ticket": "golden_ticket"}
+        response = await self.async_client.post(
+            url, content_type="application/json", data=data
+        )
+        self.assertEqual(response.status_code, 401)
+
+        headers = {"AUTHORIZATION": f"Bearer {self.access_token}"}
+        response = await self.async_client.post(
+            url, content_type="application/json", data=data, headers=headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["image_url"], "https://image.url")
+
+        response = await self.async_client.post(
+            url, content_type="application/json", data=data, headers=headers
+        )
+        self.assertEqual(response.status_code, 402)
+
+    async def test_image_failure_refunds_ticket(self):
+        self.openai.images.generate.side_effect = openai.BadRequestError(
+            "bad", response=MagicMock(status_code=400), body=None
+        )
+        response = await self.async_client.post(
+            reverse("async_request_image_view"),
+            content_type="application/json",
+            data={"script": "토끼", "ticket": "golden_ticket"},
+            headers={"AUTHORIZATION": f"Bearer {self.access_token}"},
+        )
+        self.assertEqual(response.status_code, 400)
+        ticket = await Ticket.objects.aget(ticket_owner=self.user)
+        self.assertEqual(ticket.golden_ticket, 1)
+
+    async def test_story_translation(self):
+        response = await self.async_client.post(
+            reverse("async_story_translation"),
+            content_type="application/json",
+            data={
+                "story_title": "토끼",
+                "story_script": [{"paragraph": "하나"}, {"paragraph": "둘"}],
+                "target_language": "EN-US",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["translated_title"], "EN-US:토끼")
+        self.assertEqual(
+            response.json()["translated_scripts"], ["EN-US:하나", "EN-US:둘"]
+        )
+
+    async def test_deepl_errors_match_sync_exceptions(self):
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(456))
+        )
+        with patch("story.ai_async.async_providers.http", return_value=client):
+            with self.assertRaises(deepl.exceptions.QuotaExceededException):
+                await request_deepl_translation(["토끼"], "EN-US")
+        await client.aclose()
+
+    def test_benchmark_asgi_capacity(self):
+        out = StringIO()
+        call_command(
+            "benchmark_asgi_capacity",
+            requests=8,
+            latency=0.01,
+            threads=2,
+            stdout=out,
+        )
+        self.assertIn("ASGI (1 event loop)", out.getvalue())
+        self.assertNotIn("failed", out.getvalue())
+
+
+class ImageJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        member = {
+            "email": "testuser@email.com",
+            "nickname": "testuser",
+            "country": "미국",
+            "password": "1234567!",
+        }
+        cls.user = User.objects.create_user(**member)
+        cls.user.is_active = True
+        cls.user.save()
+        Ticket.objects.create(ticket_owner=cls.user, golden_ticket=1)
+        response = LoginSerializer(data=member)
+        response.is_valid(raise_exception=True)
+        cls.access_token = response.validated_data["access"]
+
+    def request_image_job(self):
+        return self.client.post(
+            reverse("image_job_view"),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+            content_type="application/json",
+            data={"script": "토끼", "ticket": "golden_ticket"},
+        )
+
+    def test_ticket_is_committed_on_success(self):
+        with patch(
+            "story.tasks.run_image_pipeline", return_value="https://image.url"
+        ):
+            response = self.request_image_job()
+        self.assertEqual(response.status_code, 202)
+        response = self.client.get(
+            reverse("image_job_status_view", kwargs={"job_id": response.data["job_id"]}),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["image_url"], "https://image.url")
+        self.assertEqual(Ticket.objects.get(ticket_owner=self.user).golden_ticket, 0)
+
+        # 티켓이 모두 소진되면 작업이 등록되지 않습니다.
+        response = self.request_image_job()
+        self.assertEqual(response.status_code, 402)
+
+    def test_ticket_is_refunded_on_failure(self):
+        with patch(
+            "story.tasks.run_image_pipeline",
+            side_effect=FairytailPipelineError({"status": "400", "error": "x"}, 400),
+        ):
+            response = self.request_image_job()
+        response = self.client.get(
+            reverse("image_job_status_view", kwargs={"job_id": response.data["job_id"]}),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Ticket.objects.get(ticket_owner=self.user).golden_ticket, 1)
+
+
+class FeedQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f"feed{i}@email.com",
+                nickname=f"feed{i}",
+                country="미국",
+                password="1234567!",
+            )
+            for i in range(3)
+        ]
+
+    def create_stories(self, count):
+        for i in range(count):
+            story = Story.objects.create(author=self.users[i % 3], title=f"story{i}")
+            Content.objects.create(story=story, paragraph="no image")
+            Content.objects.create(
+                story=story, paragraph="cover", image=f"story/{i}.jpg"
+            )
+            story.refresh_cover()
+            story.like.add(*self.users)
+
+    def count_feed_queries(self):
+        # ORM으로 직접 추가한 스토리가 반영되도록 캐시된 목록 응답을 무효화합니다.
+        response_cache.invalidate(FEED_SCOPE)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("story_view"))
+        self.assertEqual(response.status_code, 200)
+        return len(context), response
+
+    def test_feed_query_count_is_constant(self):
+        self.create_stories(2)
+        small_page_queries, _ = self.count_feed_queries()
+        self.create_stories(6)
+        full_page_queries, response = self.count_feed_queries()
+
+        self.assertEqual(small_page_queries, full_page_queries)
+        self.assertEqual(len(response.data["story_list"]), 8)
+        story_data = response.data["story_list"][0]
+        self.assertEqual(story_data["content"]["story_paragraph"], "cover")
+        self.assertEqual(len(story_data["like_user_list"]), 3)
+
+    def test_backfill_story_cover(self):
+        story = Story.objects.create(author=self.users[0], title="old story")
+        Content.objects.create(story=story, paragraph="cover", image="story/old.jpg")
+
+        call_command("backfill_story_cover", stdout=StringIO())
+
+        story.refresh_from_db()
+        self.assertEqual(story.cover_image.name, "story/old.jpg")
+        self.assertEqual(story.cover_excerpt, "cover")
+
+    def test_feed_queries_use_indexes(self):
+        stdout = StringIO()
+        call_command("check_query_plans", stories=2000, authors=10, stdout=stdout)
+
+        self.assertIn("story_visible_latest_idx", stdout.getvalue())
+        self.assertIn("story_visible_like_idx", stdout.getvalue())
+        self.assertIn("story_visible_author_idx", stdout.getvalue())
+        self.assertFalse(Story.objects.filter(title__startswith="plan").exists())
+
+    def test_cursor_pagination(self):
+        self.create_stories(10)
+        response = self.client.get(reverse("story_view"), {"pagination": "cursor"})
+        self.assertEqual(len(response.data["story_list"]), 8)
+        self.assertNotIn("total_items", response.data["page_info"])
+        next_cursor = response.data["page_info"]["next_cursor"]
+
+        response = self.client.get(reverse("story_view"), {"cursor": next_cursor})
+        titles = [story["story_title"] for story in response.data["story_list"]]
+        self.assertEqual(titles, ["story1", "story0"])
+        self.assertIsNone(response.data["page_info"]["next_cursor"])
+
+        response = self.client.get(reverse("story_view"), {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+        # 값의 타입이 정렬 키와 맞지 않는 커서도 400으로 거절합니다.
+        for values in [["x", "y"], [None, None], [{"a": 1}, 1]]:
+            response = self.client.get(
+                reverse("story_view"), {"cursor": encode_cursor(values)}
+            )
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            reverse("story_sorted_like_view"),
+            {"cursor": encode_cursor(["abc", "2024-01-01T00:00:00", 1])},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        member = {
+            "email": "cache@email.com",
+            "nickname": "cache",
+            "country": "미국",
+            "password": "1234567!",
+        }
+        cls.user = User.objects.create_user(**member)
+        cls.user.is_active = True
+        cls.user.save()
+        cls.access_token = LoginSerializer.get_token(cls.user).access_token
+
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        self.story = Story.objects.create(author=self.user, title="cached")
+        self.detail_url = reverse(
+            "detail_page_view", kwargs={"story_id": self.story.id}
+        )
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {self.access_token}"}
+
+    def assertCache(self, url, expected):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], expected)
+        return response
+
+    def test_like_invalidates_feed_and_detail(self):
+        self.assertCache(reverse("story_view"), "MISS")
+        self.assertCache(self.detail_url, "MISS")
+        # 이벤트 없이 바뀐 데이터는 캐시된 응답이 그대로 반환됩니다.
+        Story.objects.filter(id=self.story.id).update(title="changed")
+        response = self.assertCache(reverse("story_view"), "HIT")
+        self.assertEqual(response.data["story_list"][0]["story_title"], "cached")
+
+        self.client.post(
+            reverse("like_view", kwargs={"story_id": self.story.id}), **self.auth
+        )
+
+        response = self.assertCache(reverse("story_view"), "MISS")
+        self.assertEqual(response.data["story_list"][0]["story_title"], "changed")
+        self.assertEqual(
+            response.data["story_list"][0]["like_user_list"], [{"id": self.user.id}]
+        )
+        response = self.assertCache(self.detail_url, "MISS")
+        self.assertEqual(response.data["detail"]["like_count"], 1)
+        self.assertCache(self.detail_url, "HIT")
+
+        stats = response_cache.stats()
+        self.assertEqual(stats["responses"]["latest"]["hits"], 1)
+        self.assertEqual(stats["responses"]["detail"]["hit_ratio"], 1 / 3)
+
+    def test_targeted_invalidation(self):
+        comments_url = reverse("comment_view", kwargs={"story_id": self.story.id})
+        self.assertCache(reverse("story_view"), "MISS")
+        self.assertCache(self.detail_url, "MISS")
+        self.assertCache(comments_url, "MISS")
+
+        self.client.post(
+            reverse("bookmark_view", kwargs={"story_id": self.story.id}), **self.auth
+        )
+        response = self.assertCache(self.detail_url, "MISS")
+        self.assertEqual(
+            response.data["detail"]["bookmark_user_list"], [{"id": self.user.id}]
+        )
+        self.assertCache(reverse("story_view"), "HIT")
+        self.assertCache(comments_url, "HIT")
+
+        self.client.post(comments_url, {"content": "comment"}, **self.auth)
+        response = self.assertCache(comments_url, "MISS")
+        self.assertEqual(len(response.data["comments"]), 1)
+        self.assertCache(self.detail_url, "HIT")
+
+        self.client.delete(self.detail_url, **self.auth)
+        response = self.assertCache(reverse("story_view"), "MISS")
+        self.assertEqual(response.data["story_list"], [])
+
+    def test_key_changes_with_version_and_params(self):
+        responses = ResponseCache(60, prefix="test_response")
+        key = responses.key("latest", [FEED_SCOPE], {"page": None})
+        responses.invalidate(FEED_SCOPE)
+        self.assertNotEqual(responses.key("latest", [FEED_SCOPE], {"page": None}), key)
+        self.assertNotEqual(responses.key("latest", [FEED_SCOPE], {"page": "2"}), key)
+
+
+class TieredCacheTests(TestCase):
+    def create_cache(self, max_entries=10):
+        # 같은 LOCATION의 LocMemCache를 공유하는 두 인스턴스로 두 프로세스를 흉내 냅니다.
+        return TieredCache(
+            "",
+            {
+                "TIMEOUT": 300,
+                "OPTIONS": {
+                    "SHARED": {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": f"tiered-{self.id()}",
+                    },
+                    "LOCAL_MAX_ENTRIES": max_entries,
+                    "LOCAL_TIMEOUT": 5,
+                },
+            },
+        )
+
+    def setUp(self):
+        self.first = self.create_cache()
+        self.second = self.create_cache()
+        self.addCleanup(self.first.clear)
+
+    def test_reads_fill_local_tier(self):
+        self.first.set("key", {"value": 1})
+        self.assertEqual(self.second.get("key"), {"value": 1})
+        self.assertEqual(self.second.get("key"), {"value": 1})
+        self.assertIsNone(self.second.get("missing"))
+
+        stats = self.second.stats()
+        self.assertEqual(stats["local_hits"], 1)
+        self.assertEqual(stats["shared_hits"], 1)
+        self.assertEqual(stats["shared_misses"], 1)
+        self.assertEqual(stats["local_hit_ratio"], 1 / 3)
+
+    def test_local_tier_expires_and_evicts(self):
+        self.first.set("key", "old")
+        self.second.set("key", "new")
+        # 다른 프로세스의 변경은 local 유효 시간이 지난 뒤에 보입니다.
+        self.assertEqual(self.first.get("key"), "old")
+        later = time.monotonic() + 6
+        with patch("yummy_yagi.cache.time.monotonic", return_value=later):
+            self.assertEqual(self.first.get("key"), "new")
+
+        small = self.create_cache(max_entries=2)
+        for key in ["a", "b", "c"]:
+            small.set(key, key)
+        self.assertEqual(small.stats()["local_entries"], 2)
+        self.assertEqual(
+            small.get_many(["a", "b", "c"]), {"a": "a", "b": "b", "c": "c"}
+        )
+        self.assertEqual(small.stats()["shared_hits"], 1)
+
+    def test_add_and_incr_go_through_shared_tier(self):
+        self.assertTrue(self.first.add("job", "first"))
+        self.assertFalse(self.second.add("job", "second"))
+        self.assertEqual(self.second.get("job"), "first")
+
+        self.first.set("version", 1)
+        self.assertEqual(self.second.incr("version"), 2)
+        self.assertEqual(self.second.get("version"), 2)
+        self.first.delete("version")
+        with self.assertRaises(ValueError):
+            self.second.incr("version")
+
+    def test_invalidation_is_seen_by_other_processes(self):
+        first = ResponseCache(60, backend=self.first)
+        second = ResponseCache(60, backend=self.second)
+        build = MagicMock(side_effect=lambda: Response({"count": build.call_count}))
+
+        def respond(responses):
+            return responses.respond("feed", [FEED_SCOPE], {}, build)
+
+        self.assertEqual(respond(first)["X-Cache"], "MISS")
+        self.assertEqual(respond(second)["X-Cache"], "HIT")
+        self.assertEqual(respond(first)["X-Cache"], "HIT")
+
+        # 다른 프로세스에서 무효화하면 local 유효 시간을 기다리지 않고 바로 다시 만듭니다.
+        second.invalidate(FEED_SCOPE)
+        response = respond(first)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data, {"count": 2})
+
+    def test_cached_feed_does_not_query_database(self):
+        cache.clear()
+        self.client.get(reverse("story_view"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("story_view"))
+        self.assertEqual(response["X-Cache"], "HIT")
+
+
+class StoryRankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f"rank{i}@email.com",
+                nickname=f"rank{i}",
+                country=country,
+                password="1234567!",
+            )
+            for i, country in enumerate(["미국", "일본", "미국"])
+        ]
+        User.objects.update(is_active=True)
+
+    def setUp(self):
+        cache.clear()
+        self.stories = [
+            Story.objects.create(author=self.users[i % 2], title=f"rank{i}")
+            for i in range(4)
+        ]
+
+    def like(self, story, user):
+        access_token = LoginSerializer.get_token(user).access_token
+        response = self.client.post(
+            reverse("like_view", kwargs={"story_id": story.id}),
+            HTTP_AUTHORIZATION=f"Bearer {access_token}",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def ranked_titles(self, scope):
+        return [
+            story.title for story in StoryRanking.objects.top_stories(scope, 8)
+        ]
+
+    def test_empty_scope_is_built_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.ranked_titles("프랑스"), [])
+        # 스토리가 없는 scope도 다시 계산하지 않습니다.
+        with patch.object(StoryRanking.objects, "rebuild") as mock_rebuild:
+            with self.assertNumQueries(1):
+                self.assertEqual(self.ranked_titles("프랑스"), [])
+        mock_rebuild.assert_not_called()
+
+    def test_likes_update_global_and_country_rankings(self):
+        StoryRanking.objects.rebuild_all()
+        self.like(self.stories[1], self.users[0])
+        self.like(self.stories[1], self.users[1])
+        self.like(self.stories[2], self.users[0])
+
+        self.assertEqual(
+            self.ranked_titles(RANKING_GLOBAL_SCOPE)[:2], ["rank1", "rank2"]
+        )
+        self.assertEqual(self.ranked_titles("미국"), ["rank2", "rank0"])
+        self.assertEqual(self.ranked_titles("일본"), ["rank1", "rank3"])
+
+        response = self.client.get(reverse("story_sorted_like_view"))
+        titles = [story["story_title"] for story in response.data["story_list"]]
+        self.assertEqual(titles, ["rank1", "rank2", "rank3", "rank0"])
+        response = self.client.get(
+            reverse("story_sorted_country_view", kwargs={"author_country": "일본"})
+        )
+        titles = [story["story_title"] for story in response.data["story_list"]]
+        self.assertEqual(titles, ["rank1", "rank3"])
+
+    @override_settings(STORY_RANKING_SIZE=2)
+    def test_ranking_keeps_top_n_and_backfills(self):
+        StoryRanking.objects.rebuild_all()
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank3", "rank2"])
+
+        self.like(self.stories[0], self.users[1])
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank0", "rank3"])
+
+        # 싫어요가 많아 숨겨진 스토리 대신 순위 밖의 스토리가 들어옵니다.
+        Story.objects.filter(id=self.stories[0].id).update(
+            hate_count=5, is_visible=False
+        )
+        StoryRanking.objects.refresh_story(self.stories[0].id)
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank3", "rank2"])
+
+        Story.objects.filter(id=self.stories[0].id).update(
+            hate_count=0, is_visible=True
+        )
+        StoryRanking.objects.refresh_story(self.stories[0].id)
+        self.like(self.stories[1], self.users[0])
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank1", "rank0"])
+
+        # 좋아요를 취소해 순위 맨 끝으로 내려가면 순위 밖의 스토리와 다시 비교합니다.
+        self.like(self.stories[1], self.users[0])
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank0", "rank3"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stories[3].delete()
+        self.assertEqual(self.ranked_titles(RANKING_GLOBAL_SCOPE), ["rank0", "rank2"])
+
+    def test_rebuild_task_moves_story_to_new_country(self):
+        StoryRanking.objects.rebuild_all()
+        User.objects.filter(id=self.users[1].id).update(country="프랑스")
+
+        counts = rebuild_story_rankings.delay().get()
+
+        self.assertEqual(counts["일본"], 0)
+        self.assertEqual(self.ranked_titles("프랑스"), ["rank3", "rank1"])
+
+
+class ReactionConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f"like{i}@email.com",
+                nickname=f"like{i}",
+                country="미국",
+                password="1234567!",
+            )
+            for i in range(10)
+        ]
+        self.story = Story.objects.create(author=self.users[0], title="like")
+
+    def toggle(self, user):
+        try:
+            while True:
+                try:
+                    return Story.objects.toggle_reaction(
+                        self.story.id, user.id, "like", "like_count"
+                    )
+                except OperationalError:
+                    # sqlite 테스트 DB는 동시 쓰기 시 잠금 오류를 반환하므로 다시 시도합니다.
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def test_parallel_toggles_keep_count_consistent(self):
+        # 사용자마다 3번씩(좋아요 -> 취소 -> 좋아요) 동시에 토글합니다.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self.toggle, self.users * 3))
+
+        self.story.refresh_from_db()
+        self.assertEqual(self.story.like_count, self.story.like.count())
+
+
+class TranslationCacheTests(TestCase):
+    def setUp(self):
+        self.translator = MagicMock()
+        self.translator.translate_text.side_effect = (
+            lambda text, target_lang: f"{target_lang}:{text}"
+        )
+        self.cache = CachedTranslator(lru_size=10, ttl=timedelta(days=1))
+
+    def test_translation_is_reused(self):
+        for _ in range(2):
+            result = self.cache.translate(self.translator, "토끼", "EN-US")
+        self.assertEqual(result, "EN-US:토끼")
+
+        # 다른 프로세스(빈 LRU)에서는 테이블에 저장된 번역을 사용합니다.
+        other_process = CachedTranslator(lru_size=10, ttl=timedelta(days=1))
+        other_process.translate(self.translator, "토끼", "EN-US")
+
+        self.assertEqual(self.translator.translate_text.call_count, 1)
+        self.assertEqual(self.cache.stats()["lru_hits"], 1)
+        self.assertEqual(other_process.stats()["db_hits"], 1)
+
+    def test_expired_translation_is_refreshed(self):
+        self.cache.translate(self.translator, "토끼", "EN-US")
+        TranslationCache.objects.update(created_at=now() - timedelta(days=2))
+        self.cache.clear()
+
+        self.cache.translate(self.translator, "토끼", "EN-US")
+        self.assertEqual(self.translator.translate_text.call_count, 2)
+        self.assertEqual(TranslationCache.objects.count(), 1)
+
+    def test_story_is_translated_in_one_batch(self):
+        self.cache.translate(self.translator, "문단1", "EN-US")
+        self.translator.translate_text.reset_mock()
+        self.translator.translate_text.side_effect = lambda texts, target_lang: [
+            f"{target_lang}:{text}" for text in texts
+        ]
+
+        results = self.cache.translate_many(
+            self.translator, ["제목", "문단1", "문단2", "문단2"], "EN-US"
+        )
+
+        self.assertEqual(
+            results, ["EN-US:제목", "EN-US:문단1", "EN-US:문단2", "EN-US:문단2"]
+        )
+        # 캐시에 없는 문장만 중복 없이 한 번에 요청합니다.
+        self.translator.translate_text.assert_called_once_with(
+            ["제목", "문단2"], target_lang="EN-US"
+        )
+
+    def test_batches_are_split_by_payload_limit(self):
+        with self.settings(DEEPL_BATCH_MAX_TEXTS=2, DEEPL_BATCH_MAX_BYTES=10):
+            batches = list(split_batches(["a", "b", "c", "0123456789", "d"]))
+        self.assertEqual(batches, [["a", "b"], ["c"], ["0123456789"], ["d"]])
+
+
+class FakeImageResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i : i + chunk_size]
+
+
+class ImageDownloadTests(TestCase):
+    def fake_get(self, url, **kwargs):
+        if url == "None":
+            raise requests.exceptions.MissingSchema(url)
+        return {
+            "small": FakeImageResponse(b"image"),
+            "large": FakeImageResponse(b"x" * 100),
+            "missing": FakeImageResponse(b"", status_code=404),
+        }[url]
+
+    def test_download_results_keep_order(self):
+        with self.settings(STORY_IMAGE_MAX_SIZE=10), patch(
+            "story.images.requests.get", side_effect=self.fake_get
+        ):
+            image_files = download_images(["small", "None", "large", "missing"])
+
+        self.assertEqual(image_files[0].read(), b"image")
+        self.assertEqual(image_files[1:], [None, None, None])
+
+
+def make_png(color="red", size=(1024, 1024)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class StoryPublishTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        member = {
+            "email": "testuser@email.com",
+            "nickname": "testuser",
+            "country": "미국",
+            "password": "1234567!",
+        }
+        cls.user = User.objects.create_user(**member)
+        cls.user.is_active = True
+        cls.user.save()
+        response = LoginSerializer(data=member)
+        response.is_valid(raise_exception=True)
+        cls.access_token = response.validated_data["access"]
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        get_patcher = patch("story.images.requests.get", side_effect=self.fake_get)
+        get_patcher.start()
+        self.addCleanup(get_patcher.stop)
+
+    def fake_get(self, url, **kwargs):
+        if url == "None":
+            raise requests.exceptions.MissingSchema(url)
+        return FakeImageResponse(make_png(url))
+
+    def publish(self, **data):
+        return self.client.post(
+            reverse("story_view"),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+            content_type="application/json",
+            data={
+                "title": "testing",
+                "paragraph_list": ["1", "2", "3"],
+                "image_url_list": ["red", "None", "blue"],
+                **data,
+            },
+        )
+
+    def test_publish_story(self):
+        response = self.publish()
+        self.assertEqual(response.status_code, 201)
+        story = Story.objects.get(id=response.data["story_id"])
+        contents = list(story.contents.order_by("id"))
+        self.assertTrue(contents[0].image)
+        self.assertFalse(contents[1].image)
+        self.assertTrue(contents[2].image)
+        self.assertEqual(story.cover_image.name, contents[0].image.name)
+
+        # 썸네일과 WebP 이미지가 원본 옆에 저장됩니다.
+        variants = contents[0].image_variants
+        self.assertEqual(story.cover_variants, variants)
+        thumbnail_path = variants["thumbnails"]["256"]["webp"]
+        self.assertTrue(default_storage.exists(thumbnail_path))
+        with default_storage.open(thumbnail_path) as thumbnail:
+            self.assertEqual(Image.open(thumbnail).size, (256, 256))
+
+        response = self.client.get(reverse("story_view"))
+        feed_variants = response.data["story_list"][0]["content"]["story_image_variants"]
+        self.assertEqual(
+            feed_variants["thumbnails"]["256"]["webp"],
+            default_storage.url(thumbnail_path),
+        )
+
+    def test_publish_story_async(self):
+        with patch("story.views.publish_story.delay") as mock_delay:
+            mock_delay.return_value.id = "publish-job"
+            response = self.publish(publish_mode="async")
+        self.assertEqual(response.status_code, 202)
+        story_id = response.data["story_id"]
+
+        # 출판이 끝나기 전에는 목록과 상세 페이지에서 보이지 않습니다.
+        response = self.client.get(reverse("story_view"))
+        self.assertEqual(response.data["story_list"], [])
+        response = self.client.get(
+            reverse("detail_page_view", kwargs={"story_id": story_id})
+        )
+        self.assertEqual(response.status_code, 404)
+
+        publish_story(*mock_delay.call_args.args)
+
+        response = self.client.get(reverse("story_view"))
+        self.assertEqual(response.data["story_list"][0]["story_id"], str(story_id))
+        self.assertEqual(Story.objects.get(id=story_id).contents.count(), 3)
+
+    def test_variants_invalidate_cached_feed(self):
+        with patch("story.views.create_image_variants.delay") as mock_delay:
+            self.publish()
+        response = self.client.get(reverse("story_view"))
+        content = response.data["story_list"][0]["content"]
+        self.assertFalse(content["story_image_variants"])
+
+        create_image_variants(*mock_delay.call_args.args)
+        response = self.client.get(reverse("story_view"))
+        self.assertEqual(response["X-Cache"], "MISS")
+        content = response.data["story_list"][0]["content"]
+        self.assertTrue(content["story_image_variants"])
+
+    def test_publish_async_fails_when_broker_is_down(self):
+        with patch(
+            "story.views.publish_story.delay", side_effect=OSError("broker down")
+        ):
+            response = self.publish(publish_mode="async")
+        self.assertEqual(response.status_code, 503)
+        # 출판 대기 상태의 스토리가 남지 않습니다.
+        self.assertFalse(Story.objects.exists())
+
+    def test_image_stored_again_during_release_is_kept(self):
+        stored_image = StoredImage.objects.create(
+            sha256="a" * 64, image="story/images/aa/a.png", ref_count=1
+        )
+        first = QuerySet.first
+
+        def store_concurrently(queryset):
+            # 참조가 0이 된 이미지를 찾는 사이에 다른 요청이 같은 이미지를 저장합니다.
+            orphan = first(queryset)
+            StoredImage.objects.filter(pk=stored_image.pk).update(
+                ref_count=F("ref_count") + 1
+            )
+            return orphan
+
+        with patch.object(QuerySet, "first", store_concurrently):
+            self.assertIsNone(StoredImage.objects.release(stored_image.image.name))
+        stored_image.refresh_from_db()
+        self.assertEqual(stored_image.ref_count, 1)
+
+    def test_identical_images_are_stored_once(self):
+        first_story_id = self.publish(image_url_list=["red", "red", "None"]).data[
+            "story_id"
+        ]
+        second_story_id = self.publish(image_url_list=["red", "None", "None"]).data[
+            "story_id"
+        ]
+
+        stored_image = StoredImage.objects.get()
+        self.assertEqual(stored_image.ref_count, 3)
+        image_names = set(
+            Content.objects.exclude(image="").values_list("image", flat=True)
+        )
+        self.assertEqual(image_names, {stored_image.image.name})
+        variant_path = stored_image.variants["thumbnails"]["256"]["jpeg"]
+
+        # 다른 스토리가 참조하는 이미지는 남겨 둡니다.
+        with self.captureOnCommitCallbacks(execute=True):
+            Story.objects.get(id=first_story_id).delete()
+        stored_image.refresh_from_db()
+        self.assertEqual(stored_image.ref_count, 1)
+        self.assertTrue(default_storage.exists(stored_image.image.name))
+
+        # 마지막 참조가 사라지면 이미지와 변환본 파일을 삭제합니다.
+        with self.captureOnCommitCallbacks(execute=True):
+            Story.objects.get(id=second_story_id).delete()
+        self.assertFalse(StoredImage.objects.exists())
+        self.assertFalse(default_storage.exists(stored_image.image.name))
+        self.assertFalse(default_storage.exists(variant_path))
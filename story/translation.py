@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from django.conf import settings
+from django.utils.timezone import now
+
+from story.models import TranslationCache
+from .backoff import provider_guards
+
+
+def translation_key(text, target_lang):
+    """원문과 대상 언어로 캐시 키(sha256)를 만듭니다."""
+    return hashlib.sha256(f"{target_lang}\0{text}".encode()).hexdigest()
+
+
+class CachedTranslator:
+    """
+    DeepL 번역 결과를 재사용하는 번역기입니다.
+
+    - 프로세스 메모리의 LRU 캐시 -> translation_cache 테이블 -> DeepL 순서로 조회합니다.
+    - DeepL로 번역한 결과는 테이블과 LRU 캐시에 저장합니다.
+    - LRU 캐시는 lru_size개까지만 보관하며, ttl이 지난 번역은 어느 쪽에서도 사용하지 않습니다.
+    """
+
+    def __init__(self, lru_size, ttl):
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._stats = {"lru_hits": 0, "db_hits": 0, "misses": 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _lru_get(self, key):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            translated_text, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return translated_text
+
+    def _lru_set(self, key, translated_text, expires_in):
+        with self._lock:
+            self._lru[key] = (translated_text, time.monotonic() + expires_in)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def translate(self, translator, text, target_lang):
+        """text를 target_lang으로 번역한 문자열을 반환합니다."""
+        if not text:
+            return text
+
+        key = translation_key(text, target_lang)
+        translated_text = self._lru_get(key)
+        if translated_text is not None:
+            self._count("lru_hits")
+            return translated_text
+
+        cached = (
+            TranslationCache.objects.filter(
+                source_hash=key, created_at__gt=now() - self.ttl
+            )
+            .only("translated_text", "created_at")
+            .first()
+        )
+        if cached is not None:
+            self._count("db_hits")
+            remaining = self.ttl - (now() - cached.created_at)
+            self._lru_set(key, cached.translated_text, remaining.total_seconds())
+            return cached.translated_text
+
+        self._count("misses")
+        translated_text = str(
+            provider_guards.get("deepl").call(
+                translator.translate_text, text, target_lang=target_lang
+            )
+        )
+        self.store(key, target_lang, translated_text)
+        return translated_text
+
+    def lookup_many(self, keys, texts):
+        """LRU 캐시와 테이블에서 찾은 번역을 {키: 번역} 형태로 반환합니다."""
+        results = {}
+
+        for key, text in zip(keys, texts):
+            if not text:
+                results[key] = text
+                continue
+            translated_text = self._lru_get(key)
+            if translated_text is not None:
+                self._count("lru_hits")
+                results[key] = translated_text
+
+        lookup_keys = {key for key in keys if key not in results}
+        if lookup_keys:
+            cached_rows = TranslationCache.objects.filter(
+                source_hash__in=lookup_keys, created_at__gt=now() - self.ttl
+            ).only("source_hash", "translated_text", "created_at")
+            for cached in cached_rows:
+                self._count("db_hits")
+                remaining = self.ttl - (now() - cached.created_at)
+                self._lru_set(
+                    cached.source_hash,
+                    cached.translated_text,
+                    remaining.total_seconds(),
+                )
+                results[cached.source_hash] = cached.translated_text
+        return results
+
+    def _missing(self, keys, texts, results):
+        # 같은 문장이 여러 번 있어도 한 번만 번역합니다.
+        missing = OrderedDict(
+            (key, text) for key, text in zip(keys, texts) if key not in results
+        )
+        if missing:
+            self._count("misses", len(missing))
+        return missing
+
+    def translate_many(self, translator, texts, target_lang):
+        """
+        여러 문장을 한 번에 번역해 입력 순서대로 반환합니다.
+        캐시에 없는 문장만 모아 DeepL 요청 한도 안에서 최대한 적은 횟수로 요청합니다.
+        """
+        keys = [translation_key(text, target_lang) for text in texts]
+        results = self.lookup_many(keys, texts)
+
+        missing = self._missing(keys, texts, results)
+        if missing:
+            missing_keys = list(missing)
+            translated = []
+            for batch in split_batches(list(missing.values())):
+                batch_results = provider_guards.get("deepl").call(
+                    translator.translate_text, batch, target_lang=target_lang
+                )
+                translated.extend(str(result) for result in batch_results)
+            self.store_many(target_lang, list(zip(missing_keys, translated)))
+            results.update(zip(missing_keys, translated))
+
+        return [results[key] for key in keys]
+
+    async def atranslate_many(self, translate_batch, texts, target_lang):
+        """
+        translate_many의 비동기 버전입니다.
+        translate_batch(문장 목록, 대상 언어)는 번역 결과 문자열 목록을 반환하는 코루틴 함수이며,
+        나눠진 요청들은 동시에 보냅니다.
+        """
+        keys = [translation_key(text, target_lang) for text in texts]
+        results = await sync_to_async(self.lookup_many)(keys, texts)
+
+        missing = self._missing(keys, texts, results)
+        if missing:
+            missing_keys = list(missing)
+            batch_results = await asyncio.gather(
+                *(
+                    provider_guards.get("deepl").acall(
+                        translate_batch, batch, target_lang
+                    )
+                    for batch in split_batches(list(missing.values()))
+                )
+            )
+            translated = [text for batch in batch_results for text in batch]
+            await sync_to_async(self.store_many)(
+                target_lang, list(zip(missing_keys, translated))
+            )
+            results.update(zip(missing_keys, translated))
+
+        return [results[key] for key in keys]
+
+    def store_many(self, target_lang, translations):
+        TranslationCache.objects.bulk_create(
+            [
+                TranslationCache(
+                    source_hash=key,
+                    target_lang=target_lang,
+                    translated_text=translated_text,
+                    created_at=now(),
+                )
+                for key, translated_text in translations
+            ],
+            update_conflicts=True,
+            unique_fields=["source_hash"],
+            update_fields=["target_lang", "translated_text", "created_at"],
+        )
+        for key, translated_text in translations:
+            self._lru_set(key, translated_text, self.ttl.total_seconds())
+
+    def store(self, key, target_lang, translated_text):
+        # 만료된 이전 번역이 남아 있으면 새 번역으로 덮어씁니다.
+        self.store_many(target_lang, [(key, translated_text)])
+
+    def stats(self):
+        """LRU/DB 캐시 적중 횟수와 적중률을 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["lru_size"] = len(self._lru)
+        total = stats["lru_hits"] + stats["db_hits"] + stats["misses"]
+        if total:
+            stats["hit_rate"] = round((stats["lru_hits"] + stats["db_hits"]) / total, 4)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._stats = {"lru_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def split_batches(texts):
+    """
+    DeepL 요청 한도(문장 개수, 요청 크기)를 넘지 않도록 문장 목록을 나눕니다.
+    한도보다 긴 문장 하나는 단독으로 요청합니다.
+    """
+    max_texts = settings.DEEPL_BATCH_MAX_TEXTS
+    max_bytes = settings.DEEPL_BATCH_MAX_BYTES
+    batch, batch_bytes = [], 0
+    for text in texts:
+        text_bytes = len(text.encode())
+        if batch and (len(batch) >= max_texts or batch_bytes + text_bytes > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(text)
+        batch_bytes += text_bytes
+    if batch:
+        yield batch
+
+
+def purge_expired_translations():
+    """TTL이 지난 번역 캐시를 삭제하고 삭제된 개수를 반환합니다."""
+    deleted, _ = TranslationCache.objects.filter(
+        created_at__lte=now() - cached_translator.ttl
+    ).delete()
+    return deleted
+
+
+cached_translator = CachedTranslator(
+    lru_size=settings.TRANSLATION_CACHE_LRU_SIZE,
+    ttl=timedelta(seconds=settings.TRANSLATION_CACHE_TTL),
+)
@@ -30,7 +30,53 @@ urlpatterns = [
         views.RequestFairytail.as_view(),
         name="request_fairytail_view",
     ),
+    path(
+        "fairytail_stream/",
+        views.FairytailStreamView.as_view(),
+        name="fairytail_stream_view",
+    ),
+    path(
+        "fairytail_jobs/",
+        views.FairytailJobView.as_view(),
+        name="fairytail_job_view",
+    ),
+    path(
+        "fairytail_jobs/<str:job_id>/",
+        views.FairytailJobView.as_view(),
+        name="fairytail_job_status_view",
+    ),
+    path(
+        "fairytail_jobs/<str:job_id>/result/",
+        views.FairytailJobResultView.as_view(),
+        name="fairytail_job_result_view",
+    ),
     path("image_dall-e/", views.RequestImage.as_view(), name="request_image_view"),
+    path("image_jobs/", views.ImageJobView.as_view(), name="image_job_view"),
+    path(
+        "image_jobs/<str:job_id>/",
+        views.ImageJobView.as_view(),
+        name="image_job_status_view",
+    ),
+    path(
+        "publish_jobs/<str:job_id>/",
+        views.PublishJobView.as_view(),
+        name="publish_job_view",
+    ),
+    path(
+        "async/fairytail_gpt/",
+        views.AsyncRequestFairytail.as_view(),
+        name="async_request_fairytail_view",
+    ),
+    path(
+        "async/image_dall-e/",
+        views.AsyncRequestImage.as_view(),
+        name="async_request_image_view",
+    ),
+    path(
+        "async/translation/",
+        views.AsyncStoryTranslation.as_view(),
+        name="async_story_translation",
+    ),
     path("kakao/", views.KakaoShareView.as_view(), name="kakao_share_view()"),
     path("translation/", views.StoryTranslation.as_view(), name="story_translation"),
 ]
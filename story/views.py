@@ -1,16 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status, exceptions
 from rest_framework.generics import get_object_or_404
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from django.core.files.base import ContentFile
 from django.conf import settings
 from django.utils.timezone import now
-import requests
+from celery.result import AsyncResult
+import asyncio
 import time
 import logging
-from story.models import Story, Comment
-from user.models import User, UserStoryTimeStamp, Ticket
+from asgiref.sync import sync_to_async
+from story.models import RANKING_GLOBAL_SCOPE, Story, StoryRanking, Comment
+from user.models import User, Ticket
+from user.view_tracking import story_view_buffer
 from story.serializers import (
     StoryListSerializer,
     StorySerializer,
@@ -21,16 +24,44 @@ from story.serializers import (
 )
 from user.permissions import IsAuthenticated
 
-from .ai_func import (
-    translate_text,
-    generate_images_from_text,
-    load_deepl_model,
-    load_open_ai_model,
-    load_pers_model,
-    run_gpt,
-    check_toxicity,
-    setup_gpt_messages,
+from .ai_async import atranslate_texts
+from .ai_func import load_deepl_model
+from .async_api import AsyncAPIView, json_response
+from .images import build_content_data
+from .pagination import (
+    LATEST_ORDERING,
+    LIKE_ORDERING,
+    InvalidCursor,
+    paginate_by_cursor,
 )
+from .pipeline import (
+    FairytailPipelineError,
+    arun_fairytail_pipeline,
+    arun_image_pipeline,
+    run_fairytail_pipeline,
+    run_image_pipeline,
+    stream_fairytail_pipeline,
+)
+from .response_cache import (
+    FEED_SCOPE,
+    comments_scope,
+    response_cache,
+    story_scope,
+)
+from .singleflight import (
+    async_fairytail_flight,
+    coalesce_job,
+    fairytail_flight,
+    fairytail_key,
+)
+from .streaming import EventStreamRenderer, event_stream_response, sse_event
+from .tasks import (
+    create_image_variants,
+    generate_fairytail,
+    generate_story_image,
+    publish_story,
+)
+from .translation import cached_translator
 
 # 로깅 설정
 logging.config.dictConfig(settings.LOGGING)
@@ -42,74 +73,142 @@ error_logger = logging.getLogger("error_logger")
 
 class RequestFairytail(APIView):
     def post(self, request):
-        # 모델 로드하기
-        deepl_translator = load_deepl_model()
-        openAI_client, chatGPT_model = load_open_ai_model()
-        pers_client = load_pers_model()
-
         # User에게 질문 받기
         user_input_message = request.data.get("subject", "")
-        print(request.data.get("subject", ""))
+        target_language = request.data.get("target_language", "")
 
-        # Deepl을 사용하여 User에게 받은 질문 영어로 번역하기
-        trans_result = translate_text(deepl_translator, user_input_message)
+        # 같은 주제/언어로 동시에 들어온 요청은 하나의 파이프라인 실행 결과를 함께 받습니다.
+        try:
+            gpt_trans_result = fairytail_flight.do(
+                fairytail_key(user_input_message, target_language),
+                run_fairytail_pipeline,
+                user_input_message,
+                target_language,
+            )
+        except FairytailPipelineError as e:
+            return Response(e.data, status=e.status_code)
 
-        # 번역된 값 형변환 'deepl.api_data.TextResult' -> 'str'
-        trans_str_result = str(trans_result)
+        return Response(
+            {
+                "status": "201",
+                "success": "동화를 성공적으로 생성했습니다.",
+                "script": gpt_trans_result,
+            },
+            status=status.HTTP_201_CREATED,
+        )
 
-        # Perspective API 사용하여 User가 입력한 질문에서 폭력성 검출하기
-        pers_user_score = check_toxicity(pers_client, trans_str_result)
 
-        # 폭력성 수치를 넘으면 다시 입력하게 하기
-        if pers_user_score > 0.3:
-            print("입력한 문장에서 폭력성이 검출되었습니다. 점수 : ", pers_user_score)
-            return Response(
-                {"status": "400", "error": "주제에서 폭력성이 검출되어 동화 생성이 불가능합니다. 주제를 수정해주세요."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+class FairytailStreamView(APIView):
+    """
+    동화를 문장 단위로 생성되는 대로 server-sent events로 보내줍니다.
 
-        # GPT 메세지 설정
-        input_gpt_messages = setup_gpt_messages(trans_result)
+    - sentence : 폭력성 검사(와 번역)를 마친 문장 {"text"}
+    - error : 생성 도중 실패한 경우 {"status", "error"}, 이후 스트림을 종료합니다.
+    - done : 생성 완료 {"status", "success", "script"}
+    주제 번역/검사 단계에서 실패하면 스트림을 시작하지 않고 오류 응답을 반환합니다.
+    """
 
-        # GPT 실행
-        gpt_response = run_gpt(openAI_client, chatGPT_model, input_gpt_messages)
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
 
-        # Perspective API 사용하여 GPT가 답변한 내용에서 폭력성 검출하기
-        pers_gpt_score = check_toxicity(pers_client, gpt_response)
+    def get(self, request):
+        # 브라우저 EventSource는 GET 요청만 보낼 수 있습니다.
+        return self.stream(request, request.query_params)
 
-        # 폭력성 수치를 넘으면 다시 입력하게 하기
-        if pers_gpt_score > 0.3:
-            print("GPT의 답변에서 폭력성이 검출되었습니다. 점수 : ", pers_gpt_score)
-            return Response(
+    def post(self, request):
+        return self.stream(request, request.data)
+
+    def stream(self, request, params):
+        try:
+            sentences = stream_fairytail_pipeline(
+                params.get("subject", ""), params.get("target_language", "")
+            )
+        except FairytailPipelineError as e:
+            return Response(e.data, status=e.status_code)
+
+        def events():
+            script = []
+            try:
+                for sentence in sentences:
+                    script.append(sentence)
+                    yield sse_event("sentence", {"text": sentence})
+            except FairytailPipelineError as e:
+                yield sse_event("error", e.data)
+                return
+            except Exception as e:
+                error_logger.error(f"동화 스트리밍 실패 : {str(e)}")
+                yield sse_event(
+                    "error",
+                    {"status": "500", "error": "동화 생성 실패했습니다. 다시 요청해주세요."},
+                )
+                return
+            yield sse_event(
+                "done",
                 {
-                    "status": "400",
-                    "error": "생성된 동화 내용에 폭력성이 검출되어 동화 생성이 불가능합니다. 주제를 수정해주세요.",
+                    "status": "201",
+                    "success": "동화를 성공적으로 생성했습니다.",
+                    "script": "".join(script),
                 },
-                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # 사용자가 선택한 언어가 영어일 경우 번역 없이 반환
-        if request.data.get("target_language", "") == "EN-US":
-            gpt_trans_result = gpt_response
-        else:
-            # 사용자가 선택한 언어로 GPT 답변 내용 번역
-            gpt_trans_result = translate_text(
-                deepl_translator, gpt_response, request.data.get("target_language", "")
-            )
+        return event_stream_response(request, events())
+
 
-        # 번역된 값 형변환 'deepl.api_data.TextResult' -> 'str'
-        gpt_trans_result = str(gpt_trans_result)
-        print(f"번역 ChatGPT : {gpt_trans_result}")
-        input_gpt_messages.append({"role": "assistant", "content": gpt_response})
+def describe_job(job_id):
+    """Celery 작업의 진행 상태를 API 응답 형태로 정리합니다."""
+    result = AsyncResult(job_id)
+    job_info = {"job_id": job_id, "state": result.state.lower()}
+    if result.state == "PROGRESS":
+        job_info["stage"] = (result.info or {}).get("stage")
+    return result, job_info
+
+
+class FairytailJobView(APIView):
+    def post(self, request):
+        """동화 생성 작업을 등록하고 작업 id를 즉시 반환합니다.
+
+        같은 주제/언어로 진행 중인 작업이 있으면 새로 등록하지 않고 그 작업 id를 반환합니다.
+        """
+        subject = request.data.get("subject", "")
+        target_language = request.data.get("target_language", "")
+        job_id, _ = coalesce_job(
+            fairytail_key(subject, target_language),
+            lambda task_id: generate_fairytail.apply_async(
+                (subject, target_language), task_id=task_id
+            ),
+        )
         return Response(
-            {
-                "status": "201",
-                "success": "동화를 성공적으로 생성했습니다.",
-                "script": gpt_trans_result,
-            },
-            status=status.HTTP_201_CREATED,
+            {"status": "202", "success": "동화 생성 작업이 등록되었습니다.", "job_id": job_id},
+            status=status.HTTP_202_ACCEPTED,
         )
 
+    def get(self, request, job_id):
+        """동화 생성 작업의 진행 상태(단계)를 조회합니다."""
+        _, job_info = describe_job(job_id)
+        return Response({"status": "200", **job_info}, status=status.HTTP_200_OK)
+
+
+def job_result_response(job_id, failure_message):
+    """완료된 작업의 결과를 반환하고, 아직 진행 중이면 진행 상태를 반환합니다."""
+    result, job_info = describe_job(job_id)
+    if result.successful():
+        return Response(result.result["data"], status=result.result["http_status"])
+    if result.failed():
+        error_logger.error(f"job {job_id} : {result.result!r}")
+        return Response(
+            {"status": "500", "error": failure_message, **job_info},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    return Response(
+        {"status": "202", "error": "작업을 처리하고 있습니다.", **job_info},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+class FairytailJobResultView(APIView):
+    def get(self, request, job_id):
+        """완료된 동화 생성 작업의 결과를 조회합니다."""
+        return job_result_response(job_id, "동화 생성에 실패했습니다. 다시 요청해주세요.")
+
 
 class RequestImage(APIView):
     permission_classes = [IsAuthenticated]
@@ -117,35 +216,24 @@ class RequestImage(APIView):
     def post(self, request):
         script = request.data.get("script", "")
 
-        # deepl 모델 로드
-        deepl_translator = load_deepl_model()
-        # Deepl을 사용하여 텍스트 번역
-        trans_script = translate_text(deepl_translator, script)
-
         # 사용자가 요청한 티켓 타입 추출
         ticket_type = request.data.get("ticket", "")
 
-        # 사용자의 티켓 정보 조회
-        user_tickets = Ticket.objects.get(ticket_owner=request.user)
-
-        # 티켓 타입에 따라 이미지 생성 및 티켓 차감
-        if ticket_type == "golden_ticket" and user_tickets.golden_ticket > 0:
-            image_url = generate_images_from_text(trans_script, "dall-e-3", "hd")
-            user_tickets.golden_ticket -= 1
-        elif ticket_type == "silver_ticket" and user_tickets.silver_ticket > 0:
-            image_url = generate_images_from_text(trans_script, "dall-e-3", "standard")
-            user_tickets.silver_ticket -= 1
-        elif ticket_type == "pink_ticket" and user_tickets.pink_ticket > 0:
-            image_url = generate_images_from_text(trans_script, "dall-e-2", "standard")
-            user_tickets.pink_ticket -= 1
-        else:
+        # 티켓을 먼저 차감(예약)하고, 이미지 생성에 실패하면 환불합니다.
+        if not Ticket.objects.reserve(request.user.id, ticket_type):
             return Response(
                 {"status": "402", "error": f"{ticket_type}이 부족합니다."},
                 status=status.HTTP_402_PAYMENT_REQUIRED,
             )
 
-        # 티켓 차감 및 변경된 정보 저장
-        user_tickets.save()
+        try:
+            image_url = run_image_pipeline(script, ticket_type)
+        except FairytailPipelineError as e:
+            Ticket.objects.refund(request.user.id, ticket_type)
+            return Response(e.data, status=e.status_code)
+        except Exception:
+            Ticket.objects.refund(request.user.id, ticket_type)
+            raise
 
         return Response(
             {"status": "201", "image_url": image_url},
@@ -153,16 +241,95 @@ class RequestImage(APIView):
         )
 
 
+class ImageJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """티켓을 예약하고 이미지 생성 작업을 등록합니다. 작업 id를 즉시 반환합니다."""
+        ticket_type = request.data.get("ticket", "")
+
+        if not Ticket.objects.reserve(request.user.id, ticket_type):
+            return Response(
+                {"status": "402", "error": f"{ticket_type}이 부족합니다."},
+                status=status.HTTP_402_PAYMENT_REQUIRED,
+            )
+
+        try:
+            job = generate_story_image.delay(
+                request.user.id, request.data.get("script", ""), ticket_type
+            )
+        except Exception as e:
+            Ticket.objects.refund(request.user.id, ticket_type)
+            error_logger.error(f"image job enqueue failed : {str(e)}")
+            return Response(
+                {"status": "503", "error": "이미지 생성 요청에 실패했습니다. 잠시 후 다시 요청해주세요."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        return Response(
+            {"status": "202", "success": "이미지 생성 작업이 등록되었습니다.", "job_id": job.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def get(self, request, job_id):
+        """이미지 생성 작업의 상태를 조회합니다. 완료되면 이미지 url을 반환합니다."""
+        return job_result_response(job_id, "이미지 생성에 실패했습니다. 다시 요청해주세요.")
+
+
+def use_cursor_pagination(request):
+    """cursor 파라미터가 있거나 pagination=cursor 일 때 커서 페이지네이션을 사용합니다."""
+    return "cursor" in request.GET or request.GET.get("pagination") == "cursor"
+
+
+def feed_cache_params(request):
+    """목록 응답 캐시 키에 포함할 페이지 파라미터입니다."""
+    return {name: request.GET.get(name) for name in ("page", "cursor", "pagination")}
+
+
+def cursor_page_response(request, stories, ordering):
+    """커서 페이지네이션으로 스토리 목록을 조회해 응답합니다."""
+    per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    try:
+        stories_page, next_cursor = paginate_by_cursor(
+            stories, ordering, request.GET.get("cursor"), per_page
+        )
+    except InvalidCursor:
+        return Response(
+            {"status": "400", "error": "잘못된 페이지 정보입니다."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    serializer = StoryListSerializer(stories_page, many=True)
+    return Response(
+        {
+            "status": "200",
+            "story_list": serializer.data,
+            "page_info": {"next_cursor": next_cursor, "has_next": bool(next_cursor)},
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
 class StorySortedByLikeView(APIView):
     def get(self, request):
         """
         모든 게시물을 좋아요 순으로 8개만 Response 합니다.
+        cursor 파라미터가 있으면 커서 페이지네이션으로 다음 페이지를 Response 합니다.
         """
-        stories = Story.objects.exclude(hate_count__gt=4).order_by(
-            "-like_count", "-created_at"
-        )[
-            :8
-        ]  # 좋아요 많은 / 최신순
+        return response_cache.respond(
+            "like_sorted",
+            [FEED_SCOPE],
+            feed_cache_params(request),
+            lambda: self.story_list_response(request),
+        )
+
+    def story_list_response(self, request):
+        stories = Story.objects.visible().for_feed()
+        if use_cursor_pagination(request):
+            # 커서 모드 : (좋아요 수, 작성 시각, id) 기준으로 다음 페이지를 조회합니다.
+            return cursor_page_response(request, stories, LIKE_ORDERING)
+
+        # 좋아요 많은 / 최신순 : 미리 계산해 둔 전체 순위에서 가져옵니다.
+        stories = StoryRanking.objects.top_stories(RANKING_GLOBAL_SCOPE, 8)
         serializer = StoryListSerializer(stories, many=True)
         return Response(
             {"status": "200", "story_list": serializer.data}, status=status.HTTP_200_OK
@@ -174,11 +341,16 @@ class StorySortedByCountryView(APIView):
         """
         국가별 게시물을 Response 합니다.
         """
-        stories = Story.objects.filter(
-            hate_count__lte=4, author__country=author_country
-        ).order_by("-like_count", "-created_at")[
-            :8
-        ]  # 국가별 / 좋아요 많은 / 최신순
+        return response_cache.respond(
+            "country_sorted",
+            [FEED_SCOPE],
+            {"country": author_country},
+            lambda: self.story_list_response(author_country),
+        )
+
+    def story_list_response(self, author_country):
+        # 국가별 / 좋아요 많은 / 최신순 : 미리 계산해 둔 국가별 순위에서 가져옵니다.
+        stories = StoryRanking.objects.top_stories(author_country, 8)
         serializer = StoryListSerializer(stories, many=True)
         return Response(
             {"status": "200", "story_list": serializer.data}, status=status.HTTP_200_OK
@@ -189,52 +361,79 @@ class StoryView(APIView):
     def get(self, request, story_id=None):
         """
         story_id가 없을 경우 모든 계시물을 Response 합니다.
+            - 기본은 page 파라미터를 사용하는 페이지 번호 방식입니다.
+            - cursor 파라미터가 있으면 전체 개수 없이 커서 방식으로 Response 합니다.
         story_id가 있을 경우 특정 게시물을 Response 합니다.
+        목록과 상세 응답은 캐시하며, 관련 이벤트가 발생하면 무효화합니다. (story.response_cache)
         """
+        if story_id is None:
+            return response_cache.respond(
+                "latest",
+                [FEED_SCOPE],
+                feed_cache_params(request),
+                lambda: self.story_list_response(request),
+            )
+        else:
+            """상세 페이지"""
+            response = response_cache.respond(
+                "detail",
+                [story_scope(story_id)],
+                {"story_id": story_id},
+                lambda: self.detail_response(story_id),
+            )
+            if response.status_code != status.HTTP_404_NOT_FOUND:
+                self.user_viewed(story_id)
+            return response
+
+    def story_list_response(self, request):
         page = request.GET.get("page", 1)
         per_page = settings.REST_FRAMEWORK["PAGE_SIZE"]
 
-        if story_id is None:
-            stories = Story.objects.exclude(hate_count__gt=4).order_by(
-                "-created_at"
-            )  # 최신순
-            paginator = Paginator(stories, per_page)
-            try:
-                stories_page = paginator.page(page)
-            except PageNotAnInteger:
-                stories_page = paginator.page(1)
-            except EmptyPage:
-                stories_page = paginator.page(paginator.num_pages)
-            serializer = StoryListSerializer(stories_page, many=True)
-            page_info = {
-                "current_page": stories_page.number,
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-            }
+        # 최신순
+        stories = Story.objects.visible().order_by("-created_at").for_feed()
+        if use_cursor_pagination(request):
+            # 커서 모드 : 전체 개수를 세지 않고 (작성 시각, id) 기준으로 조회합니다.
+            return cursor_page_response(request, stories, LATEST_ORDERING)
+        paginator = Paginator(stories, per_page)
+        try:
+            stories_page = paginator.page(page)
+        except PageNotAnInteger:
+            stories_page = paginator.page(1)
+        except EmptyPage:
+            stories_page = paginator.page(paginator.num_pages)
+        serializer = StoryListSerializer(stories_page, many=True)
+        page_info = {
+            "current_page": stories_page.number,
+            "total_pages": paginator.num_pages,
+            "total_items": paginator.count,
+        }
+        return Response(
+            {
+                "status": "200",
+                "story_list": serializer.data,
+                "page_info": page_info,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def detail_response(self, story_id):
+        story = Story.objects.get(id=story_id)
+        if not story.is_published:
             return Response(
-                {
-                    "status": "200",
-                    "story_list": serializer.data,
-                    "page_info": page_info,
-                },
+                {"status": "404", "error": "아직 출판 중인 스토리입니다."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if story.is_visible:
+            serializer = StorySerializer(story)
+            return Response(
+                {"status": "200", "detail": serializer.data},
                 status=status.HTTP_200_OK,
             )
         else:
-            """상세 페이지"""
-            story = Story.objects.get(id=story_id)
-            self.user_viewed(story)
-
-            if story.hate_count < 5:
-                serializer = StorySerializer(story)
-                return Response(
-                    {"status": "200", "detail": serializer.data},
-                    status=status.HTTP_200_OK,
-                )
-            else:
-                return Response(
-                    {"status": "403", "error": "관리자만 열람 가능한 스토리입니다."},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
+            return Response(
+                {"status": "403", "error": "관리자만 열람 가능한 스토리입니다."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
 
     def post(self, request):
         """게시글(동화) 작성 페이지입니다."""
@@ -249,30 +448,10 @@ class StoryView(APIView):
         paragraph_list = request.data.get("paragraph_list", "")
         image_url_list = request.data.get("image_url_list", "")
 
-        image_file_list = []
+        if request.data.get("publish_mode") == "async":
+            return self.publish_async(request, paragraph_list, image_url_list)
 
-        for image_url in image_url_list:
-            try:
-                response = requests.get(image_url)
-                if response.status_code == 200 and response.content:
-                    image_content = ContentFile(response.content)
-                    image_content.name = "story_image.jpg"
-                    image_file_list.append(image_content)
-            except:
-                image_file_list.append(None)
-
-        content_data = []
-
-        for i in range(len(paragraph_list)):
-            if image_file_list[i] == None:
-                content_dic = {"paragraph": paragraph_list[i]}
-                content_data.append(content_dic)
-            else:
-                content_dic = {
-                    "paragraph": paragraph_list[i],
-                    "image": image_file_list[i],
-                }
-                content_data.append(content_dic)
+        content_data = build_content_data(paragraph_list, image_url_list)
 
         content_serializer = ContentCreateSerializer(
             data=content_data, partial=True, many=True
@@ -283,6 +462,11 @@ class StoryView(APIView):
             if story_serializer.is_valid():
                 story = story_serializer.save(author=request.user)
                 content_serializer.save(story=story)
+                story.refresh_cover()
+                StoryRanking.objects.refresh_story(story.id)
+                response_cache.story_changed(story.id, "publish")
+                # 썸네일과 WebP 이미지는 백그라운드에서 만듭니다.
+                create_image_variants.delay(story.id)
                 story_id = story.id
                 end_time = time.time()
                 info_logger.info(f"{end_time - start_time:.2f} seconds, 동화책 출판 성공")
@@ -305,6 +489,39 @@ class StoryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    def publish_async(self, request, paragraph_list, image_url_list):
+        """
+        스토리를 출판 대기 상태로 먼저 저장하고 id를 즉시 반환합니다.
+        이미지 다운로드와 문단 저장은 Celery 작업에서 처리하며, 완료되면 출판 상태로 바뀝니다.
+        """
+        story_serializer = StoryCreateSerializer(data=request.data)
+        if not story_serializer.is_valid():
+            error_logger.error(f"story_serializer : {story_serializer.errors}")
+            return Response(
+                {"status": "400", "error": "동화책 작성에 실패했습니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        story = story_serializer.save(author=request.user, is_published=False)
+        try:
+            job = publish_story.delay(story.id, paragraph_list, image_url_list)
+        except Exception as e:
+            # 출판 작업을 등록하지 못하면 출판 대기 중인 스토리가 남지 않도록 삭제합니다.
+            story.delete()
+            error_logger.error(f"publish job enqueue failed : {str(e)}")
+            return Response(
+                {"status": "503", "error": "동화 출판 요청에 실패했습니다. 잠시 후 다시 요청해주세요."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(
+            {
+                "status": "202",
+                "success": "동화를 출판하고 있습니다.",
+                "story_id": story.id,
+                "job_id": job.id,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     def delete(self, request, story_id):
         """작성된 게시글(동화)을 삭제하는 기능입니다."""
         try:
@@ -330,13 +547,14 @@ class StoryView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-    def user_viewed(self, story):
+    def user_viewed(self, story_id):
         user = self.request.user
         if not user.is_authenticated:
             return
-        ust, _ = UserStoryTimeStamp.objects.get_or_create(user=user, story=story)
-        ust.save()
-        return ust.timestamp
+        # 조회 기록은 버퍼에 모았다가 백그라운드에서 한 번에 저장합니다.
+        viewed_at = now()
+        story_view_buffer.record(user.id, story_id, viewed_at)
+        return viewed_at
 
 
 class LikeView(APIView):
@@ -344,29 +562,22 @@ class LikeView(APIView):
 
     def post(self, request, story_id):
         """게시글 좋아요 기능입니다."""
-        try:
-            story = Story.objects.get(id=story_id)
-        except Story.DoesNotExist:
+        if not Story.objects.filter(id=story_id).exists():
             raise exceptions.NotFound({"status": "404", "error": "스토리를 찾을 수 없습니다."})
 
-        if request.user in story.like.all():
-            story.like.remove(request.user)
-            story.like_count -= 1
-            story.save()
-            like_count = story.like_count
-            return Response(
-                {"status": "200", "success": "좋아요 취소", "like_count": like_count},
-                status=status.HTTP_200_OK,
-            )
-        else:
-            story.like.add(request.user)
-            story.like_count += 1
-            story.save()
-            like_count = story.like_count
-            return Response(
-                {"status": "200", "success": "좋아요", "like_count": like_count},
-                status=status.HTTP_200_OK,
-            )
+        liked, like_count = Story.objects.toggle_reaction(
+            story_id, request.user.id, "like", "like_count"
+        )
+        StoryRanking.objects.refresh_story(story_id)
+        response_cache.story_changed(story_id, "like")
+        return Response(
+            {
+                "status": "200",
+                "success": "좋아요" if liked else "좋아요 취소",
+                "like_count": like_count,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class HateView(APIView):
@@ -374,29 +585,22 @@ class HateView(APIView):
 
     def post(self, request, story_id):
         """게시글 싫어요 기능입니다."""
-        try:
-            story = Story.objects.get(id=story_id)
-        except Story.DoesNotExist:
+        if not Story.objects.filter(id=story_id).exists():
             raise exceptions.NotFound({"status": "404", "error": "스토리를 찾을 수 없습니다."})
 
-        if request.user in story.hate.all():
-            story.hate.remove(request.user)
-            story.hate_count -= 1
-            story.save()
-            hate_count = story.hate_count
-            return Response(
-                {"status": "200", "success": "싫어요 취소", "hate_count": hate_count},
-                status=status.HTTP_200_OK,
-            )
-        else:
-            story.hate.add(request.user)
-            story.hate_count += 1
-            story.save()
-            hate_count = story.hate_count
-            return Response(
-                {"status": "200", "success": "싫어요", "hate_count": hate_count},
-                status=status.HTTP_200_OK,
-            )
+        hated, hate_count = Story.objects.toggle_reaction(
+            story_id, request.user.id, "hate", "hate_count"
+        )
+        StoryRanking.objects.refresh_story(story_id)
+        response_cache.story_changed(story_id, "hate")
+        return Response(
+            {
+                "status": "200",
+                "success": "싫어요" if hated else "싫어요 취소",
+                "hate_count": hate_count,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class BookmarkView(APIView):
@@ -411,11 +615,13 @@ class BookmarkView(APIView):
 
         if request.user in story.bookmark.all():
             story.bookmark.remove(request.user)
+            response_cache.story_changed(story_id, "bookmark")
             return Response(
                 {"status": "200", "success": "북마크 취소"}, status=status.HTTP_200_OK
             )
         else:
             story.bookmark.add(request.user)
+            response_cache.story_changed(story_id, "bookmark")
             return Response(
                 {"status": "200", "success": "북마크"}, status=status.HTTP_200_OK
             )
@@ -424,6 +630,14 @@ class BookmarkView(APIView):
 class CommentView(APIView):
     def get(self, request, story_id):
         """댓글을 조회합니다."""
+        return response_cache.respond(
+            "comments",
+            [comments_scope(story_id)],
+            {"story_id": story_id},
+            lambda: self.comment_list_response(story_id),
+        )
+
+    def comment_list_response(self, story_id):
         story = Story.objects.get(id=story_id)
         comments = story.comment_set.all().order_by("-id")
         serializer = CommentSerializer(comments, many=True)
@@ -437,6 +651,7 @@ class CommentView(APIView):
             serializer = CommentCreateSerializer(data=request.data)
             if serializer.is_valid():
                 serializer.save(author=request.user, story_id=story_id)
+                response_cache.story_changed(story_id, "comment")
                 return Response(
                     {"status": "201", "success": "댓글 작성 완료"},
                     status=status.HTTP_201_CREATED,
@@ -458,6 +673,7 @@ class CommentView(APIView):
             comment = get_object_or_404(Comment, id=comment_id)
             if request.user == comment.author:
                 comment.delete()
+                response_cache.story_changed(comment.story_id, "comment")
                 return Response(
                     {"status": "204", "success": "댓글 삭제 완료"},
                     status=status.HTTP_204_NO_CONTENT,
@@ -474,6 +690,12 @@ class CommentView(APIView):
             )
 
 
+class PublishJobView(APIView):
+    def get(self, request, job_id):
+        """비동기 출판 작업의 상태를 조회합니다."""
+        return job_result_response(job_id, "동화 출판에 실패했습니다. 다시 시도해주세요.")
+
+
 class KakaoShareView(APIView):
     """카카오 API 키를 제공하는 뷰입니다."""
 
@@ -491,24 +713,17 @@ class StoryTranslation(APIView):
             deepl_translator = load_deepl_model()
             deepl_target_lang = request.data.get("target_language", "")
 
-            # 제목 번역
-            trans_title_result = deepl_translator.translate_text(
-                request.data.get("story_title", ""), target_lang=deepl_target_lang
+            # 제목과 모든 문단을 한 번의 DeepL 요청으로 번역합니다. (캐시된 문장 제외)
+            paragraphs = [
+                script["paragraph"] for script in request.data.get("story_script", "")
+            ]
+            translated_texts = cached_translator.translate_many(
+                deepl_translator,
+                [request.data.get("story_title", "")] + paragraphs,
+                deepl_target_lang,
             )
-
-            trans_title_str_result = str(trans_title_result)
-
-            translated_scripts = []
-
-            # 스크립트 번역
-            for script in request.data.get("story_script", ""):
-                trans_script_result = deepl_translator.translate_text(
-                    script["paragraph"], target_lang=deepl_target_lang
-                )
-
-                # 번역된 값 형변환 'deepl.api_data.TextResult' -> 'str'
-                trans_script_str_result = str(trans_script_result)
-                translated_scripts.append(trans_script_str_result)
+            trans_title_str_result = translated_texts[0]
+            translated_scripts = translated_texts[1:]
 
             return Response(
                 {
@@ -522,3 +737,100 @@ class StoryTranslation(APIView):
             return Response(
                 {"status": "400", "error": "번역 실패"}, status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class AsyncRequestFairytail(AsyncAPIView):
+    """RequestFairytail의 비동기(ASGI) 버전입니다."""
+
+    async def post(self, request):
+        user_input_message = request.data.get("subject", "")
+        target_language = request.data.get("target_language", "")
+
+        try:
+            gpt_trans_result = await async_fairytail_flight.do(
+                fairytail_key(user_input_message, target_language),
+                arun_fairytail_pipeline,
+                user_input_message,
+                target_language,
+            )
+        except FairytailPipelineError as e:
+            return json_response(e.data, e.status_code)
+        except Exception as e:
+            error_logger.error(f"동화 생성 실패 : {str(e)}")
+            return json_response(
+                {"status": "500", "error": "동화 생성 실패했습니다. 다시 요청해주세요."},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return json_response(
+            {
+                "status": "201",
+                "success": "동화를 성공적으로 생성했습니다.",
+                "script": gpt_trans_result,
+            },
+            status.HTTP_201_CREATED,
+        )
+
+
+class AsyncRequestImage(AsyncAPIView):
+    """RequestImage의 비동기(ASGI) 버전입니다."""
+
+    permission_required = True
+
+    async def post(self, request):
+        script = request.data.get("script", "")
+        ticket_type = request.data.get("ticket", "")
+
+        # 티켓을 먼저 차감(예약)하고, 이미지 생성에 실패하면 환불합니다.
+        if not await sync_to_async(Ticket.objects.reserve)(
+            request.user.id, ticket_type
+        ):
+            return json_response(
+                {"status": "402", "error": f"{ticket_type}이 부족합니다."},
+                status.HTTP_402_PAYMENT_REQUIRED,
+            )
+
+        try:
+            image_url = await arun_image_pipeline(script, ticket_type)
+        except FairytailPipelineError as e:
+            await sync_to_async(Ticket.objects.refund)(request.user.id, ticket_type)
+            return json_response(e.data, e.status_code)
+        except BaseException:
+            # 요청이 취소된 경우(asyncio.CancelledError)에도 티켓을 돌려줍니다.
+            await asyncio.shield(
+                sync_to_async(Ticket.objects.refund)(request.user.id, ticket_type)
+            )
+            raise
+
+        return json_response(
+            {"status": "201", "image_url": image_url}, status.HTTP_201_CREATED
+        )
+
+
+class AsyncStoryTranslation(AsyncAPIView):
+    """StoryTranslation의 비동기(ASGI) 버전입니다."""
+
+    async def post(self, request):
+        try:
+            paragraphs = [
+                script["paragraph"] for script in request.data.get("story_script", "")
+            ]
+            translated_texts = await atranslate_texts(
+                [request.data.get("story_title", "")] + paragraphs,
+                request.data.get("target_language", ""),
+            )
+            if isinstance(translated_texts, Response):
+                raise FairytailPipelineError.from_response(translated_texts)
+        except Exception:
+            return json_response(
+                {"status": "400", "error": "번역 실패"}, status.HTTP_400_BAD_REQUEST
+            )
+
+        return json_response(
+            {
+                "status": "200",
+                "translated_scripts": translated_texts[1:],
+                "translated_title": translated_texts[0],
+            },
+            status.HTTP_200_OK,
+        )
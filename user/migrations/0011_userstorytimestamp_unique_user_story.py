@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.utils.timezone
+from django.db.models import Max
+
+
+def remove_duplicate_timestamps(apps, schema_editor):
+    # (user, story)마다 가장 최근 조회 기록 하나만 남깁니다.
+    UserStoryTimeStamp = apps.get_model("user", "UserStoryTimeStamp")
+    duplicates = (
+        UserStoryTimeStamp.objects.values("user", "story")
+        .annotate(keep_id=Max("id"))
+        .order_by()
+    )
+    for row in duplicates.iterator():
+        UserStoryTimeStamp.objects.filter(
+            user=row["user"], story=row["story"]
+        ).exclude(id=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0010_alter_userstorytimestamp_timestamp"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userstorytimestamp",
+            name="timestamp",
+            field=models.DateTimeField(
+                blank=True,
+                default=django.utils.timezone.now,
+                null=True,
+                verbose_name="Time Stamp",
+            ),
+        ),
+        migrations.RunPython(
+            remove_duplicate_timestamps, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="userstorytimestamp",
+            constraint=models.UniqueConstraint(
+                fields=("user", "story"), name="unique_user_story_timestamp"
+            ),
+        ),
+    ]
@@ -1,11 +1,12 @@
 from django.db import models
+from django.db.models import F
+from django.utils.timezone import now
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.conf import settings
 from story.models import Story
 
 
 class UserManager(BaseUserManager):
-
     """사용자 모델을 생성하고 관리하는 클래스입니다."""
 
     def create_user(self, email, nickname, country, password):
@@ -114,12 +115,49 @@ class UserStoryTimeStamp(models.Model):
     - user : 스토리를 조회한 유저입니다.
     - story : 사용자가 조회한 스토리입니다.
     - timestamp : 사용자가 스토리를 조회한 시간을 기록합니다.
+        - 조회 기록은 user.view_tracking 버퍼에 모였다가 (user, story) 기준 upsert로 저장됩니다.
     """
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timestamps")
     story = models.ForeignKey(
         Story, on_delete=models.CASCADE, related_name="timestamps"
     )
-    timestamp = models.DateTimeField("Time Stamp", auto_now=True, blank=True, null=True)
+    timestamp = models.DateTimeField("Time Stamp", default=now, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "story"], name="unique_user_story_timestamp"
+            ),
+        ]
+
+
+TICKET_TYPES = ("golden_ticket", "silver_ticket", "pink_ticket")
+
+
+class TicketManager(models.Manager):
+    """티켓 차감(예약)과 환불을 원자적으로 처리하는 클래스입니다."""
+
+    def reserve(self, owner_id, ticket_type):
+        """
+        티켓을 1장 차감합니다.
+        남은 티켓이 있을 때만 차감되도록 UPDATE 조건에 '> 0'을 포함하므로 동시 요청에도 중복 사용되지 않습니다.
+        차감에 성공하면 True, 티켓이 부족하면 False를 반환합니다.
+        """
+
+        if ticket_type not in TICKET_TYPES:
+            return False
+        reserved = self.filter(
+            ticket_owner_id=owner_id, **{f"{ticket_type}__gt": 0}
+        ).update(**{ticket_type: F(ticket_type) - 1})
+        return reserved > 0
+
+    def refund(self, owner_id, ticket_type):
+        """예약했던 티켓 1장을 되돌려줍니다."""
+
+        self.filter(ticket_owner_id=owner_id).update(
+            **{ticket_type: F(ticket_type) + 1}
+        )
 
 
 class Ticket(models.Model):
@@ -144,6 +182,8 @@ class Ticket(models.Model):
     silver_ticket = models.PositiveIntegerField("실버 티켓", default=2)
     pink_ticket = models.PositiveIntegerField("핑크 티켓", default=10)
 
+    objects = TicketManager()
+
     class Meta:
         db_table = "ticket"
 
@@ -84,20 +84,27 @@ class MypageSerializer(serializers.ModelSerializer):
     )
 
     def get_my_story_list(self, obj):
-        my_stories = obj.story_set.filter(hate_count__lte=4).order_by("-created_at")
+        my_stories = (
+            obj.story_set.visible()
+            .order_by("-created_at")
+            .for_feed()
+        )
         return StoryListSerializer(my_stories, many=True).data
 
     def get_bookmark_story_list(self, obj):
-        bookmarked_stories = obj.bookmark_stories.filter(hate_count__lte=4).order_by(
-            "-created_at"
+        bookmarked_stories = (
+            obj.bookmark_stories.visible()
+            .order_by("-created_at")
+            .for_feed()
         )
         return StoryListSerializer(bookmarked_stories, many=True).data
 
     def get_story_timestamps(self, obj):
         stories = (
-            Story.objects.all()
-            .filter(hate_count__lte=4, timestamps__user=obj)
+            Story.objects.visible()
+            .filter(timestamps__user=obj)
             .order_by("-timestamps__timestamp")
+            .for_feed()
         )
         return StoryListSerializer(stories, many=True).data
 
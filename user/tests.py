@@ -1,5 +1,9 @@
+from datetime import datetime
 from django.test import TestCase
-from user.models import User, UserManager, Ticket, PaymentResult
+from user.models import User, UserManager, Ticket, PaymentResult, UserStoryTimeStamp
+from user.view_tracking import StoryViewBuffer
+from django.core.cache import cache
+from story.models import Story, StoryRanking
 from unittest.mock import patch
 from django.urls import reverse
 from .serializers import LoginSerializer
@@ -155,6 +159,77 @@ class UserInfoTest(TestCase):
         self.assertEqual(users.count(), 0)
         self.assertEqual(response.status_code, 204)
 
+    def test_delete_account_invalidates_cached_stories(self):
+        cache.clear()
+        author = User.objects.create_user(
+            email="author@email.com",
+            nickname="author",
+            country="미국",
+            password="1234567!",
+        )
+        story = Story.objects.create(author=author, title="liked", like_count=1)
+        story.like.add(self.user)
+        story.bookmark.add(self.user)
+        StoryRanking.objects.refresh_story(story.id)
+        detail_url = reverse("detail_page_view", args=[story.id])
+        self.client.get(detail_url)
+        self.assertEqual(self.client.get(detail_url)["X-Cache"], "HIT")
+
+        response = self.client.delete(
+            reverse("user_info_view"),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+            content_type="application/json",
+            data={"password": "1234567!"},
+        )
+        self.assertEqual(response.status_code, 204)
+
+        # 탈퇴한 사용자의 좋아요/북마크가 빠진 상세 응답을 다시 만듭니다.
+        response = self.client.get(detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["detail"]["like_count"], 0)
+        self.assertEqual(response.data["detail"]["bookmark_user_list"], [])
+        self.assertEqual(
+            set(
+                StoryRanking.objects.filter(story=story).values_list(
+                    "like_count", flat=True
+                )
+            ),
+            {0},
+        )
+
+    def test_delete_account_removes_own_reactions(self):
+        author = User.objects.create_user(
+            email="author@email.com",
+            nickname="author",
+            country="미국",
+            password="1234567!",
+        )
+        # 싫어요가 기준(5개) 이상이라 숨겨진 두 스토리입니다.
+        liked = Story.objects.create(
+            author=author, title="liked", like_count=1, hate_count=5, is_visible=False
+        )
+        hated = Story.objects.create(
+            author=author, title="hated", hate_count=5, is_visible=False
+        )
+        liked.like.add(self.user)
+        hated.hate.add(self.user)
+
+        response = self.client.delete(
+            reverse("user_info_view"),
+            HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+            content_type="application/json",
+            data={"password": "1234567!"},
+        )
+        self.assertEqual(response.status_code, 204)
+
+        liked.refresh_from_db()
+        hated.refresh_from_db()
+        # 좋아요만 한 스토리의 싫어요 개수는 그대로이므로 계속 숨겨집니다.
+        self.assertEqual((liked.like_count, liked.hate_count), (0, 5))
+        self.assertFalse(liked.is_visible)
+        self.assertEqual(hated.hate_count, 4)
+        self.assertTrue(hated.is_visible)
+
     # 유저 비밀번호 변경 PATCH
     def patch_user_info_test(self):
         response = self.client.patch(
@@ -278,3 +353,59 @@ class PaymentTest(TestCase):
         self.assertEqual(response.data["pink_ticket_count"], user_pink)
         self.assertEqual(response.data["silver_ticket_count"], user_silver)
         self.assertEqual(response.data["golden_ticket_count"], user_golden)
+
+
+class StoryViewBufferTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="testuser@email.com",
+            nickname="testuser",
+            country="미국",
+            password="1234567!",
+        )
+        cls.story = Story.objects.create(author=cls.user, title="test")
+
+    def test_views_are_flushed_as_upsert(self):
+        buffer = StoryViewBuffer(max_size=100, flush_interval=5, background=False)
+        first_view = datetime(2024, 1, 1, 12, 0)
+        last_view = datetime(2024, 1, 1, 12, 5)
+        buffer.record(self.user.id, self.story.id, first_view)
+        buffer.record(self.user.id, self.story.id, last_view)
+        # 저장 전에는 DB에 기록이 없습니다.
+        self.assertFalse(UserStoryTimeStamp.objects.exists())
+
+        self.assertEqual(buffer.flush(), 1)
+        buffer.record(self.user.id, self.story.id, last_view)
+        buffer.flush()
+
+        timestamps = UserStoryTimeStamp.objects.filter(user=self.user, story=self.story)
+        self.assertEqual(timestamps.count(), 1)
+        self.assertEqual(timestamps.get().timestamp, last_view)
+
+    def test_views_of_deleted_story_are_dropped(self):
+        buffer = StoryViewBuffer(max_size=100, flush_interval=5, background=False)
+        deleted_story = Story.objects.create(author=self.user, title="deleted")
+        buffer.record(self.user.id, self.story.id)
+        buffer.record(self.user.id, deleted_story.id)
+        deleted_story.delete()
+
+        self.assertEqual(buffer.flush(), 1)
+        # 삭제된 스토리의 기록은 버퍼에 다시 쌓이지 않습니다.
+        self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(
+            list(UserStoryTimeStamp.objects.values_list("story_id", flat=True)),
+            [self.story.id],
+        )
+
+    def test_failed_bulk_flush_falls_back_to_single_rows(self):
+        buffer = StoryViewBuffer(max_size=100, flush_interval=5, background=False)
+        buffer.record(self.user.id, self.story.id)
+        with patch.object(
+            UserStoryTimeStamp.objects, "bulk_create", side_effect=Exception("fail")
+        ):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(buffer.pending(), 0)
+        self.assertTrue(
+            UserStoryTimeStamp.objects.filter(user=self.user, story=self.story).exists()
+        )
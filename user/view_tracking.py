@@ -0,0 +1,153 @@
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+# 로깅 설정
+logging.config.dictConfig(settings.LOGGING)
+
+# 로거 가져오기
+error_logger = logging.getLogger("error_logger")
+
+
+class StoryViewBuffer:
+    """
+    스토리 조회 기록(UserStoryTimeStamp)을 메모리에 모아 두었다가 한 번에 저장하는 버퍼입니다.
+
+    - 같은 (user, story) 조회는 가장 최근 조회 시각만 남깁니다.
+    - 버퍼 크기가 max_size 이상이 되거나 flush_interval 초가 지나면 백그라운드 스레드에서
+      bulk upsert로 저장하므로, 상세 페이지 응답이 DB 쓰기를 기다리지 않습니다.
+    - background=False 이면 스레드 없이 버퍼가 가득 찼을 때 호출한 쪽에서 바로 저장합니다.
+    """
+
+    def __init__(self, max_size, flush_interval, background=True):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self._lock = threading.Lock()
+        self._events = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record(self, user_id, story_id, viewed_at=None):
+        """조회 기록을 버퍼에 추가합니다."""
+        with self._lock:
+            self._events[(user_id, story_id)] = viewed_at or now()
+            is_full = len(self._events) >= self.max_size
+
+        if not self.background:
+            if is_full:
+                self.flush()
+            return
+
+        self._ensure_flusher()
+        if is_full:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._events)
+
+    def flush(self):
+        """
+        버퍼에 쌓인 조회 기록을 (user, story) 기준 upsert로 한 번에 저장합니다.
+
+        - 그사이 삭제된 스토리나 유저의 기록은 저장하지 않고 버립니다.
+        - 한 번에 저장하지 못하면 한 건씩 저장하고, 저장할 수 없는 기록은 버립니다.
+          (실패한 기록을 버퍼에 다시 넣으면 같은 기록이 계속 실패합니다.)
+        """
+        from story.models import Story
+        from user.models import User, UserStoryTimeStamp
+
+        with self._lock:
+            events, self._events = self._events, {}
+        if not events:
+            return 0
+
+        story_ids = set(
+            Story.objects.filter(
+                id__in={story_id for _, story_id in events}
+            ).values_list("id", flat=True)
+        )
+        user_ids = set(
+            User.objects.filter(id__in={user_id for user_id, _ in events}).values_list(
+                "id", flat=True
+            )
+        )
+        timestamps = [
+            UserStoryTimeStamp(user_id=user_id, story_id=story_id, timestamp=viewed_at)
+            for (user_id, story_id), viewed_at in events.items()
+            if user_id in user_ids and story_id in story_ids
+        ]
+        if not timestamps:
+            return 0
+
+        try:
+            with transaction.atomic():
+                UserStoryTimeStamp.objects.bulk_create(
+                    timestamps,
+                    update_conflicts=True,
+                    unique_fields=["user", "story"],
+                    update_fields=["timestamp"],
+                )
+        except Exception as e:
+            error_logger.error(f"StoryViewBuffer) bulk flush failed: {str(e)}")
+            return self._flush_one_by_one(timestamps)
+        return len(timestamps)
+
+    def _flush_one_by_one(self, timestamps):
+        from user.models import UserStoryTimeStamp
+
+        saved = 0
+        for timestamp in timestamps:
+            try:
+                with transaction.atomic():
+                    UserStoryTimeStamp.objects.update_or_create(
+                        user_id=timestamp.user_id,
+                        story_id=timestamp.story_id,
+                        defaults={"timestamp": timestamp.timestamp},
+                    )
+            except Exception as e:
+                error_logger.error(
+                    f"StoryViewBuffer) dropped view (user={timestamp.user_id}, "
+                    f"story={timestamp.story_id}): {str(e)}"
+                )
+                continue
+            saved += 1
+        return saved
+
+    def _ensure_flusher(self):
+        # fork 이후 자식 프로세스에서는 스레드를 새로 시작합니다.
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="story-view-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+story_view_buffer = StoryViewBuffer(
+    max_size=settings.STORY_VIEW_BUFFER_SIZE,
+    flush_interval=settings.STORY_VIEW_FLUSH_INTERVAL,
+    background=settings.STORY_VIEW_BACKGROUND_FLUSH,
+)
+
+# 프로세스 종료 시 남은 기록을 저장합니다.
+atexit.register(story_view_buffer.flush)
@@ -9,6 +9,7 @@ from django.contrib.auth.hashers import check_password
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes
+from django.db import transaction
 from django.db.models import Sum
 from rest_framework import status
 from rest_framework.views import APIView
@@ -32,7 +33,8 @@ from .tasks import (
     send_verification_email_for_pw,
     send_email_with_pw,
 )
-from story.models import Story
+from story.models import Story, StoryRanking
+from story.response_cache import response_cache
 import requests
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.shortcuts import redirect
@@ -488,13 +490,31 @@ class UserInfoView(APIView):
 
         auth_user = authenticate(email=request.user.email, password=password)
         if auth_user:
-            stories_to_update = Story.objects.filter(like=request.user)
-            for story in stories_to_update:
-                story.like_count -= 1
-                story.hate_count -= 1
-                story.save()
+            # 탈퇴한 사용자의 좋아요/북마크/댓글이 포함된 캐시 응답과 순위를 갱신합니다.
+            # (사용자가 작성한 스토리는 삭제 시그널에서 처리합니다.)
+            bookmarked_story_ids = list(
+                auth_user.bookmark_stories.values_list("id", flat=True)
+            )
+            commented_story_ids = list(
+                auth_user.comment_set.values_list("story_id", flat=True).distinct()
+            )
 
-            auth_user.delete()
+            with transaction.atomic():
+                liked_story_ids, hated_story_ids = Story.objects.remove_reactions_of(
+                    auth_user.id
+                )
+                auth_user.delete()
+            for event, story_ids in [
+                ("like", liked_story_ids),
+                ("hate", hated_story_ids),
+            ]:
+                for story_id in story_ids:
+                    response_cache.story_changed(story_id, event)
+                    StoryRanking.objects.refresh_story(story_id)
+            for story_id in bookmarked_story_ids:
+                response_cache.story_changed(story_id, "bookmark")
+            for story_id in commented_story_ids:
+                response_cache.story_changed(story_id, "comment")
             return Response(
                 {"status": "204", "success": "회원 탈퇴가 완료되었습니다."},
                 status=status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,227 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import InvalidCacheBackendError
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+
+class LocalTier:
+    """
+    프로세스 메모리의 LRU 캐시입니다.
+
+    - 최대 max_entries개까지 저장하며, 가장 오래 사용하지 않은 항목부터 버립니다.
+    - 값은 pickle로 복사해 저장하므로, 꺼낸 값을 수정해도 캐시에 영향이 없습니다.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """(찾았는지 여부, 값)을 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+        return True, pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, pickled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache(BaseCache):
+    """
+    프로세스 메모리 LRU(local) 뒤에 여러 프로세스가 함께 쓰는 캐시(shared)를 둔 2단계 캐시입니다.
+
+    - 조회 : local -> shared 순서로 찾고, shared에서 찾은 값은 local에 채웁니다.
+    - 저장/삭제/incr/add : shared에 먼저 반영한 뒤 local을 갱신합니다.
+    - local 항목은 LOCAL_TIMEOUT초만 유지합니다. 다른 프로세스의 변경은 최대 이 시간만큼 늦게 보입니다.
+
+    OPTIONS
+    - SHARED : shared 캐시 설정 (CACHES 항목과 같은 형식)
+    - LOCAL_MAX_ENTRIES : local에 저장할 최대 항목 수
+    - LOCAL_TIMEOUT : local 항목의 최대 유지 시간(초)
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        try:
+            shared = dict(options["SHARED"])
+        except KeyError:
+            raise InvalidCacheBackendError(
+                "TieredCache에는 OPTIONS['SHARED']가 필요합니다."
+            )
+        shared.setdefault("TIMEOUT", params.get("TIMEOUT", 300))
+        backend = import_string(shared.pop("BACKEND"))
+        self.shared = backend(shared.pop("LOCATION", ""), shared)
+        self.local = LocalTier(options.get("LOCAL_MAX_ENTRIES", 1024))
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ["local_hits", "local_misses", "shared_hits", "shared_misses"], 0
+        )
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for name, count in counts.items():
+                self._stats[name] += count
+
+    def _local_ttl(self, timeout):
+        # shared의 유효 시간보다 오래 local에 남지 않도록 합니다.
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _fill_local(self, key, value, timeout=DEFAULT_TIMEOUT):
+        ttl = self._local_ttl(timeout)
+        if ttl > 0:
+            self.local.set(key, value, ttl)
+        else:
+            self.local.delete(key)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._fill_local(local_key, value, timeout)
+        else:
+            # 다른 프로세스가 먼저 저장한 값을 다음 조회 때 shared에서 읽도록 합니다.
+            self.local.delete(local_key)
+        return added
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        found, value = self.local.get(local_key)
+        if found:
+            self._count(local_hits=1)
+            return value
+
+        missing = object()
+        value = self.shared.get(key, missing, version=version)
+        if value is missing:
+            self._count(local_misses=1, shared_misses=1)
+            return default
+        self._count(local_misses=1, shared_hits=1)
+        self._fill_local(local_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, timeout, version=version)
+        self._fill_local(local_key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        touched = self.shared.touch(key, timeout, version=version)
+        if not touched or self._local_ttl(timeout) <= 0:
+            self.local.delete(local_key)
+        return touched
+
+    def delete(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self.local.delete(local_key)
+        return self.shared.delete(key, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remaining = []
+        for key in keys:
+            hit, value = self.local.get(
+                self.make_and_validate_key(key, version=version)
+            )
+            if hit:
+                found[key] = value
+            else:
+                remaining.append(key)
+
+        shared_found = (
+            self.shared.get_many(remaining, version=version) if remaining else {}
+        )
+        for key, value in shared_found.items():
+            self._fill_local(self.make_and_validate_key(key, version=version), value)
+        self._count(
+            local_hits=len(found),
+            local_misses=len(remaining),
+            shared_hits=len(shared_found),
+            shared_misses=len(remaining) - len(shared_found),
+        )
+        found.update(shared_found)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            local_key = self.make_and_validate_key(key, version=version)
+            if key in failed:
+                self.local.delete(local_key)
+            else:
+                self._fill_local(local_key, value, timeout)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local.delete(self.make_and_validate_key(key, version=version))
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        found, _ = self.local.get(self.make_and_validate_key(key, version=version))
+        return found or self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        try:
+            value = self.shared.incr(key, delta, version=version)
+        except ValueError:
+            self.local.delete(local_key)
+            raise
+        self._fill_local(local_key, value)
+        return value
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def stats(self):
+        """local/shared 단계별 hit, miss 횟수와 hit ratio, local 항목 수를 반환합니다."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        for tier in ["local", "shared"]:
+            hits = stats[f"{tier}_hits"]
+            total = hits + stats[f"{tier}_misses"]
+            stats[f"{tier}_hit_ratio"] = hits / total if total else 0.0
+        stats["local_entries"] = len(self.local)
+        return stats
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = dict.fromkeys(self._stats, 0)
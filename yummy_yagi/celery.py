@@ -1,6 +1,7 @@
 import os
 from django.conf import settings
 from celery import Celery
+from celery.schedules import crontab
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yummy_yagi.settings")
@@ -9,7 +10,7 @@ app = Celery(
     "yummy_yagi",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["user.tasks"],
+    include=["user.tasks", "story.tasks"],
 )
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
@@ -18,6 +19,18 @@ app.conf.update(
     result_expires=settings.CELERY_RESULT_EXPIRES,
 )
 
+# 주기적으로 실행할 작업 (celery beat)
+app.conf.beat_schedule = {
+    "purge-translation-cache": {
+        "task": "story.tasks.purge_translation_cache",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "rebuild-story-rankings": {
+        "task": "story.tasks.rebuild_story_rankings",
+        "schedule": settings.STORY_RANKING_REBUILD_INTERVAL,
+    },
+}
+
 if __name__ == "__main__":
     app.start()
 
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 import environ
 import sys
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -11,12 +12,43 @@ env = environ.Env(DEBUG=(bool, True))
 environ.Env.read_env(env_file=os.path.join(BASE_DIR, ".env"))
 DEBUG = os.environ.get("DEBUG", "")
 SECRET_KEY = os.environ.get("SECRET_KEY")
+# 테스트 실행(manage.py test, GitHub Actions) 여부
+IS_TEST_RUN = (len(sys.argv) > 1 and sys.argv[1] == "test") or os.environ.get(
+    "IS_GITHUB_ACTION"
+) == "True"
 ALLOWED_HOSTS = ["backend"]
 
 GPT_API_KEY = os.environ.get("GPT_DALLE_API_KEY", "")
 DEEPL_AUTH_KEY = os.environ.get("DEEPL_AUTH_KEY", "")
 PRES_API_KEY = os.environ.get("PRES_API_KEY", "")
 
+# 외부 AI 서비스 요청 타임아웃(초)
+AI_PROVIDER_TIMEOUT = 30
+# 외부 AI 서비스 장애 대응 (story.backoff)
+# 서킷 브레이커 : 연속 실패 횟수, 차단 후 시험 호출까지 대기 시간(초)
+AI_PROVIDER_BREAKER_FAILURES = 5
+AI_PROVIDER_BREAKER_RESET_TIMEOUT = 30
+# 프로세스당 동시 요청 수 제한(AIMD) : 시작값, 최솟값, 최댓값, 목표 응답 시간(초)
+AI_PROVIDER_CONCURRENCY = {
+    "gpt": {"initial": 16, "min": 1, "max": 64, "latency_target": 45},
+    "dalle": {"initial": 8, "min": 1, "max": 32, "latency_target": 40},
+    "deepl": {"initial": 16, "min": 1, "max": 64, "latency_target": 3},
+    "perspective": {"initial": 16, "min": 1, "max": 64, "latency_target": 2},
+}
+# 비동기 뷰(ASGI)에서 이벤트 루프당 외부 AI 서비스와 동시에 맺을 수 있는 최대 연결 수
+ASYNC_PROVIDER_MAX_CONNECTIONS = 200
+# Perspective API discovery 문서 디스크 캐시 경로 및 유효 시간(초)
+PERSPECTIVE_DISCOVERY_CACHE_PATH = os.path.join(
+    BASE_DIR, "cache", "perspective_discovery.json"
+)
+PERSPECTIVE_DISCOVERY_CACHE_TTL = 60 * 60 * 24
+# 폭력성 검출 결과 캐시 (story.moderation) : 유효 시간(초), 프로세스에 기억할 짧은 문장 길이/개수
+MODERATION_CACHE_TTL = 60 * 60 * 24 * 7
+MODERATION_SHORT_TEXT_LENGTH = 200
+MODERATION_SHORT_TEXT_CACHE_SIZE = 4096
+# Perspective API 호출 없이 바로 거절할 단어 목록
+MODERATION_BLOCKLIST_PATH = os.path.join(BASE_DIR, "story", "moderation_blocklist.txt")
+
 KAKAO_API_KEY = os.environ.get("KAKAO_API_KEY", "")
 
 PG_CID = os.environ.get("PG_CID", "")
@@ -171,13 +203,87 @@ CELERY_RESULT_EXPIRES = 30
 CELERY_RESULT_EXTENDED = True
 CELERY_CACHE_BACKEND = "default"
 
+# RabbitMQ/Redis 없이 로컬에서 전체 작업을 실행할 때 사용합니다. (in-memory 브로커)
+if os.environ.get("CELERY_LOCAL_MODE") == "True":
+    CELERY_BROKER_URL = "memory://"
+    CELERY_TASK_ALWAYS_EAGER = True
+    CELERY_TASK_STORE_EAGER_RESULT = True
+
+# 여러 프로세스(웹 워커, Celery 워커)가 함께 쓰는 캐시입니다. (CACHE_REDIS_URL의 Redis)
+# 같은 주제의 동화 생성 작업 합치기(story.singleflight.coalesce_job)와 응답 캐시 버전
+# (story.response_cache)은 add/incr가 프로세스 사이에서 원자적이어야 하므로 Redis가 필요합니다.
+# 파일 캐시는 add/incr가 원자적이지 않으므로, 프로세스가 하나인 개발 환경에서만
+# CACHE_ALLOW_FILE_BASED=True로 사용할 수 있습니다.
+# (저장할 때마다 캐시 디렉터리 전체를 확인하므로 MAX_ENTRIES를 작게 유지합니다.)
+if os.environ.get("CACHE_REDIS_URL"):
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["CACHE_REDIS_URL"],
+    }
+elif os.environ.get("CACHE_ALLOW_FILE_BASED") == "True" or IS_TEST_RUN:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_DIR", "/var/tmp/yummy_yagi_cache"),
+        "OPTIONS": {"MAX_ENTRIES": 3000},
+    }
+else:
+    raise ImproperlyConfigured(
+        "CACHE_REDIS_URL이 필요합니다. "
+        "(개발 환경에서는 CACHE_ALLOW_FILE_BASED=True로 파일 캐시를 사용할 수 있습니다.)"
+    )
+
+# 프로세스 메모리 LRU 뒤에 공유 캐시를 둔 2단계 캐시 (yummy_yagi.cache.TieredCache)
+# 캐시 조회가 DB 쿼리가 되지 않도록 DatabaseCache 대신 사용합니다.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
-        "LOCATION": "my_cache_table",
+        "BACKEND": "yummy_yagi.cache.TieredCache",
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "SHARED": SHARED_CACHE,
+            "LOCAL_MAX_ENTRIES": 2048,
+            "LOCAL_TIMEOUT": 5,
+        },
     }
 }
 
+# DeepL 번역 캐시 (story.translation) : 프로세스 LRU 크기, 유효 시간(초)
+TRANSLATION_CACHE_LRU_SIZE = 2048
+TRANSLATION_CACHE_TTL = 60 * 60 * 24 * 30
+# DeepL 일괄 번역 요청 한도 : 요청당 최대 문장 수, 최대 요청 크기(byte)
+DEEPL_BATCH_MAX_TEXTS = 50
+DEEPL_BATCH_MAX_BYTES = 120 * 1024
+
+# 동화 생성 파이프라인에서 동시에 실행할 수 있는 단계 수 (story.pipeline.run_stages)
+PIPELINE_STAGE_WORKERS = 4
+
+# 같은 주제의 동화 생성 작업을 합치는 최대 시간(초) (story.singleflight)
+FAIRYTAIL_COALESCE_TIMEOUT = 60 * 10
+
+# 싫어요가 이 개수 이상인 스토리는 목록에서 숨깁니다. (Story.is_visible)
+# 값을 바꾸면 기존 스토리에는 반영되지 않으므로 배포 후 refresh_story_visibility 명령을 실행합니다.
+STORY_HIDE_HATE_THRESHOLD = 5
+
+# 공개 스토리 API 응답 캐시 유효 시간(초) (story.response_cache)
+# 관련 이벤트가 발생하면 바로 무효화되며, 작성자 닉네임 변경 등은 유효 시간이 지나면 반영됩니다.
+RESPONSE_CACHE_TTL = 60 * 5
+
+# 좋아요 순 스토리 순위 (story.models.StoryRanking) : scope별 순위 개수, 전체 재계산 주기(초)
+STORY_RANKING_SIZE = 50
+STORY_RANKING_REBUILD_INTERVAL = 60 * 5
+
+# 스토리 작성 시 DALL-E 이미지 다운로드 설정 (story.images)
+STORY_IMAGE_DOWNLOAD_WORKERS = 6
+STORY_IMAGE_DOWNLOAD_TIMEOUT = 20
+STORY_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+# 문단 이미지 썸네일 크기(px) 및 변환 품질
+STORY_IMAGE_THUMBNAIL_SIZES = (256, 512)
+STORY_IMAGE_VARIANT_QUALITY = 80
+
+# 스토리 조회 기록 버퍼 (user.view_tracking)
+STORY_VIEW_BUFFER_SIZE = 100
+STORY_VIEW_FLUSH_INTERVAL = 5
+STORY_VIEW_BACKGROUND_FLUSH = True
+
 KAKAO_REST_API_KEY = os.environ.get("KAKAO_REST_API_KEY", "")
 KAKAO_SECRET_KEY = os.environ.get("KAKAO_SECRET_KEY", "")
 
@@ -269,9 +375,7 @@ LOGGING = {
     },
 }
 
-if (len(sys.argv) > 1 and sys.argv[1] == "test") or os.environ.get(
-    "IS_GITHUB_ACTION"
-) == "True":
+if IS_TEST_RUN:
     LOGGING["handlers"]["error_file"]["class"] = "logging.NullHandler"
     del LOGGING["handlers"]["error_file"]["filename"]
     del LOGGING["handlers"]["error_file"]["maxBytes"]
@@ -281,5 +385,13 @@ if (len(sys.argv) > 1 and sys.argv[1] == "test") or os.environ.get(
     del LOGGING["handlers"]["info_file"]["encoding"]
     del LOGGING["handlers"]["info_file"]["maxBytes"]
     del LOGGING["handlers"]["info_file"]["backupCount"]
+    CELERY_BROKER_URL = "memory://"
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
+    CELERY_TASK_STORE_EAGER_RESULT = True
+    STORY_VIEW_BACKGROUND_FLUSH = False
+    # 테스트에서는 공유 캐시 대신 프로세스 메모리 캐시를 사용합니다.
+    CACHES["default"]["OPTIONS"]["SHARED"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    }